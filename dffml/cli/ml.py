@@ -54,6 +54,9 @@ class PredictAllConfig(MLCMDConfig):
     update: bool = field(
         "Update record with sources", default=False,
     )
+    update_batch_size: int = field(
+        "Number of records to update sources with at a time", default=128,
+    )
     pretty: bool = field(
         "Outputs data in tabular form", default=False,
     )
@@ -66,7 +69,11 @@ class PredictAll(MLCMD):
 
     async def run(self):
         async for record in predict(
-            self.model, self.sources, update=self.update, keep_record=True
+            self.model,
+            self.sources,
+            update=self.update,
+            keep_record=True,
+            update_batch_size=self.update_batch_size,
         ):
             if self.pretty:
                 print(record)
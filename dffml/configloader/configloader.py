@@ -40,20 +40,16 @@ class BaseConfigLoader(BaseDataFlowFacilitatorObject):
         return self.CONTEXT(self)
 
     @classmethod
-    async def load_single_file(
+    async def load_parser(
         cls,
         parsers: Dict[str, "BaseConfigLoader"],
         exit_stack: contextlib.AsyncExitStack,
-        path: pathlib.Path,
-        *,
-        base_dir: Optional[pathlib.Path] = None,
-    ) -> Dict:
+        filetype: str,
+    ) -> BaseConfigLoaderContext:
         """
-        Load one file and load the ConfigLoader for it if necessary, using the
-        AsyncExitStack provided.
+        Load the ConfigLoader for a filetype if it isn't already loaded, using
+        the AsyncExitStack provided.
         """
-        filetype = path.suffix.replace(".", "")
-        # Load the parser for the filetype if it isn't already loaded
         if not filetype in parsers:
             # TODO Get configs for loaders from somewhere, probably the
             # config of the multicomm
@@ -62,6 +58,23 @@ class BaseConfigLoader(BaseDataFlowFacilitatorObject):
                 loader_cls(BaseConfig())
             )
             parsers[filetype] = await exit_stack.enter_async_context(loader())
+        return parsers[filetype]
+
+    @classmethod
+    async def load_single_file(
+        cls,
+        parsers: Dict[str, "BaseConfigLoader"],
+        exit_stack: contextlib.AsyncExitStack,
+        path: pathlib.Path,
+        *,
+        base_dir: Optional[pathlib.Path] = None,
+    ) -> Dict:
+        """
+        Load one file and load the ConfigLoader for it if necessary, using the
+        AsyncExitStack provided.
+        """
+        filetype = path.suffix.replace(".", "")
+        await cls.load_parser(parsers, exit_stack, filetype)
         # The config will be stored by its unique filepath split on dirs
         config_path = list(
             path.parts[len(base_dir.parts) :]
@@ -135,3 +148,12 @@ class ConfigLoaders(AsyncContextManagerList):
             self.parsers, self.async_exit_stack, filepath, base_dir=base_dir
         )
         return conf_dict
+
+    async def load_parser(self, filetype: str) -> BaseConfigLoaderContext:
+        """
+        ConfigLoader context for files of the filetype (their suffix without
+        the dot), loaded if it isn't already
+        """
+        return await BaseConfigLoader.load_parser(
+            self.parsers, self.async_exit_stack, filetype
+        )
@@ -147,6 +147,16 @@ class BaseDatabaseContext(
         except:
             await self.update(table_name, data, conditions=[])
 
+    async def insert_or_update_many(
+        self, table_name: str, rows: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Inserts or updates each of the rows in `table_name`. Databases which
+        can write many rows at once should override this method
+        """
+        for data in rows:
+            await self.insert_or_update(table_name, data)
+
 
 @base_entry_point("dffml.db", "db")
 class BaseDatabase(BaseDataFlowObject):
@@ -29,6 +29,9 @@ class SQLDatabaseContext(BaseDatabaseContext):
                 'values':
                      ['John', 'Miles', '38']
                 }
+
+        The value of a condition whose operation is ``IN`` is a list, which
+        is bound as one value per element.
         """
 
         def _make_condition_expression(conditions):
@@ -37,6 +40,14 @@ class SQLDatabaseContext(BaseDatabaseContext):
                 exp = []
 
                 for cnd in lst:
+                    # The value of an IN condition is a list of values
+                    if cnd.operation.upper() == "IN":
+                        binds = ", ".join(
+                            [cls.BIND_DECLARATION] * len(cnd.value)
+                        )
+                        exp.append(f"(`{cnd.column}` IN ({binds}) )")
+                        val_list.extend(cnd.value)
+                        continue
                     exp.append(
                         f"(`{cnd.column}` {cnd.operation} {cls.BIND_DECLARATION} )"
                     )
@@ -123,6 +134,46 @@ class SQLDatabaseContext(BaseDatabaseContext):
         )
         return query, list(data.values())
 
+    def insert_or_update_many_query(
+        self, table_name: str, cols: List[str], primary_keys: List[str]
+    ) -> str:
+        """
+        Creates insert query for many rows with the same ``cols``, which
+        updates the existing row when a row with the same primary key is
+        already in ``table_name``.
+
+        Parameters
+        ----------
+        table_name : str
+            Name of the table.
+        cols : list
+            Columns each row has values for.
+        primary_keys : list
+            Columns making up the primary key of ``table_name``. If empty rows
+            are always inserted.
+
+        Returns
+        -------
+        query : str
+            ``INSERT`` query, to be executed once per row of values
+        """
+        query = (
+            f"INSERT INTO {table_name} "
+            + f"( {', '.join([f'`{col}`' for col in cols])} )"
+            + f" VALUES( {', '.join([self.BIND_DECLARATION] * len(cols))} ) "
+        )
+        if not primary_keys:
+            return query
+        query += f"ON CONFLICT( {', '.join([f'`{col}`' for col in primary_keys])} ) "
+        updated = [col for col in cols if col not in primary_keys]
+        if not updated:
+            return query + "DO NOTHING"
+        return (
+            query
+            + "DO UPDATE SET "
+            + ", ".join([f"`{col}` = excluded.`{col}`" for col in updated])
+        )
+
     def update_query(
         self,
         table_name: str,
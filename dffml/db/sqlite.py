@@ -1,17 +1,27 @@
 import asyncio
 import sqlite3
-from typing import Dict, Any, List, Optional, AsyncIterator
+import itertools
+from typing import Dict, Any, List, Tuple, Optional, AsyncIterator
 
 
-from .base import BaseDatabase, Conditions
+from .base import BaseDatabase, Condition, Conditions
 from .sql import SQLDatabaseContext
-from ..base import config
+from ..base import config, field
 from ..util.entrypoint import entrypoint
 
 
 @config
 class SqliteDatabaseConfig:
     filename: str
+    journal_mode: str = field(
+        "SQLite journal mode to use, for example WAL. SQLite's default if not "
+        "given",
+        default=None,
+    )
+    batch_size: int = field(
+        "Number of rows written by insert_or_update_many in each transaction",
+        default=1000,
+    )
 
 
 class SqliteDatabaseContext(SQLDatabaseContext):
@@ -87,6 +97,115 @@ class SqliteDatabaseContext(SQLDatabaseContext):
             conditions = [[[_key, "=", _keyval]]]
             await self.update(table_name, data, conditions)
 
+    def unique_constraints(
+        self, table_name: str
+    ) -> Tuple[List[List[str]], bool]:
+        """
+        Columns of each of the primary key and unique constraints of a table,
+        and if they can all be the target of an upsert. Called with the
+        database lock held.
+        """
+        constraints = []
+        upsert = True
+        primary_keys = [
+            col["name"]
+            for col in self.parent.cursor.execute(
+                f"PRAGMA table_info({table_name})"
+            ).fetchall()
+            if col["pk"]
+        ]
+        if primary_keys:
+            constraints.append(primary_keys)
+        for index in self.parent.cursor.execute(
+            f"PRAGMA index_list({table_name})"
+        ).fetchall():
+            # The primary key's index was already added
+            if not index["unique"] or index["origin"] == "pk":
+                continue
+            cols = [
+                col["name"]
+                for col in self.parent.cursor.execute(
+                    f"PRAGMA index_info({index['name']})"
+                ).fetchall()
+            ]
+            # Columns of indexes on expressions have no name
+            if index["partial"] or not all(cols):
+                upsert = False
+            constraints.append(cols)
+        return constraints, upsert
+
+    def insert_or_update_row(
+        self,
+        table_name: str,
+        data: Dict[str, Any],
+        constraints: List[List[str]],
+    ) -> None:
+        """
+        Insert a row, or update the row it conflicts with on one of the
+        constraints. Called with the database lock held.
+        """
+        query, query_values = self.insert_query(table_name, data)
+        try:
+            self.parent.cursor.execute(query, query_values)
+            return
+        except sqlite3.IntegrityError:
+            pass
+        for cols in constraints:
+            if not all(col in data for col in cols):
+                continue
+            updated = {
+                col: value for col, value in data.items() if col not in cols
+            }
+            # Nothing to update in the existing row
+            if not updated:
+                return
+            query, query_values = self.update_query(
+                table_name,
+                updated,
+                conditions=[[Condition(col, "=", data[col])] for col in cols],
+            )
+            if self.parent.cursor.execute(query, query_values).rowcount:
+                return
+        # Raise the error for a conflict we can't update on
+        self.parent.cursor.execute(*self.insert_query(table_name, data))
+
+    async def insert_or_update_many(
+        self, table_name: str, rows: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Rows are written using executemany, committing once per batch_size
+        rows. Conflicts are detected using the table's primary key, or its
+        unique constraint if it has no primary key. Tables with more than one
+        primary key or unique constraint, or with unique indexes which can't
+        be the target of an upsert, are written a row at a time.
+        """
+        async with self.parent.lock:
+            constraints, upsert = self.unique_constraints(table_name)
+            # An upsert can only update on conflicts with one constraint
+            upsert = upsert and len(constraints) < 2
+            batch_size = self.parent.config.batch_size
+            for i in range(0, len(rows), batch_size):
+                with self.parent.db:
+                    if not upsert:
+                        for data in rows[i : i + batch_size]:
+                            self.insert_or_update_row(
+                                table_name, data, constraints
+                            )
+                        continue
+                    # Consecutive rows with the same columns share a query
+                    for cols, group in itertools.groupby(
+                        rows[i : i + batch_size], key=lambda data: list(data)
+                    ):
+                        query = self.insert_or_update_many_query(
+                            table_name,
+                            cols,
+                            constraints[0] if constraints else [],
+                        )
+                        self.logger.debug(query)
+                        self.parent.cursor.executemany(
+                            query, [list(data.values()) for data in group]
+                        )
+
 
 @entrypoint("sqlite")
 class SqliteDatabase(BaseDatabase):
@@ -104,6 +223,10 @@ class SqliteDatabase(BaseDatabase):
         self.db = sqlite3.connect(self.config.filename)
         self.db.row_factory = sqlite3.Row
         self.cursor = self.db.cursor()
+        if self.config.journal_mode is not None:
+            self.cursor.execute(
+                f"PRAGMA journal_mode={self.config.journal_mode}"
+            )
         return await super().__aenter__()
 
     async def __aexit__(self, _exc_type, _exc_value, _traceback):
@@ -12,6 +12,7 @@ from typing import (
     Union,
     Optional,
     Set,
+    Callable,
 )
 from dataclasses import is_dataclass
 from contextlib import asynccontextmanager
@@ -196,6 +197,11 @@ class OperationImplementation(BaseDataFlowObject):
         return loading_classes
 
 
+# Places an op wrapped function which is not async may be run. None means the
+# operation implementation network decides
+OP_EXECUTORS = (None, "inline", "thread", "process")
+
+
 def create_definition(name, param_annotation, default=NO_DEFAULT):
     if param_annotation in primitive_types:
         return Definition(
@@ -252,7 +258,14 @@ def create_definition(name, param_annotation, default=NO_DEFAULT):
     )
 
 
-def op(*args, imp_enter=None, ctx_enter=None, config_cls=None, **kwargs):
+def op(
+    *args,
+    imp_enter=None,
+    ctx_enter=None,
+    config_cls=None,
+    executor=None,
+    **kwargs,
+):
     """
     The ``op`` decorator creates a subclass of
     :py:class:`dffml.df.OperationImplementation` and assigns that
@@ -270,6 +283,24 @@ def op(*args, imp_enter=None, ctx_enter=None, config_cls=None, **kwargs):
     upon entry is assigned to a parameter in the ``OperationImplementation``
     instance named after the respective key.
 
+    Functions which are not async functions are run within the event loop's
+    thread by default, which blocks any other operations from running while
+    they do. ``executor`` may be set to ``"thread"`` or ``"process"`` to have
+    them run within the operation implementation network's thread or process
+    pool instead. Setting it to ``"inline"`` always runs them within the event
+    loop's thread. If not given, the operation implementation network decides.
+    Functions which use ``self`` are always run inline. Functions run in a
+    process pool must be importable, and their inputs, outputs, and config
+    (if ``config_cls`` is given) must be pickleable.
+
+    Setting ``cache=True`` tells the operation implementation network that
+    the operation's outputs depend only on the values of its inputs. Outputs
+    are then stored, keyed on the operation's name, ``version``, and the
+    values of its inputs, and the operation is not run again for the same
+    input values, even within other contexts. Change the ``version`` when the
+    operation's behavior changes, so that results from the old version are
+    not used.
+
     Examples
     --------
 
@@ -324,6 +355,11 @@ def op(*args, imp_enter=None, ctx_enter=None, config_cls=None, **kwargs):
     Input(value={'Bob': Person(name='Bob', age=19), 'Alice': Person(name='Alice', age=21), 'Mark': Person(name='Mark', age=90)}, definition=canVote.outputs.result)
     """
 
+    if executor not in OP_EXECUTORS:
+        raise ValueError(
+            f"executor must be one of {OP_EXECUTORS}, got {executor!r}"
+        )
+
     def wrap(func):
         if not "name" in kwargs:
             name = func.__name__
@@ -357,12 +393,12 @@ def op(*args, imp_enter=None, ctx_enter=None, config_cls=None, **kwargs):
             )
         )
         # Check if the function uses the operation implementation config
-        # This exists because eventually we will make non async functions
-        # wrapped with op run with loop.run_in_executor when that happens it's
-        # likely that self won't be serializeable into the thread / process.
-        # Config's are guaranteed to be serializable, therefore this lets us
-        # define operations that have configs and needs to access them when
-        # running within another thread.
+        # This exists because non async functions wrapped with op may be run
+        # with loop.run_in_executor (see executor). It's likely that self won't
+        # be serializeable into the thread / process. Config's are guaranteed
+        # to be serializable, therefore this lets us define operations that
+        # have configs and needs to access them when running within another
+        # thread or process.
         uses_config = None
         if config_cls is not None:
             for name, param in sig.parameters.items():
@@ -465,8 +501,20 @@ def op(*args, imp_enter=None, ctx_enter=None, config_cls=None, **kwargs):
                             result = await result
                     elif inspect.iscoroutinefunction(func):
                         result = await func(**inputs)
+                    elif (
+                        not inspect.isgeneratorfunction(func)
+                        and not inspect.isasyncgenfunction(func)
+                        and not inspect.iscoroutinefunction(func)
+                        and self.octx is not None
+                    ):
+                        # Let the operation implementation network decide
+                        # which thread or process to run the function in.
+                        # Generators can't be sent to other processes, they
+                        # run on the event loop
+                        result = await self.octx.nctx.run_in_executor(
+                            executor, func, inputs
+                        )
                     else:
-                        # TODO Add auto thread pooling of non-async functions
                         result = func(**inputs)
                     if auto_def_outputs and len(self.parent.op.outputs) == 1:
                         if inspect.isasyncgen(result):
@@ -618,6 +666,12 @@ class BaseKeyValueStoreContext(BaseDataFlowObjectContext):
         Get a value in the key value store
         """
 
+    async def evict(self, *keys: str) -> None:
+        """
+        Called when keys are no longer needed. Stores which hold their keys in
+        memory should remove them. Persistent stores may keep them.
+        """
+
 
 @base_entry_point("dffml.kvstore", "kvstore")
 class BaseKeyValueStore(BaseDataFlowObject):
@@ -807,6 +861,12 @@ class BaseInputNetworkContext(BaseDataFlowObjectContext):
         that, according to the redundancy checker, haven't been run yet.
         """
 
+    async def evict(self, ctx: BaseInputSetContext) -> None:
+        """
+        Remove all inputs within a context. Called by the orchestrator once
+        operations will no longer be run within the context.
+        """
+
 
 @base_entry_point("dffml.input.network", "input", "network")
 class BaseInputNetwork(BaseDataFlowObject):
@@ -867,10 +927,6 @@ class BaseRedundancyCheckerConfig(NamedTuple):
     key_value_store: BaseKeyValueStore
 
 
-# TODO store redundancy checks by BaseInputSetContext.handle() and add method
-# to remove all associated with a particular handle. Aka allow us to clean up
-# the input, redundancy, etc. networks after execution of a context completes
-# via the orchestrator.
 class BaseRedundancyCheckerContext(BaseDataFlowObjectContext):
     """
     Abstract Base Class for redundancy checking context
@@ -886,6 +942,31 @@ class BaseRedundancyCheckerContext(BaseDataFlowObjectContext):
     async def add(self, operation: Operation, parameter_set: BaseParameterSet):
         pass
 
+    async def replay(
+        self, operation: Operation, parameter_set: BaseParameterSet
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Outputs of the operation if it already completed with the parameter
+        set, such as before a restart. None if it should be run.
+        """
+
+    async def completed(
+        self,
+        operation: Operation,
+        parameter_set: BaseParameterSet,
+        outputs: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Called with all the outputs of an operation once it has run with the
+        parameter set.
+        """
+
+    async def evict(self, ctx: BaseInputSetContext) -> None:
+        """
+        Forget about parameter sets run within a context. Called by the
+        orchestrator once operations will no longer be run within the context.
+        """
+
 
 @base_entry_point("dffml.redundancy.checker", "rchecker")
 class BaseRedundancyChecker(BaseDataFlowObject):
@@ -895,7 +976,6 @@ class BaseRedundancyChecker(BaseDataFlowObject):
     """
 
 
-# TODO Provide a way to clear out all locks for inputs within a context
 class BaseLockNetworkContext(BaseDataFlowObjectContext):
     @abc.abstractmethod
     async def acquire(self, parameter_set: BaseParameterSet) -> bool:
@@ -904,6 +984,12 @@ class BaseLockNetworkContext(BaseDataFlowObjectContext):
         the parameter set.
         """
 
+    async def evict(self, ctx: BaseInputSetContext) -> None:
+        """
+        Remove locks for inputs within a context. Called by the orchestrator
+        once operations will no longer be run within the context.
+        """
+
 
 @base_entry_point("dffml.lock.network", "lock", "network")
 class BaseLockNetwork(BaseDataFlowObject):
@@ -951,6 +1037,26 @@ class BaseOperationImplementationNetworkContext(BaseDataFlowObjectContext):
         Returns when an operation finishes
         """
 
+    async def run_in_executor(
+        self,
+        executor: Optional[str],
+        func: Callable[..., Any],
+        inputs: Dict[str, Any],
+    ) -> Any:
+        """
+        Call a function which is not async with the given inputs. executor is
+        one of None, "inline", "thread", or "process". Networks which don't
+        manage thread or process pools call the function within the event
+        loop's thread.
+        """
+        return func(**inputs)
+
+    async def evict(self, ctx: BaseInputSetContext) -> None:
+        """
+        Remove anything held for a context. Called by the orchestrator once
+        operations will no longer be run within the context.
+        """
+
     @abc.abstractmethod
     async def dispatch(
         self,
@@ -1,17 +1,21 @@
 import io
 import abc
 import copy
+import collections
 import asyncio
 import secrets
 import hashlib
+import pickle
 import inspect
+import functools
 import itertools
 import traceback
 import concurrent.futures
 from itertools import product, chain
-from contextlib import asynccontextmanager, AsyncExitStack, ExitStack
+from contextlib import asynccontextmanager, AsyncExitStack
 from typing import (
     AsyncIterator,
+    Iterator,
     Dict,
     List,
     Tuple,
@@ -21,6 +25,8 @@ from typing import (
     Optional,
     Set,
     Callable,
+    Awaitable,
+    Deque,
 )
 
 from .exceptions import (
@@ -73,8 +79,8 @@ from .base import (
 from ..base import config, field
 from ..util.entrypoint import entrypoint
 from ..util.cli.arg import Arg
-from ..util.data import ignore_args
-from ..util.asynchelper import aenter_stack, concurrently
+from ..util.data import ignore_args, stable_hash
+from ..util.asynchelper import aenter_stack, PrioritySemaphore
 
 from .log import LOGGER
 
@@ -95,7 +101,11 @@ class BaseMemoryDataFlowObject(BaseDataFlowObject):
 
 @config
 class MemoryKeyValueStoreConfig:
-    pass
+    max_size: int = field(
+        "Maximum number of keys to store. The least recently used keys are "
+        "removed once there are more. No limit if not given",
+        default=None,
+    )
 
 
 class MemoryKeyValueStoreContext(BaseKeyValueStoreContext):
@@ -103,16 +113,32 @@ class MemoryKeyValueStoreContext(BaseKeyValueStoreContext):
         self, config: BaseConfig, parent: "MemoryKeyValueStore"
     ) -> None:
         super().__init__(config, parent)
-        self.memory: Dict[str, bytes] = {}
+        self.memory: Dict[str, bytes] = collections.OrderedDict()
         self.lock = asyncio.Lock()
 
+    def _used(self, key: str) -> None:
+        """
+        Mark a key as most recently used, removing least recently used keys
+        if there are more than max_size
+        """
+        max_size = getattr(self.parent.config, "max_size", None)
+        if max_size is None:
+            return
+        self.memory.move_to_end(key)
+        while len(self.memory) > max_size:
+            self.memory.popitem(last=False)
+
     async def get(self, key: str) -> Union[bytes, None]:
         async with self.lock:
-            return self.memory.get(key)
+            value = self.memory.get(key)
+            if value is not None:
+                self._used(key)
+            return value
 
     async def set(self, key: str, value: bytes):
         async with self.lock:
             self.memory[key] = value
+            self._used(key)
 
     async def conditional_set(
         self,
@@ -125,9 +151,15 @@ class MemoryKeyValueStoreContext(BaseKeyValueStoreContext):
         async with self.lock:
             if checker(self.memory.get(key)):
                 self.memory[key] = value
+                self._used(key)
                 return True
         return False
 
+    async def evict(self, *keys: str) -> None:
+        async with self.lock:
+            for key in keys:
+                self.memory.pop(key, None)
+
 
 @entrypoint("memory")
 class MemoryKeyValueStore(BaseKeyValueStore, BaseMemoryDataFlowObject):
@@ -285,6 +317,9 @@ class MemoryDefinitionSetContext(BaseDefinitionSetContext):
 
 
 class MemoryInputNetworkContext(BaseInputNetworkContext):
+    # Number of permutations sent to the redundancy checker at a time
+    GATHER_CHUNK_SIZE = 64
+
     def __init__(
         self, config: BaseConfig, parent: "MemoryInputNetwork"
     ) -> None:
@@ -332,26 +367,74 @@ class MemoryInputNetworkContext(BaseInputNetworkContext):
         async with self.ctxhd_lock:
             # Create dict for handle_string if not present
             if not handle_string in self.ctxhd:
-                self.ctxhd[handle_string] = MemoryInputNetworkContextEntry(
-                    ctx=input_set.ctx, definitions={}, by_origin={}
-                )
+                self.ctxhd[handle_string] = self._new_entry(input_set.ctx)
+            entry = self.ctxhd[handle_string]
             # Go through each item in the input set
             async for item in input_set.inputs():
-                # Create set for item definition if not present
-                if (
-                    not item.definition
-                    in self.ctxhd[handle_string].definitions
-                ):
-                    self.ctxhd[handle_string].definitions[item.definition] = []
-                # Add input to by defintion set
-                self.ctxhd[handle_string].definitions[item.definition].append(
-                    item
-                )
-                # Create set for item origin if not present
-                if not item.origin in self.ctxhd[handle_string].by_origin:
-                    self.ctxhd[handle_string].by_origin[item.origin] = []
-                # Add input to by origin set
-                self.ctxhd[handle_string].by_origin[item.origin].append(item)
+                self._index_input(entry, item)
+
+    def _new_entry(
+        self, ctx: BaseInputSetContext
+    ) -> MemoryInputNetworkContextEntry:
+        """
+        Create the structure which will hold all inputs within a context
+        """
+        return MemoryInputNetworkContextEntry(
+            ctx=ctx, definitions={}, by_origin={}
+        )
+
+    def _index_input(
+        self, entry: MemoryInputNetworkContextEntry, item: Input
+    ) -> None:
+        """
+        Add an input to a context's entry. Called with ctxhd_lock held.
+        """
+        # Create set for item definition if not present
+        if not item.definition in entry.definitions:
+            entry.definitions[item.definition] = []
+        # Add input to by defintion set
+        entry.definitions[item.definition].append(item)
+        # Create set for item origin if not present
+        if not item.origin in entry.by_origin:
+            entry.by_origin[item.origin] = []
+        # Add input to by origin set
+        entry.by_origin[item.origin].append(item)
+
+    def _origin_inputs(
+        self,
+        entry: MemoryInputNetworkContextEntry,
+        origin: Union[str, Tuple[str, str]],
+        definition_names: List[str],
+    ) -> List[Input]:
+        """
+        Inputs within a context which came from origin and have a definition
+        whose name is one of definition_names. In the order they were added.
+        """
+        # TODO(p2) We favored comparing names to defintions because sometimes
+        # we create defintions which have specs which create new types which
+        # will not equal each other. We maybe want to consider switching to
+        # comparing exported Defintions
+        return [
+            item
+            for item in entry.by_origin.get(origin, [])
+            if item.definition.name in definition_names
+        ]
+
+    async def evict(self, ctx: BaseInputSetContext) -> None:
+        handle_string = (await ctx.handle()).as_string()
+        async with self.ctxhd_lock:
+            self.ctxhd.pop(handle_string, None)
+        self.input_notification_set.pop(handle_string, None)
+        # Remove the notification that the context was added if no one has
+        # received it
+        async with self.ctx_notification_set.lock:
+            notification_items = []
+            for item in self.ctx_notification_set.notification_items:
+                if (await item[1].handle()).as_string() != handle_string:
+                    notification_items.append(item)
+            self.ctx_notification_set.notification_items = notification_items
+            if not notification_items:
+                self.ctx_notification_set.event_added.clear()
 
     async def uadd(self, *args: Input):
         """
@@ -465,14 +548,14 @@ class MemoryInputNetworkContext(BaseInputNetworkContext):
                 return
             # Limit search to given context via context handle
             return await self._check_conditions(
-                operation, dataflow, self.ctxhd[handle_string].by_origin
+                operation, dataflow, self.ctxhd[handle_string]
             )
 
     async def _check_conditions(
         self,
         operation: Operation,
         dataflow: DataFlow,
-        by_origin: Dict[Union[str, Tuple[str, str]], List[Input]],
+        entry: MemoryInputNetworkContextEntry,
     ) -> bool:
         # Grab the input flow to check for definition overrides
         input_flow = dataflow.flow[operation.instance_name]
@@ -503,32 +586,23 @@ class MemoryInputNetworkContext(BaseInputNetworkContext):
                     origin,
                 ) = input_flow.get_alternate_definitions(origin)
                 # Bail if the condition doesn't exist
-                if not origin in by_origin:
+                if not origin in entry.by_origin:
                     return
-                # Bail if the condition is not True
-                for item in by_origin[origin]:
-                    # TODO(p2) Alright, this shits fucked, way not clean
-                    # / clear. We're just trying to skip any conditions
-                    # (and inputs for input_flow.inputs.items()) where
-                    # the definition doesn't match, but it's within the
-                    # correct origin.
-                    if alternate_definitions:
-                        if item.definition.name not in alternate_definitions:
-                            continue
-                    elif isinstance(condition_source, str):
-                        if (
-                            item.definition.name
-                            != operation.conditions[i].name
-                        ):
-                            continue
-                    elif (
-                        item.definition.name
-                        != dataflow.operations[origin[0]]
-                        .outputs[origin[1]]
-                        .name
-                    ):
-                        continue
-                    condition_found_and_true = bool(item.value)
+                # We're skipping any conditions (and inputs for
+                # input_flow.inputs.items()) where the definition doesn't
+                # match, but it's within the correct origin.
+                if alternate_definitions:
+                    definition_names = alternate_definitions
+                elif isinstance(condition_source, str):
+                    definition_names = [operation.conditions[i].name]
+                else:
+                    definition_names = [
+                        dataflow.operations[origin[0]].outputs[origin[1]].name
+                    ]
+                # Bail if the most recent condition is not True
+                found = self._origin_inputs(entry, origin, definition_names)
+                if found:
+                    condition_found_and_true = bool(found[-1].value)
             # Ensure we were able to find a condition within the input
             # network, and that when we found it it's value was True.
             if condition_found_and_true:
@@ -542,8 +616,8 @@ class MemoryInputNetworkContext(BaseInputNetworkContext):
         dataflow: DataFlow,
         ctx: Optional[BaseInputSetContext] = None,
     ) -> AsyncIterator[BaseParameterSet]:
-        # Create a mapping of definitions to inputs for that definition
-        gather: Dict[str, List[Parameter]] = {}
+        # Permutations of applicable inputs
+        permutations: Iterator[Tuple[Parameter, ...]] = iter([])
         async with self.ctxhd_lock:
             # If no context is given we will generate input pairs for all
             # contexts
@@ -557,127 +631,194 @@ class MemoryInputNetworkContext(BaseInputNetworkContext):
                     return
                 # Limit search to given context via context handle
                 contexts = [self.ctxhd[handle_string]]
-            for ctx, _, by_origin in contexts:
-                # Ensure we were able to find a condition within the input
-                # network, and that when we found it it's value was True.
-                if not await self._check_conditions(
-                    operation, dataflow, by_origin
-                ):
+            for entry in contexts:
+                ctx = entry.ctx
+                permutations = await self._permutations(
+                    operation, dataflow, entry
+                )
+                # Bail if we don't have a complete parameter set
+                if permutations is None:
                     return
-                # Grab the input flow to check for definition overrides
-                input_flow = dataflow.flow[operation.instance_name]
-                # Gather all inputs with matching definitions and contexts
-                for input_name, input_sources in input_flow.inputs.items():
-                    # Create parameters for all the inputs
-                    gather[input_name] = []
-                    for input_source in input_sources:
-                        # Create a list of places this input originates from
-                        origins = []
-                        if isinstance(input_source, dict):
-                            for origin in input_source.items():
-                                origins.append(origin)
-                        else:
-                            origins.append(input_source)
-                        for origin in origins:
-                            # Check if the origin is a tuple where the first
-                            # value is the origin (such as "seed") and the
-                            # second value is an array of allowed alternate
-                            # Definition's (their names) within that origin.
-                            # These definitions will be used instead of the
-                            # default one the input specified for the
-                            # operation).
-                            (
-                                alternate_definitions,
-                                origin,
-                            ) = input_flow.get_alternate_definitions(origin)
-                            # Don't try to grab inputs from an origin that
-                            # doesn't have any to give us
-                            if not origin in by_origin:
-                                continue
-                            # Generate parameters from inputs
-                            for item in by_origin[origin]:
-                                # TODO(p2) We favored comparing names to
-                                # defintions because sometimes we create
-                                # defintions which have specs which create new
-                                # types which will not equal each other. We
-                                # maybe want to consider switching to comparing
-                                # exported Defintions
-                                if alternate_definitions:
-                                    if (
-                                        item.definition.name
-                                        not in alternate_definitions
-                                    ):
-                                        continue
-                                elif isinstance(origin, str):
-                                    if (
-                                        item.definition.name
-                                        != operation.inputs[input_name].name
-                                    ):
-                                        continue
-                                elif (
-                                    item.definition.name
-                                    != dataflow.operations[origin[0]]
-                                    .outputs[origin[1]]
-                                    .name
-                                ):
-                                    continue
-                                gather[input_name].append(
-                                    Parameter(
-                                        key=input_name,
-                                        value=item.value,
-                                        origin=item,
-                                        definition=operation.inputs[
-                                            input_name
-                                        ],
-                                    )
-                                )
-                    # There is no data in the network for an input
-                    if not gather[input_name]:
-                        # Check if there is a default value for the parameter,
-                        # if so use it. That default will either come from the
-                        # definition attached to input_name, or it will come
-                        # from one of the alternate definition given within the
-                        # input flow for the input_name.
-                        check_for_default_value = [
-                            operation.inputs[input_name]
-                        ] + alternate_definitions
-                        for definition in check_for_default_value:
-                            # Check if the definition has a default value that is not _NO_DEFAULT
-                            if "dffml.df.types._NO_DEFAULT" not in repr(
-                                definition.default
-                            ):
-                                gather[input_name].append(
-                                    Parameter(
-                                        key=input_name,
-                                        value=definition.default,
-                                        origin=item,
-                                        definition=operation.inputs[
-                                            input_name
-                                        ],
-                                    )
-                                )
-                                break
-                        # If there is no default value, we don't have a complete
-                        # paremeter set, so we bail out
-                        else:
-                            return
-        # Generate all possible permutations of applicable inputs
-        # Create the parameter set for each
-        products = list(
-            map(
-                lambda permutation: MemoryParameterSet(
-                    MemoryParameterSetConfig(ctx=ctx, parameters=permutation)
-                ),
-                product(*list(gather.values())),
-            )
+        # Create the parameter set for each permutation as they are generated
+        products = map(
+            lambda permutation: MemoryParameterSet(
+                MemoryParameterSetConfig(ctx=ctx, parameters=list(permutation))
+            ),
+            permutations,
+        )
+        # Check if each permutation has been executed before, a chunk at a
+        # time so that we never hold all permutations in memory
+        chunk = list(itertools.islice(products, self.GATHER_CHUNK_SIZE))
+        while chunk:
+            async for parameter_set, taken in rctx.take_if_non_existant(
+                operation, *chunk
+            ):
+                # If taken then yield the permutation
+                if taken:
+                    yield parameter_set
+            chunk = list(itertools.islice(products, self.GATHER_CHUNK_SIZE))
+
+    async def _permutations(
+        self,
+        operation: Operation,
+        dataflow: DataFlow,
+        entry: MemoryInputNetworkContextEntry,
+    ) -> Optional[Iterator[Tuple[Parameter, ...]]]:
+        """
+        Generate all possible permutations of applicable inputs. Returns None
+        if there are no complete parameter sets. Called with ctxhd_lock held.
+        """
+        gather = await self._gather(operation, dataflow, entry)
+        if gather is None:
+            return
+        return product(*gather.values())
+
+    async def _gather(
+        self,
+        operation: Operation,
+        dataflow: DataFlow,
+        entry: MemoryInputNetworkContextEntry,
+    ) -> Optional[Dict[str, List[Parameter]]]:
+        """
+        Create a mapping of the operation's input names to all the parameters
+        within the context which could be used for that input. Returns None if
+        conditions are not met or a parameter set would be incomplete. Called
+        with ctxhd_lock held.
+        """
+        gather = await self._gather_inputs(operation, dataflow, entry)
+        if gather is None:
+            return
+        return {
+            input_name: [
+                self._parameter(operation, input_name, item)
+                for inputs in input_sources
+                for item in inputs
+            ]
+            for input_name, input_sources in gather.items()
+        }
+
+    @staticmethod
+    def _parameter(
+        operation: Operation, input_name: str, item: Input
+    ) -> Parameter:
+        return Parameter(
+            key=input_name,
+            value=item.value,
+            origin=item,
+            definition=operation.inputs[input_name],
         )
-        # Check if each permutation has been executed before
-        async for parameter_set, taken in rctx.take_if_non_existant(
-            operation, *products
-        ):
-            # If taken then yield the permutation
-            if taken:
-                yield parameter_set
+
+    async def _gather_inputs(
+        self,
+        operation: Operation,
+        dataflow: DataFlow,
+        entry: MemoryInputNetworkContextEntry,
+    ) -> Optional[Dict[str, List[List[Input]]]]:
+        """
+        Create a mapping of the operation's input names to lists of inputs
+        within the context which could be used for that input, one list for
+        each origin they could come from. The lists are in the order inputs
+        were added and must not be modified. Returns None if conditions are
+        not met or a parameter set would be incomplete. Called with
+        ctxhd_lock held.
+        """
+        gather: Dict[str, List[List[Input]]] = {}
+        # Ensure we were able to find a condition within the input
+        # network, and that when we found it it's value was True.
+        if not await self._check_conditions(operation, dataflow, entry):
+            return
+        # Grab the input flow to check for definition overrides
+        input_flow = dataflow.flow[operation.instance_name]
+        # Gather all inputs with matching definitions and contexts
+        for input_name, input_sources in input_flow.inputs.items():
+            gather[input_name] = []
+            # Names of alternate definitions for the input, which might have
+            # default values
+            alternate_definitions = []
+            for input_source in input_sources:
+                # Create a list of places this input originates from
+                origins = []
+                if isinstance(input_source, dict):
+                    for origin in input_source.items():
+                        origins.append(origin)
+                else:
+                    origins.append(input_source)
+                for origin in origins:
+                    # Check if the origin is a tuple where the first value is
+                    # the origin (such as "seed") and the second value is an
+                    # array of allowed alternate Definition's (their names)
+                    # within that origin. These definitions will be used
+                    # instead of the default one the input specified for the
+                    # operation).
+                    (
+                        origin_alternate_definitions,
+                        origin,
+                    ) = input_flow.get_alternate_definitions(origin)
+                    alternate_definitions.extend(origin_alternate_definitions)
+                    # Don't try to grab inputs from an origin that doesn't
+                    # have any to give us
+                    if not origin in entry.by_origin:
+                        continue
+                    if origin_alternate_definitions:
+                        definition_names = origin_alternate_definitions
+                    elif isinstance(origin, str):
+                        definition_names = [operation.inputs[input_name].name]
+                    else:
+                        definition_names = [
+                            dataflow.operations[origin[0]]
+                            .outputs[origin[1]]
+                            .name
+                        ]
+                    inputs = self._origin_inputs(
+                        entry, origin, definition_names
+                    )
+                    if inputs:
+                        gather[input_name].append(inputs)
+            # There is no data in the network for an input
+            if not gather[input_name]:
+                # Check if there is a default value for the parameter, if so
+                # use it. That default will either come from the definition
+                # attached to input_name, or it will come from one of the
+                # alternate definition given within the input flow for the
+                # input_name.
+                default = self._default_input(
+                    operation, dataflow, input_name, alternate_definitions
+                )
+                # If there is no default value, we don't have a complete
+                # paremeter set, so we bail out
+                if default is None:
+                    return
+                gather[input_name].append([default])
+        return gather
+
+    @staticmethod
+    def _default_input(
+        operation: Operation,
+        dataflow: DataFlow,
+        input_name: str,
+        alternate_definitions: List[str],
+    ) -> Optional[Input]:
+        """
+        Input holding the default value for an operation's input, or None if
+        neither its definition nor any of the alternate definitions have one.
+        The uid depends only on the operation instance and input name, so
+        default values are seen as the same input every time they are used.
+        """
+        check_for_default_value = [operation.inputs[input_name]] + [
+            dataflow.definitions[name]
+            for name in alternate_definitions
+            if name in dataflow.definitions
+        ]
+        for definition in check_for_default_value:
+            # Check if the definition has a default value that is not
+            # _NO_DEFAULT
+            if "dffml.df.types._NO_DEFAULT" not in repr(definition.default):
+                return Input(
+                    value=definition.default,
+                    definition=definition,
+                    origin="default",
+                    uid=f"{operation.instance_name}.{input_name}.default",
+                )
 
 
 @entrypoint("memory")
@@ -690,6 +831,152 @@ class MemoryInputNetwork(BaseInputNetwork, BaseMemoryDataFlowObject):
     CONFIG = MemoryInputNetworkConfig
 
 
+class MemoryIndexedInputNetworkContextEntry(NamedTuple):
+    ctx: BaseInputSetContext
+    definitions: Dict[Definition, List[Input]]
+    by_origin: Dict[Union[str, Tuple[str, str]], List[Input]]
+    # Inputs bucketed by their origin and the name of their definition
+    by_origin_definition: Dict[
+        Tuple[Union[str, Tuple[str, str]], str], List[Input]
+    ]
+    # Maps input uids to integers assigned in the order inputs were added
+    input_ids: Dict[str, int]
+    # Maps operation instance names to the number of inputs which had been
+    # added to the context the last time inputs were gathered for it
+    gathered: Dict[str, int]
+
+
+class MemoryIndexedInputNetworkContext(MemoryInputNetworkContext):
+    def _new_entry(
+        self, ctx: BaseInputSetContext
+    ) -> MemoryIndexedInputNetworkContextEntry:
+        return MemoryIndexedInputNetworkContextEntry(
+            ctx=ctx,
+            definitions={},
+            by_origin={},
+            by_origin_definition={},
+            input_ids={},
+            gathered={},
+        )
+
+    def _index_input(
+        self, entry: MemoryIndexedInputNetworkContextEntry, item: Input
+    ) -> None:
+        super()._index_input(entry, item)
+        entry.input_ids.setdefault(item.uid, len(entry.input_ids))
+        entry.by_origin_definition.setdefault(
+            (item.origin, item.definition.name), []
+        ).append(item)
+
+    def _origin_inputs(
+        self,
+        entry: MemoryIndexedInputNetworkContextEntry,
+        origin: Union[str, Tuple[str, str]],
+        definition_names: List[str],
+    ) -> List[Input]:
+        # With more than one possible definition we need the inputs in the
+        # order they were added across buckets, which the by origin list has
+        if len(definition_names) != 1:
+            return super()._origin_inputs(entry, origin, definition_names)
+        return entry.by_origin_definition.get(
+            (origin, definition_names[0]), []
+        )
+
+    async def _permutations(
+        self,
+        operation: Operation,
+        dataflow: DataFlow,
+        entry: MemoryIndexedInputNetworkContextEntry,
+    ) -> Optional[Iterator[Tuple[Parameter, ...]]]:
+        watermark = entry.gathered.get(operation.instance_name, None)
+        # If no inputs arrived since we last gathered, every permutation has
+        # already been through the redundancy checker
+        if watermark == len(entry.input_ids):
+            return
+        gather = await self._gather_inputs(operation, dataflow, entry)
+        if gather is None:
+            return
+        entry.gathered[operation.instance_name] = len(entry.input_ids)
+        # First time gathering for this operation, everything is new
+        if watermark is None:
+            watermark = -1
+        # Inputs are added to each list in the order they arrived. Find where
+        # the inputs added since we last gathered start within each list,
+        # looking only at the new ones.
+        splits: List[List[Tuple[List[Input], int]]] = []
+        for input_sources in gather.values():
+            splits.append([])
+            for inputs in input_sources:
+                split = len(inputs)
+                while (
+                    split
+                    and entry.input_ids.get(inputs[split - 1].uid, -1)
+                    >= watermark
+                ):
+                    split -= 1
+                splits[-1].append((inputs, split))
+        # If none of the inputs which could be used arrived since we last
+        # gathered, don't create parameters for the old ones
+        if not any(
+            split != len(inputs)
+            for input_sources in splits
+            for inputs, split in input_sources
+        ):
+            return
+        # Split parameters into those made from inputs we've already generated
+        # permutations with, and those made from inputs added since then
+        old: List[List[Parameter]] = []
+        new: List[List[Parameter]] = []
+        for input_name, input_sources in zip(gather, splits):
+            old.append([])
+            new.append([])
+            for inputs, split in input_sources:
+                old[-1].extend(
+                    self._parameter(operation, input_name, item)
+                    for item in inputs[:split]
+                )
+                new[-1].extend(
+                    self._parameter(operation, input_name, item)
+                    for item in inputs[split:]
+                )
+        return self._new_permutations(old, new)
+
+    @staticmethod
+    def _new_permutations(
+        old: List[List[Parameter]], new: List[List[Parameter]]
+    ) -> Iterator[Tuple[Parameter, ...]]:
+        """
+        Permutations which include at least one new parameter. Each is
+        generated exactly once, grouped by the position of the first new
+        parameter within it. Positions before that may only hold old
+        parameters, positions after it may hold either.
+        """
+        for i, new_parameters in enumerate(new):
+            if not new_parameters:
+                continue
+            yield from product(
+                *old[:i],
+                new_parameters,
+                *[
+                    old_parameters + later_new_parameters
+                    for old_parameters, later_new_parameters in zip(
+                        old[i + 1 :], new[i + 1 :]
+                    )
+                ],
+            )
+
+
+@entrypoint("memory_indexed")
+class MemoryIndexedInputNetwork(MemoryInputNetwork):
+    """
+    Inputs backed by a set, indexed by origin and definition. Only generates
+    permutations of inputs for an operation which include inputs that arrived
+    since the last time inputs were gathered for it.
+    """
+
+    CONTEXT = MemoryIndexedInputNetworkContext
+
+
 @config
 class MemoryOperationNetworkConfig:
     # Starting set of operations
@@ -754,12 +1041,30 @@ class MemoryRedundancyCheckerConfig:
     )
 
 
+class MemoryRedundancyCheckerContextEntry(NamedTuple):
+    # Interned integer ids of input uids seen within the context
+    input_ids: Dict[str, int]
+    # Operation instance names and sorted input ids of parameter sets taken
+    taken: Set[Tuple[str, Tuple[int, ...]]]
+
+
 class MemoryRedundancyCheckerContext(BaseRedundancyCheckerContext):
     def __init__(
         self, config: BaseConfig, parent: "MemoryRedundancyChecker"
     ) -> None:
         super().__init__(config, parent)
         self.kvctx = None
+        # Keys are kept in memory rather than being hashed and stored in the
+        # key value store when the key value store is itself in memory
+        self.in_memory = False
+        # Keys taken within each context
+        self.ctx_keys: Dict[str, Set[str]] = {}
+        self.ctx_taken: Dict[str, MemoryRedundancyCheckerContextEntry] = {}
+        # Hashes identifying inputs within each context, and the number of
+        # inputs seen within each context which would otherwise have the same
+        # hash
+        self.ctx_input_hashes: Dict[str, Dict[str, str]] = {}
+        self.ctx_input_occurrences: Dict[str, Dict[str, int]] = {}
 
     async def __aenter__(self) -> "MemoryRedundancyCheckerContext":
         self.__stack = AsyncExitStack()
@@ -767,6 +1072,7 @@ class MemoryRedundancyCheckerContext(BaseRedundancyCheckerContext):
         self.kvctx = await self.__stack.enter_async_context(
             self.parent.kvstore()
         )
+        self.in_memory = isinstance(self.parent.kvstore, MemoryKeyValueStore)
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
@@ -781,87 +1087,197 @@ class MemoryRedundancyCheckerContext(BaseRedundancyCheckerContext):
         uid_list = [instance_name, handle] + sorted(uids)
         return hashlib.sha384("".join(uid_list).encode("utf-8")).hexdigest()
 
+    def _input_hash(
+        self,
+        input_hashes: Dict[str, str],
+        occurrences: Dict[str, int],
+        item: Input,
+    ) -> str:
+        """
+        Hash identifying an input which is the same across runs. Made from
+        the input's definition name, origin, value, and the hashes of its
+        parents. Inputs within a context which would have the same hash are
+        told apart by the order they were seen in.
+        """
+        if item.uid in input_hashes:
+            return input_hashes[item.uid]
+        try:
+            input_hash = stable_hash(
+                item.definition.name,
+                item.origin,
+                item.value,
+                [
+                    self._input_hash(input_hashes, occurrences, parent)
+                    for parent in item.parents
+                ],
+            )
+        except TypeError:
+            # Parameter sets including inputs which can't be hashed the same
+            # way across runs are run again after a restart
+            input_hash = item.uid
+        occurrence = occurrences.get(input_hash, 0)
+        occurrences[input_hash] = occurrence + 1
+        if occurrence:
+            input_hash = stable_hash(input_hash, occurrence)
+        input_hashes[item.uid] = input_hash
+        return input_hash
+
     async def unique(
         self, operation: Operation, parameter_set: BaseParameterSet
     ) -> str:
         """
         SHA384 hash of the parameter set context handle as a string, the
-        operation.instance_name, and the sorted list of input uuids.
+        operation.instance_name, and the sorted list of hashes identifying
+        each input.
+
+        Input uuids are random, hashing input definitions, origins, values,
+        and parents instead means keys are the same across runs, so that
+        parameter sets stored in a persistent key value store are not run
+        again after a restart.
         """
+        handle_string = (await parameter_set.ctx.handle()).as_string()
+        # Hash each input once, rather than once per permutation
+        input_hashes = self.ctx_input_hashes.setdefault(handle_string, {})
+        occurrences = self.ctx_input_occurrences.setdefault(handle_string, {})
         return self._unique(
             operation.instance_name,
-            (await parameter_set.ctx.handle()).as_string(),
-            *[item.origin.uid async for item in parameter_set.parameters()],
+            handle_string,
+            *[
+                self._input_hash(input_hashes, occurrences, item.origin)
+                async for item in parameter_set.parameters()
+            ],
+        )
+
+    async def _take(
+        self,
+        handle_string: str,
+        operation: Operation,
+        parameter_set: BaseParameterSet,
+    ) -> bool:
+        # Keys are only written to the key value store once the operation
+        # completes, so that operations which were running when the
+        # orchestrator exited are run again after a restart
+        key = await self.unique(operation, parameter_set)
+        keys = self.ctx_keys.setdefault(handle_string, set())
+        if key in keys:
+            return False
+        keys.add(key)
+        return True
+
+    async def _take_in_memory(
+        self,
+        handle_string: str,
+        operation: Operation,
+        parameter_set: BaseParameterSet,
+    ) -> bool:
+        entry = self.ctx_taken.get(handle_string, None)
+        if entry is None:
+            entry = MemoryRedundancyCheckerContextEntry(
+                input_ids={}, taken=set()
+            )
+            self.ctx_taken[handle_string] = entry
+        input_ids = entry.input_ids
+        key = (
+            operation.instance_name,
+            tuple(
+                sorted(
+                    [
+                        input_ids.setdefault(item.origin.uid, len(input_ids))
+                        async for item in parameter_set.parameters()
+                    ]
+                )
+            ),
+        )
+        # No await between checking for and adding the key, so there's no
+        # need for a lock
+        if key in entry.taken:
+            return False
+        entry.taken.add(key)
+        return True
+
+    async def replay(
+        self, operation: Operation, parameter_set: BaseParameterSet
+    ) -> Optional[List[Dict[str, Any]]]:
+        if self.in_memory:
+            return
+        stored = await self.kvctx.get(
+            await self.unique(operation, parameter_set)
         )
+        if stored is None:
+            return
+        return pickle.loads(stored)
 
-    async def _take(self, coro) -> bool:
-        return await self.kvctx.conditional_set(
-            await coro, "\x01", checker=lambda value: value != "\x01"
+    async def completed(
+        self,
+        operation: Operation,
+        parameter_set: BaseParameterSet,
+        outputs: List[Dict[str, Any]],
+    ) -> None:
+        if self.in_memory:
+            return
+        try:
+            stored = pickle.dumps(outputs)
+        except (pickle.PicklingError, TypeError, AttributeError) as error:
+            self.logger.debug(
+                "Not storing outputs of %s: %s",
+                operation.instance_name,
+                error,
+            )
+            return
+        await self.kvctx.set(
+            await self.unique(operation, parameter_set), stored
         )
 
+    async def evict(self, ctx: BaseInputSetContext) -> None:
+        handle_string = (await ctx.handle()).as_string()
+        self.ctx_taken.pop(handle_string, None)
+        self.ctx_input_hashes.pop(handle_string, None)
+        self.ctx_input_occurrences.pop(handle_string, None)
+        await self.kvctx.evict(*self.ctx_keys.pop(handle_string, ()))
+
     async def take_if_non_existant(
         self, operation: Operation, *parameter_sets: BaseParameterSet
     ) -> bool:
-        # TODO(p4) Run tests to choose an optimal threaded vs non-threaded value
-        if len(parameter_sets) < 4:
-            for parameter_set in parameter_sets:
-                yield parameter_set, await self._take(
-                    self.unique(operation, parameter_set)
-                )
-        else:
-            async for parameter_set, taken in concurrently(
-                {
-                    asyncio.create_task(
-                        self._take(
-                            self.parent.loop.run_in_executor(
-                                self.parent.pool,
-                                self._unique,
-                                operation.instance_name,
-                                (await parameter_set.ctx.handle()).as_string(),
-                                *[
-                                    item.origin.uid
-                                    async for item in parameter_set.parameters()
-                                ],
-                            )
-                        )
-                    ): parameter_set
-                    for parameter_set in parameter_sets
-                }
-            ):
-                yield parameter_set, taken
+        take = self._take_in_memory if self.in_memory else self._take
+        ctx = None
+        for parameter_set in parameter_sets:
+            # Parameter sets are usually all from the same context
+            if parameter_set.ctx is not ctx:
+                ctx = parameter_set.ctx
+                handle_string = (await ctx.handle()).as_string()
+            yield parameter_set, await take(
+                handle_string, operation, parameter_set
+            )
 
 
 @entrypoint("memory")
 class MemoryRedundancyChecker(BaseRedundancyChecker, BaseMemoryDataFlowObject):
     """
     Redundancy Checker backed by Memory Key Value Store
+
+    If the key value store is a :py:class:`MemoryKeyValueStore`, keys are
+    kept as tuples of the operation instance name and interned integer ids of
+    the inputs. Otherwise keys are hashed from the context handle, operation
+    instance name, and input definitions, origins, values and parents. When
+    an operation completes its outputs are stored in the key value store
+    under the key. With a persistent key value store, such as
+    :py:class:`SqliteKeyValueStore <dffml.df.sqlite.SqliteKeyValueStore>`,
+    parameter sets run before a restart are not run again, their stored
+    outputs are added to the input network instead.
     """
 
     CONTEXT = MemoryRedundancyCheckerContext
     CONFIG = MemoryRedundancyCheckerConfig
 
-    def __init__(self, config):
-        super().__init__(config)
-        self.loop = None
-        self.pool = None
-        self.__pool = None
-
     async def __aenter__(self) -> "MemoryRedundancyCheckerContext":
         self.__stack = AsyncExitStack()
-        self.__exit_stack = ExitStack()
-        self.__exit_stack.__enter__()
         await self.__stack.__aenter__()
         self.kvstore = await self.__stack.enter_async_context(
             self.config.kvstore
         )
-        self.loop = asyncio.get_event_loop()
-        self.pool = self.__exit_stack.enter_context(
-            concurrent.futures.ThreadPoolExecutor()
-        )
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
-        self.__exit_stack.__exit__(exc_type, exc_value, traceback)
         await self.__stack.__aexit__(exc_type, exc_value, traceback)
 
 
@@ -877,6 +1293,11 @@ class MemoryLockNetworkContext(BaseLockNetworkContext):
         super().__init__(config, parent)
         self.lock = asyncio.Lock()
         self.locks: Dict[str, asyncio.Lock] = {}
+        # Input uids of locks used within each context, and the contexts
+        # each lock has been used within. An input may be used within more than
+        # one context if it was forwarded from a parent flow.
+        self.ctx_locks: Dict[str, Set[str]] = {}
+        self.lock_ctxs: Dict[str, Set[str]] = {}
 
     @asynccontextmanager
     async def acquire(self, parameter_set: BaseParameterSet):
@@ -885,6 +1306,7 @@ class MemoryLockNetworkContext(BaseLockNetworkContext):
         prior to running an operation using the input.
         """
         need_lock = {}
+        handle_string = (await parameter_set.ctx.handle()).as_string()
         # Acquire the master lock to find and or create needed locks
         async with self.lock:
             # Get all the inputs up the ancestry tree
@@ -897,6 +1319,9 @@ class MemoryLockNetworkContext(BaseLockNetworkContext):
                 # Create the lock for the input if not present
                 if not item.uid in self.locks:
                     self.locks[item.uid] = asyncio.Lock()
+                # Track the contexts the lock is used within
+                self.ctx_locks.setdefault(handle_string, set()).add(item.uid)
+                self.lock_ctxs.setdefault(item.uid, set()).add(handle_string)
                 # Retrieve the lock
                 need_lock[item.uid] = (item, self.locks[item.uid])
         # Use AsyncExitStack to lock the variable amount of inputs required
@@ -910,6 +1335,16 @@ class MemoryLockNetworkContext(BaseLockNetworkContext):
             # All locks for these parameters have been acquired
             yield
 
+    async def evict(self, ctx: BaseInputSetContext) -> None:
+        handle_string = (await ctx.handle()).as_string()
+        async with self.lock:
+            for uid in self.ctx_locks.pop(handle_string, set()):
+                self.lock_ctxs[uid].discard(handle_string)
+                # Only remove the lock if no other context uses it
+                if not self.lock_ctxs[uid]:
+                    del self.lock_ctxs[uid]
+                    del self.locks[uid]
+
 
 @entrypoint("memory")
 class MemoryLockNetwork(BaseLockNetwork, BaseMemoryDataFlowObject):
@@ -924,6 +1359,30 @@ class MemoryOperationImplementationNetworkConfig:
         "Operation implementations to load on initialization",
         default_factory=lambda: {},
     )
+    max_operations: int = field(
+        "Maximum number of operations to run at the same time within an "
+        "orchestrator context, no limit if not given",
+        default=None,
+    )
+    max_operations_by_instance: Dict[str, int] = field(
+        "Maximum number of operations to run at the same time for each "
+        "operation instance name given",
+        default_factory=lambda: {},
+    )
+    executor: str = field(
+        "Where to run operations which are not async functions, unless the "
+        "operation specifies otherwise. One of inline, thread, or process",
+        default="inline",
+    )
+    max_workers: int = field(
+        "Maximum number of threads or processes in each pool used to run "
+        "operations which are not async functions",
+        default=None,
+    )
+    cache: BaseKeyValueStore = field(
+        "Key value store to cache outputs of operations which have cache set",
+        default_factory=lambda: MemoryKeyValueStore(max_size=1024),
+    )
 
 
 class MemoryOperationImplementationNetworkContext(
@@ -938,12 +1397,33 @@ class MemoryOperationImplementationNetworkContext(
         self.opimps = self.parent.config.operations
         self.operations = {}
         self.completed_event = asyncio.Event()
+        # Operations wait for a slot before running. When a slot frees up it
+        # goes to operations within the context which dispatched first, so
+        # that older contexts complete (and free their memory) before newer
+        # ones.
+        self.slots = PrioritySemaphore(self.parent.config.max_operations)
+        self.slots_by_instance = {}
+        for (
+            instance_name,
+            max_operations,
+        ) in self.parent.config.max_operations_by_instance.items():
+            self.slots_by_instance[instance_name] = PrioritySemaphore(
+                max_operations
+            )
+        self.priorities: Dict[str, int] = {}
+        # Priorities only ever increase, so that contexts created after others
+        # were evicted still come after those which are running
+        self.priority_counter = itertools.count()
+        self.cachectx = None
 
     async def __aenter__(
         self,
     ) -> "MemoryOperationImplementationNetworkContext":
         self._stack = AsyncExitStack()
         await self._stack.__aenter__()
+        self.cachectx = await self._stack.enter_async_context(
+            self.parent.cache()
+        )
         self.operations = {
             opimp.op.name: await self._stack.enter_async_context(opimp)
             for opimp in self.opimps.values()
@@ -1030,6 +1510,33 @@ class MemoryOperationImplementationNetworkContext(
         """
         # Check that our network contains the operation
         await self.ensure_contains(operation)
+        # Use cached outputs if the operation was already run with the same
+        # input values
+        cache_key = None
+        if operation.cache:
+            # Instances of the operation with different configs may give
+            # different outputs for the same inputs
+            try:
+                cache_key = stable_hash(
+                    operation.name,
+                    operation.version,
+                    operation.instance_name,
+                    self.operations[operation.instance_name].config,
+                    inputs,
+                )
+            except TypeError as error:
+                self.logger.debug(
+                    "Not caching outputs of %s: %s",
+                    operation.instance_name,
+                    error,
+                )
+            else:
+                cached = await self.cachectx.get(cache_key)
+                if cached is not None:
+                    self.logger.debug(
+                        "Cached outputs used for %s", operation.instance_name
+                    )
+                    return pickle.loads(cached)
         # Create an opimp context and run the opertion
         async with self.operations[operation.instance_name](
             ctx, octx
@@ -1068,12 +1575,60 @@ class MemoryOperationImplementationNetworkContext(
                 else (str_outputs[:512] + "..."),
             )
             self.logger.debug("---")
-            return outputs
+        if cache_key is not None and not inspect.isasyncgen(outputs):
+            try:
+                await self.cachectx.set(cache_key, pickle.dumps(outputs))
+            except (pickle.PicklingError, TypeError, AttributeError) as error:
+                self.logger.debug(
+                    "Not caching outputs of %s: %s",
+                    operation.instance_name,
+                    error,
+                )
+        return outputs
 
     async def operation_completed(self):
         await self.completed_event.wait()
         self.completed_event.clear()
 
+    async def evict(self, ctx: BaseInputSetContext) -> None:
+        self.priorities.pop((await ctx.handle()).as_string(), None)
+
+    async def run_in_executor(
+        self,
+        executor: Optional[str],
+        func: Callable[..., Any],
+        inputs: Dict[str, Any],
+    ) -> Any:
+        if executor is None:
+            executor = self.parent.config.executor
+        if executor == "inline":
+            return func(**inputs)
+        return await asyncio.get_event_loop().run_in_executor(
+            self.parent.pool(executor), functools.partial(func, **inputs)
+        )
+
+    @asynccontextmanager
+    async def slot(self, operation: Operation, ctx: BaseInputSetContext):
+        """
+        Wait until the operation is allowed to run given the configured limits
+        """
+        handle_string = (await ctx.handle()).as_string()
+        priority = self.priorities.get(handle_string, None)
+        if priority is None:
+            priority = next(self.priority_counter)
+            self.priorities[handle_string] = priority
+        async with AsyncExitStack() as stack:
+            # Wait for the instance's slot first so that we don't hold one of
+            # the overall slots while we wait
+            if operation.instance_name in self.slots_by_instance:
+                await stack.enter_async_context(
+                    self.slots_by_instance[operation.instance_name](
+                        priority=priority
+                    )
+                )
+            await stack.enter_async_context(self.slots(priority=priority))
+            yield
+
     async def run_dispatch(
         self,
         octx: BaseOrchestratorContext,
@@ -1085,25 +1640,48 @@ class MemoryOperationImplementationNetworkContext(
         Run an operation in the background and add its outputs to the input
         network when complete
         """
+        async with self.slot(operation, parameter_set.ctx):
+            await self._run_dispatch(octx, operation, parameter_set, set_valid)
+
+    async def _run_dispatch(
+        self,
+        octx: BaseOrchestratorContext,
+        operation: Operation,
+        parameter_set: BaseParameterSet,
+        set_valid: bool,
+    ):
         # Ensure that we can run the operation
         # Lock all inputs which cannot be used simultaneously
         async with octx.lctx.acquire(parameter_set):
-            # Run the operation
-            outputs = await self.run(
-                parameter_set.ctx,
-                octx,
-                operation,
-                await parameter_set._asdict(),
-            )
-            if outputs is None:
-                return
+            # Use the outputs from when the operation was run with the
+            # parameter set before a restart, if it was
+            replayed = await octx.rctx.replay(operation, parameter_set)
+            if replayed is not None:
+                outputs = replayed
+            else:
+                # Run the operation
+                outputs = await self.run(
+                    parameter_set.ctx,
+                    octx,
+                    operation,
+                    await parameter_set._asdict(),
+                )
+                if outputs is None:
+                    outputs = []
+                elif not inspect.isasyncgen(outputs):
+                    outputs = [outputs]
             if not inspect.isasyncgen(outputs):
 
                 async def to_async_gen(x):
-                    yield x
+                    for an_output in x:
+                        yield an_output
 
                 outputs = to_async_gen(outputs)
+        # All outputs, given to the redundancy checker once the operation
+        # completes
+        completed_outputs = []
         async for an_output in outputs:
+            completed_outputs.append(an_output)
             # Create a list of inputs from the outputs using the definition mapping
             try:
                 inputs = []
@@ -1141,6 +1719,10 @@ class MemoryOperationImplementationNetworkContext(
                     MemoryInputSetConfig(ctx=parameter_set.ctx, inputs=inputs)
                 )
             )
+        if replayed is None:
+            await octx.rctx.completed(
+                operation, parameter_set, completed_outputs
+            )
 
     async def dispatch(
         self,
@@ -1167,6 +1749,42 @@ class MemoryOperationImplementationNetwork(
     CONTEXT = MemoryOperationImplementationNetworkContext
     CONFIG = MemoryOperationImplementationNetworkConfig
 
+    def __init__(self, config: BaseConfig) -> None:
+        super().__init__(config)
+        self.pools: Dict[str, concurrent.futures.Executor] = {}
+        self.cache = None
+
+    def pool(self, executor: str) -> concurrent.futures.Executor:
+        """
+        Thread or process pool for running functions which are not async.
+        Created the first time it's needed.
+        """
+        if not executor in self.pools:
+            if executor == "thread":
+                pool_cls = concurrent.futures.ThreadPoolExecutor
+            elif executor == "process":
+                pool_cls = concurrent.futures.ProcessPoolExecutor
+            else:
+                raise ValueError(
+                    f"executor must be thread or process, got {executor!r}"
+                )
+            self.pools[executor] = pool_cls(
+                max_workers=self.config.max_workers
+            )
+        return self.pools[executor]
+
+    async def __aenter__(self) -> "MemoryOperationImplementationNetwork":
+        self._stack = AsyncExitStack()
+        await self._stack.__aenter__()
+        self.cache = await self._stack.enter_async_context(self.config.cache)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        for pool in self.pools.values():
+            pool.shutdown()
+        self.pools = {}
+        await self._stack.__aexit__(exc_type, exc_value, traceback)
+
 
 @config
 class MemoryOrchestratorConfig:
@@ -1188,6 +1806,17 @@ class MemoryOrchestratorConfig:
         "Redundancy checker to use",
         default_factory=lambda: MemoryRedundancyChecker(),
     )
+    max_ctxs: int = field(
+        "Maximum number of contexts to run operations for at the same time "
+        "within a call to run, no limit if not given",
+        default=None,
+    )
+    retain_ctxs: int = field(
+        "Number of most recently completed contexts to keep inputs, "
+        "redundancy checker keys, and locks for. Completed contexts beyond "
+        "this are evicted to reclaim their memory",
+        default=0,
+    )
 
 
 @config
@@ -1209,6 +1838,12 @@ class MemoryOrchestratorContext(BaseOrchestratorContext):
         self._stack = None
         # Maps instance_name to OrchestratorContext
         self.subflows = {}
+        # Number of tasks running operations for each context
+        self.running_ctxs: Dict[str, int] = {}
+        # Completed contexts which have not yet been evicted, oldest first
+        self.retained: Dict[
+            str, BaseInputSetContext
+        ] = collections.OrderedDict()
 
     async def __aenter__(self) -> "BaseOrchestratorContext":
         # TODO(subflows) In all of these contexts we are about to enter, they
@@ -1368,10 +2003,7 @@ class MemoryOrchestratorContext(BaseOrchestratorContext):
                 ].ictx.receive_from_parent_flow(inputs)
 
     # TODO(dfass) Get rid of run_operations, make it run_dataflow. Pass down the
-    # dataflow to everything. Make inputs a list of InputSets or an
-    # asyncgenerator of InputSets. Add a parameter which tells us if we should
-    # exit when all operations are complete or continue to wait for more inputs
-    # from the asyncgenerator. Make that parameter an asyncio.Event
+    # dataflow to everything.
     async def run(
         self,
         *input_sets: Union[List[Input], BaseInputSet],
@@ -1381,39 +2013,35 @@ class MemoryOrchestratorContext(BaseOrchestratorContext):
     ) -> AsyncIterator[Tuple[BaseContextHandle, Dict[str, Any]]]:
         """
         Run a DataFlow.
+
+        If the only input set given is an async generator, each item it yields
+        is treated as if it had been given as an input set (a list of inputs,
+        an input set, or a dict mapping contexts to lists of inputs). Contexts
+        are created as items are yielded, and their results are yielded as
+        they complete. Items are only requested from the generator when
+        there's room to start another context (see ``max_ctxs``). Running
+        stops once the generator is exhausted, or ``halt`` is set, and all
+        started contexts have completed.
         """
-        # Lists of contexts we care about for this dataflow
-        ctxs: List[BaseInputSetContext] = []
+        # Coroutines which seed the contexts we care about for this dataflow.
+        # Contexts are seeded as they are started so that we don't fill the
+        # input network with contexts we aren't yet running operations for
+        seeds: Deque[Awaitable[BaseInputSetContext]] = collections.deque()
+        # Async generator we are receiving input sets from, if any
+        input_set_generator = None
         self.logger.debug("Running %s: %s", self.config.dataflow, input_sets)
         if not input_sets:
             # If there are no input sets, add only seed inputs
-            ctxs.append(await self.seed_inputs(ctx=ctx))
+            seeds.append(self.seed_inputs(ctx=ctx))
             await self.forward_inputs_to_subflow(self.config.dataflow.seed)
-        if len(input_sets) == 1 and inspect.isasyncgen(input_sets[0]):
-            # Check if inputs is an asyncgenerator
-            # If it is, start a coroutine to wait for new inputs or input sets
-            # from it. When new inputs are received, add the seed inputs from
-            # the dataflow to the context.
-            # TODO(dfass) Grab inputs from asyncgen, combine with seed
-            raise NotImplementedError("asyncgen not yet supported")
-        elif len(input_sets) == 1 and isinstance(input_sets[0], dict):
-            # Helper to quickly add inputs under string context
-            for ctx_string, input_set in input_sets[0].items():
-                await self.forward_inputs_to_subflow(input_set)
-                ctxs.append(
-                    await self.seed_inputs(
-                        ctx=StringInputSetContext(ctx_string)
-                        if isinstance(ctx_string, str)
-                        else ctx_string,
-                        input_set=input_set,
-                    )
-                )
+        elif len(input_sets) == 1 and inspect.isasyncgen(input_sets[0]):
+            # Input sets will be added as the asyncgenerator yields them
+            input_set_generator = input_sets[0]
         else:
-            # For inputs sets that are of type BaseInputSetContext or list
+            # For inputs sets that are of type BaseInputSetContext, list, or
+            # dict
             for input_set in input_sets:
-                ctxs.append(
-                    await self.seed_inputs(ctx=ctx, input_set=input_set)
-                )
+                seeds.extend(await self.input_set_seeds(input_set, ctx=ctx))
         # TODO Add check that ctx returned is the ctx corresponding to uadd.
         # We'll have to make uadd return the ctx so we can compare.
         # TODO Send the context back into some list maintained by
@@ -1422,48 +2050,106 @@ class MemoryOrchestratorContext(BaseOrchestratorContext):
         # it's waiting for and return
         # BEGIN old run_operations
         # Set of tasks we are waiting on
-        # TODO Make some way to cap the number of context's who have operations
-        # executing. Or maybe just the number of operations. Or both.
         tasks = set()
-        # Create tasks to wait on the results of each of the contexts submitted
-        for ctx in ctxs:
-            self.logger.debug(
-                "kickstarting context: %s", (await ctx.handle()).as_string()
-            )
-            tasks.add(
-                asyncio.create_task(
-                    self.run_operations_for_ctx(ctx, strict=strict)
-                )
-            )
+        # Task waiting on the next input set from the asyncgenerator
+        next_input_set = None
+        # Task waiting on the halt event
+        halted = None
+        if input_set_generator is not None and halt is not None:
+            halted = asyncio.create_task(halt.wait())
         try:
-            # Return when outstanding operations reaches zero
-            while tasks:
+            # Return when outstanding operations reaches zero and there are no
+            # more input sets coming
+            while True:
+                # Create tasks to wait on the results of each of the contexts
+                # submitted, without going over the maximum number of contexts
+                # allowed to run at the same time
+                while seeds and self.room_for_ctx(tasks):
+                    seeded_ctx = await seeds.popleft()
+                    self.logger.debug(
+                        "kickstarting context: %s",
+                        (await seeded_ctx.handle()).as_string(),
+                    )
+                    task = asyncio.create_task(
+                        self.run_operations_for_ctx(seeded_ctx, strict=strict)
+                    )
+                    task.ctx = seeded_ctx
+                    await self.ctx_started(seeded_ctx)
+                    tasks.add(task)
+                # Ask for another input set if we would be able to start it
+                if (
+                    input_set_generator is not None
+                    and next_input_set is None
+                    and not seeds
+                    and self.room_for_ctx(tasks)
+                ):
+                    next_input_set = asyncio.create_task(
+                        input_set_generator.__anext__()
+                    )
+                if not tasks and next_input_set is None:
+                    break
                 # Wait for incoming events
                 done, _pending = await asyncio.wait(
-                    tasks, return_when=asyncio.FIRST_COMPLETED
+                    set(filter(None, [next_input_set, halted, *tasks])),
+                    return_when=asyncio.FIRST_COMPLETED,
                 )
-
-                for task in done:
+                if next_input_set in done:
+                    try:
+                        input_set = next_input_set.result()
+                    except StopAsyncIteration:
+                        input_set_generator = None
+                    else:
+                        seeds.extend(
+                            await self.input_set_seeds(input_set, ctx=ctx)
+                        )
+                    next_input_set = None
+                if halted in done:
+                    self.logger.debug("Halted, no longer accepting input sets")
+                    halted = None
+                    await self.close_input_set_generator(
+                        input_set_generator, next_input_set
+                    )
+                    input_set_generator = None
+                    next_input_set = None
+                    # Don't start contexts we haven't already
+                    for seed in seeds:
+                        seed.close()
+                    seeds.clear()
+
+                for task in done.intersection(tasks):
                     # Remove the task from the set of tasks we are waiting for
                     tasks.remove(task)
-                    # Get the tasks exception if any
-                    exception = task.exception()
-                    if strict and exception is not None:
-                        raise exception
-                    elif exception is not None:
-                        # If there was an exception log it
-                        output = io.StringIO()
-                        task.print_stack(file=output)
-                        self.logger.error("%s", output.getvalue().rstrip())
-                        output.close()
-                    else:
-                        # All operations for a context completed
-                        # Yield the context that completed and the results of its
-                        # output operations
-                        ctx, results = task.result()
-                        yield ctx, results
+                    try:
+                        # Get the tasks exception if any
+                        exception = task.exception()
+                        if strict and exception is not None:
+                            raise exception
+                        elif exception is not None:
+                            # If there was an exception log it
+                            output = io.StringIO()
+                            task.print_stack(file=output)
+                            self.logger.error("%s", output.getvalue().rstrip())
+                            output.close()
+                        else:
+                            # All operations for a context completed
+                            # Yield the context that completed and the results
+                            # of its output operations
+                            completed_ctx, results = task.result()
+                            yield completed_ctx, results
+                    finally:
+                        # Reclaim memory used by contexts no longer needed,
+                        # even if the caller stopped iterating over results
+                        await self.ctx_completed(task.ctx)
                 self.logger.debug("ctx.outstanding: %d", len(tasks) - 1)
         finally:
+            if halted is not None:
+                halted.cancel()
+            await self.close_input_set_generator(
+                input_set_generator, next_input_set
+            )
+            # Close the coroutines for contexts we never seeded
+            for seed in seeds:
+                seed.close()
             # Cancel tasks which we don't need anymore now that we know we are done
             for task in tasks:
                 if not task.done():
@@ -1471,6 +2157,97 @@ class MemoryOrchestratorContext(BaseOrchestratorContext):
                 else:
                     task.exception()
 
+    async def ctx_started(self, ctx: BaseInputSetContext) -> None:
+        """
+        Record that operations are being run for a context
+        """
+        handle_string = (await ctx.handle()).as_string()
+        self.running_ctxs[handle_string] = (
+            self.running_ctxs.get(handle_string, 0) + 1
+        )
+        # A context being run again is no longer a candidate for eviction
+        self.retained.pop(handle_string, None)
+
+    async def ctx_completed(self, ctx: BaseInputSetContext) -> None:
+        """
+        Record that operations have finished being run for a context. Once no
+        more operations are being run for it the context is retained until
+        there are more than ``retain_ctxs`` completed contexts, at which point
+        the oldest are evicted from each network.
+        """
+        handle_string = (await ctx.handle()).as_string()
+        self.running_ctxs[handle_string] -= 1
+        if self.running_ctxs[handle_string]:
+            return
+        del self.running_ctxs[handle_string]
+        self.retained[handle_string] = ctx
+        while len(self.retained) > self.parent.config.retain_ctxs:
+            _handle_string, evict_ctx = self.retained.popitem(last=False)
+            await self.evict(evict_ctx)
+
+    async def evict(self, ctx: BaseInputSetContext) -> None:
+        """
+        Remove all data associated with a context from each network
+        """
+        self.logger.debug(
+            "evicting context: %s", (await ctx.handle()).as_string()
+        )
+        for network_ctx in [self.ictx, self.rctx, self.lctx, self.nctx]:
+            await network_ctx.evict(ctx)
+
+    def room_for_ctx(self, tasks: Set[asyncio.Task]) -> bool:
+        """
+        Check if we are allowed to start running another context
+        """
+        return (
+            self.parent.config.max_ctxs is None
+            or len(tasks) < self.parent.config.max_ctxs
+        )
+
+    async def input_set_seeds(
+        self,
+        input_set: Union[List[Input], BaseInputSet, Dict[str, List[Input]]],
+        *,
+        ctx: Optional[BaseInputSetContext] = None,
+    ) -> List[Awaitable[BaseInputSetContext]]:
+        """
+        Coroutines which will seed the input network with the input set (or
+        input sets if it's a dict mapping contexts to lists of inputs) when
+        awaited.
+        """
+        if not isinstance(input_set, dict):
+            return [self.seed_inputs(ctx=ctx, input_set=input_set)]
+        # Helper to quickly add inputs under string context
+        seeds = []
+        for ctx_string, inputs in input_set.items():
+            await self.forward_inputs_to_subflow(inputs)
+            seeds.append(
+                self.seed_inputs(
+                    ctx=StringInputSetContext(ctx_string)
+                    if isinstance(ctx_string, str)
+                    else ctx_string,
+                    input_set=inputs,
+                )
+            )
+        return seeds
+
+    async def close_input_set_generator(
+        self,
+        input_set_generator: Optional[AsyncIterator],
+        next_input_set: Optional[asyncio.Task],
+    ) -> None:
+        """
+        Stop waiting on an asyncgenerator of input sets and close it
+        """
+        if next_input_set is not None:
+            next_input_set.cancel()
+            try:
+                await next_input_set
+            except (asyncio.CancelledError, StopAsyncIteration):
+                pass
+        if input_set_generator is not None:
+            await input_set_generator.aclose()
+
     async def operations_parameter_set_pairs(
         self,
         ctx: BaseInputSetContext,
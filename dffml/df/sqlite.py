@@ -0,0 +1,157 @@
+"""
+Key value store persisted to an SQLite database. Used as the key value store
+of the redundancy checker so that parameter sets which have already been run
+are not run again when a dataflow is restarted.
+"""
+import asyncio
+from typing import Dict, Union, Callable, Optional
+
+from .base import BaseKeyValueStoreContext, BaseKeyValueStore
+from ..base import config, field
+from ..db.sqlite import SqliteDatabase, SqliteDatabaseConfig
+from ..util.entrypoint import entrypoint
+
+
+@config
+class SqliteKeyValueStoreConfig:
+    filename: str = field("Path to SQLite database file")
+    table_name: str = field(
+        "Table to store keys and values in", default="kvstore"
+    )
+    batch_size: int = field(
+        "Number of writes to buffer before committing them to the database",
+        default=128,
+    )
+    journal_mode: str = field(
+        "SQLite journal mode. Write-ahead logging lets readers and writers "
+        "proceed concurrently and makes commits cheaper",
+        default="WAL",
+    )
+
+
+class SqliteKeyValueStoreContext(BaseKeyValueStoreContext):
+    async def get(self, key: str) -> Union[bytes, None]:
+        async with self.parent.lock:
+            return await self.parent.get(key)
+
+    async def set(self, key: str, value: bytes):
+        async with self.parent.lock:
+            await self.parent.set(key, value)
+
+    async def conditional_set(
+        self,
+        key: str,
+        value,
+        *,
+        checker: Optional[Callable[[bytes], bool]] = lambda value: value
+        is not None,
+    ) -> bool:
+        async with self.parent.lock:
+            if checker(await self.parent.get(key)):
+                await self.parent.set(key, value)
+                return True
+        return False
+
+
+@entrypoint("sqlite")
+class SqliteKeyValueStore(BaseKeyValueStore):
+    """
+    Key value store backed by an SQLite database. Writes are buffered and
+    committed in batches of ``batch_size``, and when the store is exited.
+
+    Keys are never evicted, so when used as the key value store of the
+    redundancy checker, a restarted dataflow skips operations which already
+    completed with a parameter set, using the outputs they were stored with.
+    Operations which completed after the last commit are run again.
+
+    >>> import asyncio
+    >>> from dffml import *
+    >>>
+    >>> async def main():
+    ...     async with SqliteKeyValueStore(filename="kvstore.db") as kvstore:
+    ...         async with kvstore() as kvctx:
+    ...             await kvctx.set("feed", b"face")
+    ...     async with SqliteKeyValueStore(filename="kvstore.db") as kvstore:
+    ...         async with kvstore() as kvctx:
+    ...             print(await kvctx.get("feed"))
+    >>>
+    >>> asyncio.run(main())
+    b'face'
+    """
+
+    CONTEXT = SqliteKeyValueStoreContext
+    CONFIG = SqliteKeyValueStoreConfig
+
+    def __init__(self, config: SqliteKeyValueStoreConfig) -> None:
+        super().__init__(config)
+        self.lock = None
+        self.db = None
+        # Writes which have not yet been committed
+        self.pending: Dict[str, bytes] = {}
+
+    def __call__(self) -> SqliteKeyValueStoreContext:
+        return self.CONTEXT(self.config, self)
+
+    async def __aenter__(self) -> "SqliteKeyValueStore":
+        # Contexts share buffered writes, so they share a lock
+        self.lock = asyncio.Lock()
+        self.db = await SqliteDatabase(
+            SqliteDatabaseConfig(
+                filename=self.config.filename,
+                journal_mode=self.config.journal_mode,
+                # Buffered writes are committed in one transaction
+                batch_size=self.config.batch_size,
+            )
+        ).__aenter__()
+        async with self.db() as dbctx:
+            await dbctx.create_table(
+                self.config.table_name,
+                {"key": "TEXT PRIMARY KEY", "value": "BLOB"},
+            )
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        # Commit whatever was written, even if exiting due to an exception,
+        # so that work which was done is not done again
+        try:
+            await self.flush()
+        finally:
+            await self.db.__aexit__(exc_type, exc_value, traceback)
+
+    async def get(self, key: str) -> Union[bytes, None]:
+        if key in self.pending:
+            return self.pending[key]
+        async with self.db() as dbctx:
+            # Exhaust lookup so that it releases the database lock
+            rows = [
+                row
+                async for row in dbctx.lookup(
+                    self.config.table_name,
+                    cols=["value"],
+                    conditions=[[["key", "=", key]]],
+                )
+            ]
+        if not rows:
+            return None
+        return rows[0]["value"]
+
+    async def set(self, key: str, value: bytes):
+        self.pending[key] = value
+        if len(self.pending) >= self.config.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        """
+        Commit buffered writes to the database in one transaction
+        """
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        async with self.db() as dbctx:
+            await dbctx.insert_or_update_many(
+                self.config.table_name,
+                [
+                    {"key": key, "value": value}
+                    for key, value in pending.items()
+                ],
+            )
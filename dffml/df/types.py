@@ -177,6 +177,12 @@ class Operation(NamedTuple, Entrypoint):
     expand: Optional[List[str]] = []
     instance_name: Optional[str] = None
     validator: bool = False
+    # Results of operations with cache set are stored by the operation
+    # implementation network, keyed on the operation name, version, and the
+    # values of its inputs. Only set for operations whose outputs depend only
+    # on the values of their inputs
+    cache: bool = False
+    version: Optional[str] = None
 
     def export(self):
         exported = {
@@ -198,6 +204,10 @@ class Operation(NamedTuple, Entrypoint):
             del exported["conditions"]
         if not exported["expand"]:
             del exported["expand"]
+        if self.cache:
+            exported["cache"] = self.cache
+        if self.version is not None:
+            exported["version"] = self.version
         return exported
 
     @classmethod
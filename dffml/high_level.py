@@ -87,6 +87,10 @@ async def run(
         :py:class:`InputSetContext <dffml.df.base.BaseInputSetContext>`
         will have its respective :py:class:`Inputs <dffml.df.types.Input>` added
         to it.
+
+        If the only element is an async generator, then each item it yields may
+        be in any of the formats above. Contexts are created as items are
+        yielded, and their results are yielded as they complete.
     orchestrator : BaseOrchestrator, optional
         Orchestrator to use, defaults to
         :py:class:`MemoryOrchestrator <dffml.df.memory.MemoryOrchestrator>`
@@ -98,8 +102,9 @@ async def run(
         If given and input_sets is a ``list`` then add inputs under the given
         context. Otherwise they are added under randomly generated contexts.
     halt : Event, optional
-        If given, keep the dataflow running until this :py:class:`asyncio.Event`
-        is set.
+        If given and input_sets is an async generator, stop taking input sets
+        from the generator once this :py:class:`asyncio.Event` is set. Contexts
+        already started will run to completion.
 
     Returns
     -------
@@ -219,8 +224,10 @@ async def run(
     if orchestrator is None:
         orchestrator = MemoryOrchestrator.withconfig({})
     async with orchestrator:
-        async with orchestrator(dataflow) as ctx:
-            async for ctx, results in ctx.run(*input_sets):
+        async with orchestrator(dataflow) as octx:
+            async for ctx, results in octx.run(
+                *input_sets, strict=strict, ctx=ctx, halt=halt
+            ):
                 yield ctx, results
 
 
@@ -228,9 +235,10 @@ async def save(source: BaseSource, *args: Record) -> None:
     """
     Update a source's knowledge about given records.
 
-    For each record given, call
-    :py:func:`update <dffml.source.source.BaseSourceContext.update>` on the
-    source. Effectively saving all the records to the source.
+    Call
+    :py:func:`update_many <dffml.source.source.BaseSourceContext.update_many>`
+    on the source with the records given. Effectively saving all the records
+    to the source.
 
     Parameters
     ----------
@@ -268,8 +276,7 @@ async def save(source: BaseSource, *args: Record) -> None:
     """
     async with source:
         async with source() as sctx:
-            for record in args:
-                await sctx.update(record)
+            await sctx.update_many(list(args))
 
 
 async def load(source: BaseSource, *args: str) -> AsyncIterator[Record]:
@@ -444,6 +451,7 @@ async def predict(
     *args: Union[BaseSource, Record, Dict[str, Any]],
     update: bool = False,
     keep_record: bool = False,
+    update_batch_size: int = 128,
 ):
     """
     Make a prediction using a machine learning model.
@@ -465,6 +473,9 @@ async def predict(
         If ``True`` the results will be kept as their ``Record`` objects instead
         of being converted to a ``(record.key, features, predictions)`` tuple.
         Defaults to ``False``.
+    update_batch_size : int, optional
+        Number of records to write back to the sources at a time when
+        ``update`` is ``True``. Defaults to ``128``.
 
     Returns
     -------
@@ -501,11 +512,20 @@ async def predict(
     sources = _records_to_sources(*args)
     async with sources as sources, model as model:
         async with sources() as sctx, model() as mctx:
-            async for record in mctx.predict(sctx):
-                yield record if keep_record else (
-                    record.key,
-                    record.features(),
-                    record.predictions(),
-                )
-                if update:
-                    await sctx.update(record)
+            # Records to write back to the sources, written in batches
+            updated = []
+            try:
+                async for record in mctx.predict(sctx):
+                    yield record if keep_record else (
+                        record.key,
+                        record.features(),
+                        record.predictions(),
+                    )
+                    if update:
+                        updated.append(record)
+                        if len(updated) >= update_batch_size:
+                            await sctx.update_many(updated)
+                            updated = []
+            finally:
+                if updated:
+                    await sctx.update_many(updated)
@@ -0,0 +1,191 @@
+"""
+Coalesce concurrent prediction requests into one call to a model
+"""
+import asyncio
+from typing import List, Tuple, Set, Optional
+
+from ..record import Record
+from .model import ModelContext
+from ..source.source import Sources
+from ..source.memory import MemorySource, MemorySourceConfig
+from .log import LOGGER
+
+
+class ModelPredictBatcher:
+    """
+    Makes predictions for records from concurrent requests with one call to
+    the model context's ``predict`` method. Requests made within
+    ``max_latency`` seconds of the first request of a batch are predicted
+    together, unless the batch reaches ``max_batch`` records first. With a
+    ``max_latency`` of zero only requests made at the same time (before the
+    event loop runs again) are batched.
+
+    Batches are predicted one at a time. Requests made while a batch is being
+    predicted form the next batch.
+
+    >>> import asyncio
+    >>> from dffml import *
+    >>>
+    >>> model = SLRModel(
+    ...     features=Features(Feature("Years", int, 1)),
+    ...     predict=Feature("Salary", int, 1),
+    ...     directory="tempdir",
+    ... )
+    >>>
+    >>> async def main():
+    ...     await train(
+    ...         model,
+    ...         {"Years": 0, "Salary": 10},
+    ...         {"Years": 1, "Salary": 20},
+    ...     )
+    ...     async with model as loaded, loaded() as mctx:
+    ...         async with ModelPredictBatcher(mctx) as batcher:
+    ...             results = await asyncio.gather(
+    ...                 *[
+    ...                     batcher.predict(
+    ...                         [Record(str(years), data={"features": {"Years": years}})]
+    ...                     )
+    ...                     for years in range(2, 5)
+    ...                 ]
+    ...             )
+    ...             for records in results:
+    ...                 print(records[0].key, round(records[0].prediction("Salary").value))
+    ...             print(batcher.batches)
+    >>>
+    >>> asyncio.run(main())
+    2 30
+    3 40
+    4 50
+    1
+    """
+
+    def __init__(
+        self,
+        mctx: ModelContext,
+        max_batch: int = 64,
+        max_latency: float = 0.0,
+    ) -> None:
+        self.mctx = mctx
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        # Records of each request waiting to be predicted, and the future
+        # their results are set on
+        self.pending: List[Tuple[List[Record], asyncio.Future]] = []
+        self.pending_records = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.tasks: Set[asyncio.Task] = set()
+        # Only one batch is predicted at a time
+        self.lock = asyncio.Lock()
+        # Number of batches predicted
+        self.batches = 0
+
+    async def __aenter__(self) -> "ModelPredictBatcher":
+        return self
+
+    async def __aexit__(self, _exc_type, _exc_value, _traceback):
+        await self.flush()
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    async def predict(self, records: List[Record]) -> List[Record]:
+        """
+        Make predictions for the records along with those of other requests.
+        Returns the records which were predicted, with their predictions set.
+        """
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        self.pending.append((records, future))
+        self.pending_records += len(records)
+        if self.pending_records >= self.max_batch:
+            self._schedule_flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(
+                self.max_latency, self._schedule_flush
+            )
+        return await future
+
+    def _schedule_flush(self):
+        pending = self._take_pending()
+        if not pending:
+            return
+        task = asyncio.get_event_loop().create_task(
+            self._predict_pending(pending)
+        )
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def _take_pending(self) -> List[Tuple[List[Record], asyncio.Future]]:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        pending, self.pending = self.pending, []
+        self.pending_records = 0
+        return pending
+
+    async def flush(self):
+        """
+        Predict the records of all requests waiting to be predicted
+        """
+        await self._predict_pending(self._take_pending())
+
+    async def _predict_pending(
+        self, pending: List[Tuple[List[Record], asyncio.Future]]
+    ):
+        if not pending:
+            return
+        async with self.lock:
+            try:
+                predicted = await self.predict_records(
+                    [
+                        record
+                        for records, _future in pending
+                        for record in records
+                    ]
+                )
+            except Exception as error:
+                for _records, future in pending:
+                    if not future.done():
+                        future.set_exception(error)
+                return
+        i = 0
+        for records, future in pending:
+            if not future.done():
+                future.set_result(
+                    [
+                        record
+                        for j, record in enumerate(records, start=i)
+                        if j in predicted
+                    ]
+                )
+            i += len(records)
+
+    async def predict_records(self, records: List[Record]) -> Set[int]:
+        """
+        Predict all the records with one call to the model context's
+        ``predict`` method. Returns the indexes of the records predicted.
+        """
+        self.batches += 1
+        LOGGER.debug("Predicting batch of %d records", len(records))
+        # Requests may use the same keys, so records are keyed by their index
+        async with Sources(
+            MemorySource(
+                MemorySourceConfig(
+                    records=[
+                        Record(str(i), data={"features": record.features()})
+                        for i, record in enumerate(records)
+                    ]
+                )
+            )
+        ) as sources:
+            async with sources() as sctx:
+                predicted = set()
+                async for result in self.mctx.predict(sctx):
+                    i = int(result.key)
+                    for target, prediction in result.predictions().items():
+                        records[i].predicted(
+                            target,
+                            prediction["value"],
+                            prediction["confidence"],
+                        )
+                    predicted.add(i)
+                return predicted
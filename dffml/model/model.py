@@ -7,9 +7,11 @@ prediction accuracy.
 """
 import abc
 import json
+import numbers
 import hashlib
 import pathlib
-from typing import AsyncIterator, Optional
+import importlib
+from typing import AsyncIterator, Optional, Dict, List, Tuple, Any
 
 from ..base import (
     config,
@@ -28,6 +30,26 @@ class ModelNotTrained(Exception):
     pass
 
 
+# Default number of records predicted at once by predict_batches
+PREDICT_BATCH_SIZE = 1024
+
+
+def records_feature_arrays(
+    records: List[Record], features: List[str]
+) -> Dict[str, Any]:
+    """
+    Returns a dict mapping each feature to a NumPy array of its values for
+    each record, in the order of the records. The same as each batch yielded
+    by :py:meth:`feature_batches
+    <dffml.source.source.SourcesContext.feature_batches>`.
+    """
+    np = importlib.import_module("numpy")
+    return {
+        feature: np.array([record.feature(feature) for record in records])
+        for feature in features
+    }
+
+
 @config
 class ModelConfig:
     directory: str
@@ -66,6 +88,72 @@ class ModelContext(abc.ABC, BaseDataFlowFacilitatorObjectContext):
         raise NotImplementedError()
         yield (Record(""), "", 0.0)  # skipcq: PYL-W0101
 
+    async def predict_batch(
+        self, batch: Dict[str, Any]
+    ) -> Tuple[List[Any], List[float]]:
+        """
+        Make predictions for many records at once. Models which can make
+        vectorized predictions should implement this method and use
+        :py:meth:`predict_batches` within :py:meth:`predict`.
+
+        Parameters
+        ----------
+        batch : dict
+            Maps each feature to a NumPy array of its values, one per record.
+
+        Returns
+        -------
+        values : list
+            Predicted value for each record.
+        confidences : list or float
+            Confidence in each prediction, or a single confidence for all of
+            them.
+        """
+        raise NotImplementedError()
+
+    async def predict_batches(
+        self,
+        sources: SourcesContext,
+        features: List[str],
+        target: str,
+        batch_size: int = PREDICT_BATCH_SIZE,
+    ) -> AsyncIterator[Record]:
+        """
+        Make predictions for records which have the given features in batches
+        of up to ``batch_size`` records, by calling :py:meth:`predict_batch`
+        once per batch. Each record's prediction for ``target`` is set with
+        :py:meth:`Record.predicted <dffml.record.Record.predicted>`.
+        """
+        records = []
+        async for record in sources.with_features(features):
+            records.append(record)
+            if len(records) < batch_size:
+                continue
+            for record in await self._predict_records(
+                records, features, target
+            ):
+                yield record
+            records = []
+        for record in await self._predict_records(records, features, target):
+            yield record
+
+    async def _predict_records(
+        self, records: List[Record], features: List[str], target: str
+    ) -> List[Record]:
+        if not records:
+            return records
+        values, confidences = await self.predict_batch(
+            records_feature_arrays(records, features)
+        )
+        if isinstance(confidences, numbers.Number):
+            confidences = [confidences] * len(records)
+        for record, value, confidence in zip(records, values, confidences):
+            record.predicted(target, value, confidence)
+        self.logger.debug(
+            "Predicted %s for %d records", target, len(records),
+        )
+        return records
+
 
 @base_entry_point("dffml.model", "model")
 class Model(BaseDataFlowFacilitatorObject):
@@ -0,0 +1,178 @@
+"""
+Keep loaded models resident in memory so they aren't loaded again for each
+prediction or accuracy assessment
+"""
+import os
+import threading
+import collections
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .log import LOGGER
+
+# Bytes of memory resident models may use unless configured otherwise. The
+# budget of the process wide cache can be set with the environment variable
+# named by MAX_BYTES_ENV
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3
+MAX_BYTES_ENV = "DFFML_RESIDENT_MODELS_MAX_BYTES"
+
+
+class ResidentFileKey(tuple):
+    """
+    Paths and modification times of the files an entry was loaded from. See
+    :py:func:`resident_file_key`.
+    """
+
+    def paths(self) -> Tuple[str, ...]:
+        return tuple(path for path, _mtime in self)
+
+
+class ResidentModels:
+    """
+    Process wide cache of loaded model weights, tokenizers, etc. Entries are
+    keyed by whatever the model wants, usually the directory it loaded from
+    along with the modification time of the files it loaded.
+
+    The least recently used entries are evicted when there are more than
+    ``max_models`` entries, or when the sizes of all entries add up to more
+    than ``max_bytes``. The entry most recently loaded is never evicted, no
+    matter its size.
+
+    When an entry is loaded using a key made with :py:func:`resident_file_key`
+    any entry with the same key, other than the modification times of the
+    files, is discarded. Weights from before a model was trained again don't
+    stay resident.
+
+    >>> from dffml import *
+    >>>
+    >>> resident = ResidentModels(max_models=2)
+    >>> resident.load("a", lambda: "weights a")
+    'weights a'
+    >>> resident.load("b", lambda: "weights b")
+    'weights b'
+    >>> resident.load("a", lambda: "loaded a again")
+    'weights a'
+    >>> resident.load("c", lambda: "weights c")
+    'weights c'
+    >>> list(resident)
+    ['a', 'c']
+    """
+
+    def __init__(
+        self, max_models: int = 8, max_bytes: Optional[int] = DEFAULT_MAX_BYTES
+    ) -> None:
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        # Maps keys to a tuple of the loaded object and its size in bytes. The
+        # most recently used entries are at the end.
+        self.entries = collections.OrderedDict()
+        self.total_bytes = 0
+        # Maps keys with the modification times of files removed to the key
+        # of the entry loaded from the files
+        self.by_paths: Dict[Hashable, Hashable] = {}
+        # Models may be loaded from threads run by the event loop's executor
+        self.lock = threading.RLock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.entries
+
+    def __iter__(self):
+        return iter(list(self.entries))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def paths_key(cls, key: Hashable) -> Hashable:
+        """
+        Key with the modification times of any files within it removed
+        """
+        if isinstance(key, ResidentFileKey):
+            return key.paths()
+        if isinstance(key, tuple):
+            return tuple(map(cls.paths_key, key))
+        return key
+
+    def load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        size: Optional[Callable[[Any], int]] = None,
+    ) -> Any:
+        """
+        Return the object stored under ``key``, calling ``loader`` to load it
+        if it isn't resident. ``size`` is called with the loaded object to find
+        how many bytes of memory it uses, objects are assumed to use none if
+        it isn't given.
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key][0]
+            # Stop keeping what was loaded from the files before they were
+            # written to
+            paths_key = self.paths_key(key)
+            if paths_key != key:
+                stale = self.by_paths.get(paths_key, None)
+                if stale is not None:
+                    LOGGER.debug("Discarding stale resident model %r", stale)
+                    self.discard(stale)
+                self.by_paths[paths_key] = key
+            LOGGER.debug("Loading resident model %r", key)
+            loaded = loader()
+            nbytes = size(loaded) if size is not None else 0
+            self.entries[key] = (loaded, nbytes)
+            self.total_bytes += nbytes
+            self.evict()
+            return loaded
+
+    def _remove(self, key: Hashable, nbytes: int) -> None:
+        self.total_bytes -= nbytes
+        paths_key = self.paths_key(key)
+        if self.by_paths.get(paths_key, None) == key:
+            del self.by_paths[paths_key]
+
+    def discard(self, key: Hashable) -> None:
+        """
+        Stop keeping the object stored under ``key`` resident
+        """
+        with self.lock:
+            if key in self.entries:
+                self._remove(key, self.entries.pop(key)[1])
+
+    def evict(self) -> None:
+        """
+        Discard least recently used entries until within budget
+        """
+        with self.lock:
+            while len(self.entries) > 1 and (
+                len(self.entries) > self.max_models
+                or (
+                    self.max_bytes is not None
+                    and self.total_bytes > self.max_bytes
+                )
+            ):
+                key, (_loaded, nbytes) = self.entries.popitem(last=False)
+                self._remove(key, nbytes)
+                LOGGER.debug("Evicted resident model %r", key)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.by_paths.clear()
+            self.total_bytes = 0
+
+
+def resident_file_key(*paths: str) -> ResidentFileKey:
+    """
+    Key for an entry loaded from files, which changes when any of the files
+    are written to (for instance when the model is trained again)
+    """
+    return ResidentFileKey(
+        (os.path.abspath(path), os.stat(path).st_mtime_ns) for path in paths
+    )
+
+
+# Shared by all models within this process
+RESIDENT_MODELS = ResidentModels(
+    max_bytes=int(os.environ.get(MAX_BYTES_ENV, DEFAULT_MAX_BYTES))
+)
@@ -1,5 +1,5 @@
 import pathlib
-import statistics
+import importlib
 from typing import AsyncIterator, Tuple, Any, Type, List
 
 from ..base import config, field
@@ -11,39 +11,77 @@ from ..source.source import Sources, SourcesContext
 from ..record import Record
 
 
-def matrix_subtract(one, two):
-    return [
-        one_element - two_element for one_element, two_element in zip(one, two)
-    ]
-
-
-def matrix_multiply(one, two):
-    return [
-        one_element * two_element for one_element, two_element in zip(one, two)
-    ]
-
-
-def squared_error(y, line):
-    return sum(map(lambda element: element ** 2, matrix_subtract(y, line)))
-
+class SLRStatistics:
+    """
+    Sufficient statistics for fitting a line to x and y values. Values are
+    added a batch at a time, so they never all need to be held in memory.
+
+    Rather than sums of squares, which lose precision as they grow, the sums
+    of squared deviations from the means are kept. Each batch's are combined
+    with those of the batches before it using the pairwise update of Chan,
+    Golub and LeVeque.
+
+    >>> from dffml import *
+    >>>
+    >>> statistics = SLRStatistics()
+    >>> statistics.update([1, 2], [3, 5])
+    >>> statistics.update([3], [7])
+    >>> statistics.line()
+    (2.0, 1.0, 1.0)
+    """
 
-def coeff_of_deter(y, regression_line):
-    y_mean_line = [statistics.mean(y)] * len(y)
-    squared_error_mean = squared_error(y, y_mean_line)
-    squared_error_regression = squared_error(y, regression_line)
-    return 1 - (squared_error_regression / squared_error_mean)
+    def __init__(self):
+        self.np = importlib.import_module("numpy")
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        # Sums of squared deviations from the means
+        self.ss_x = 0.0
+        self.ss_y = 0.0
+        # Sum of products of the deviations of x and y from their means
+        self.sp_xy = 0.0
+
+    def update(self, x, y):
+        """
+        Add arrays (or lists) of x and y values
+        """
+        x = self.np.asarray(x, dtype=self.np.float64).ravel()
+        y = self.np.asarray(y, dtype=self.np.float64).ravel()
+        n = len(x)
+        if not n:
+            return
+        mean_x = float(x.mean())
+        mean_y = float(y.mean())
+        dx = x - mean_x
+        dy = y - mean_y
+        total = self.n + n
+        delta_x = mean_x - self.mean_x
+        delta_y = mean_y - self.mean_y
+        weight = self.n * n / total
+        self.ss_x += float(dx @ dx) + delta_x * delta_x * weight
+        self.ss_y += float(dy @ dy) + delta_y * delta_y * weight
+        self.sp_xy += float(dx @ dy) + delta_x * delta_y * weight
+        self.mean_x += delta_x * n / total
+        self.mean_y += delta_y * n / total
+        self.n = total
+
+    def line(self) -> Tuple[float, float, float]:
+        """
+        Slope and intercept of the line of best fit, and its coefficient of
+        determination
+        """
+        m = self.sp_xy / self.ss_x
+        b = self.mean_y - (m * self.mean_x)
+        # One minus the ratio of the squared error of the regression line to
+        # that of the mean line
+        accuracy = (self.sp_xy * self.sp_xy) / (self.ss_x * self.ss_y)
+        return (m, b, accuracy)
 
 
 def best_fit_line(x, y):
-    mean_x = statistics.mean(x)
-    mean_y = statistics.mean(y)
-    m = (mean_x * mean_y - statistics.mean(matrix_multiply(x, y))) / (
-        (mean_x ** 2) - statistics.mean(matrix_multiply(x, x))
-    )
-    b = mean_y - (m * mean_x)
-    regression_line = [m * x_element + b for x_element in x]
-    accuracy = coeff_of_deter(y, regression_line)
-    return (m, b, accuracy)
+    statistics = SLRStatistics()
+    statistics.update(x, y)
+    return statistics.line()
 
 
 @config
@@ -131,7 +169,7 @@ class SLRModel(SimpleModel):
                 "last_updated": "2020-11-15T16:22:25Z",
                 "prediction": {
                     "ans": {
-                        "confidence": 0.9355670103092784,
+                        "confidence": 0.9355670103092779,
                         "value": 1
                     }
                 }
@@ -149,7 +187,7 @@ class SLRModel(SimpleModel):
         :test:
 
         $ python slr.py
-        Accuracy: 0.9355670103092784
+        Accuracy: 0.9355670103092779
         {'f1': 0.8, 'ans': 1}
     """
     # The configuration class needs to be set as the CONFIG property
@@ -163,21 +201,22 @@ class SLRModel(SimpleModel):
     SUPPORTED_LENGTHS: List[int] = [1]
 
     async def train(self, sources: Sources) -> None:
-        # X and Y data
-        x = []
-        y = []
-        # Go through all records that have the feature we're training on and the
-        # feature we want to predict. Since our model only supports 1 feature,
-        # the self.features list will only have one element at index 0.
-        async for record in sources.with_features(
+        # Statistics of the X and Y data needed to find the line of best fit
+        statistics = SLRStatistics()
+        # Go through arrays of values from all records that have the feature
+        # we're training on and the feature we want to predict. Since our model
+        # only supports 1 feature, the self.features list will only have one
+        # element at index 0.
+        async for batch in sources.feature_batches(
             self.features + [self.config.predict.name]
         ):
-            x.append(record.feature(self.features[0]))
-            y.append(record.feature(self.config.predict.name))
+            statistics.update(
+                batch[self.features[0]], batch[self.config.predict.name]
+            )
         # Use self.logger to report how many records are being used for training
-        self.logger.debug("Number of input records: %d", len(x))
+        self.logger.debug("Number of input records: %d", statistics.n)
         # Save m, b, and accuracy
-        self.storage["regression_line"] = best_fit_line(x, y)
+        self.storage["regression_line"] = statistics.line()
 
     async def accuracy(self, sources: Sources) -> Accuracy:
         # Load saved regression line
@@ -1,17 +1,27 @@
 from typing import Dict, Any
 
 from ..record import Record
-from ..base import config
+from ..base import config, field
 from ..model import Model
+from ..model.batcher import ModelPredictBatcher
 from ..df.types import Definition
 from ..df.base import op
-from ..source.source import Sources
-from ..source.memory import MemorySource, MemorySourceConfig
 
 
 @config
 class ModelPredictConfig:
     model: Model
+    max_batch: int = field(
+        "Maximum number of predictions made with one call to the model. "
+        "Predictions requested concurrently are made together",
+        default=64,
+    )
+    max_latency: float = field(
+        "Seconds to wait for more predictions to be requested before making "
+        "them. If zero only predictions requested at the same time are made "
+        "together",
+        default=0.0,
+    )
 
     def __post_init__(self):
         if not isinstance(self.model, Model):
@@ -33,12 +43,25 @@ class ModelPredictConfig:
         )
     },
     config_cls=ModelPredictConfig,
-    imp_enter={"model": (lambda self: self.config.model)},
-    ctx_enter={"mctx": (lambda self: self.parent.model())},
+    imp_enter={
+        "model": (lambda self: self.config.model),
+        # Contexts share a model context, so that predictions for them can be
+        # made together
+        "mctx": (lambda self: self.model()),
+        "batcher": (
+            lambda self: ModelPredictBatcher(
+                self.mctx,
+                max_batch=self.config.max_batch,
+                max_latency=self.config.max_latency,
+            )
+        ),
+    },
 )
 async def model_predict(self, features: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Predict using dffml models.
+    Predict using dffml models. Predictions requested concurrently, such as
+    for many contexts at once, are made with one call to the model. See
+    :py:class:`ModelPredictBatcher <dffml.model.batcher.ModelPredictBatcher>`.
 
     Parameters
     ----------
@@ -97,13 +120,8 @@ async def model_predict(self, features: Dict[str, Any]) -> Dict[str, Any]:
     {'model_predictions': {'Salary': {'confidence': 1.0, 'value': 50}}}
     """
 
-    async with Sources(
-        MemorySource(
-            MemorySourceConfig(
-                records=[Record("", data={"features": features})]
-            )
-        )
-    ) as source:
-        async with source() as sctx:
-            async for record in self.mctx.predict(sctx):
-                return {"prediction": record.predictions()}
+    # Concurrent predictions are made together
+    for record in await self.parent.batcher.predict(
+        [Record("", data={"features": features})]
+    ):
+        return {"prediction": record.predictions()}
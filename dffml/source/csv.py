@@ -3,18 +3,35 @@
 """
 Loads records from a csv file, using columns as features
 """
+import io
+import os
 import csv
 import ast
-import itertools
+import dbm
+import errno
 import asyncio
-from typing import Dict, List
+import itertools
+import collections
+import concurrent.futures
+from typing import (
+    Dict,
+    List,
+    Set,
+    Any,
+    Tuple,
+    Iterator,
+    AsyncIterator,
+    Optional,
+)
 from dataclasses import dataclass
 from contextlib import asynccontextmanager
 
 from ..record import Record
-from .memory import MemorySource
+from ..feature import Feature, Features
+from .memory import MemorySource, MemorySourceContext
+from .source import BaseSourceContext, FEATURE_BATCH_SIZE
 from .file import FileSource, FileSourceConfig
-from ..base import config
+from ..base import config, field
 from ..util.entrypoint import entrypoint
 from ..configloader.configloader import ConfigLoaders
 
@@ -26,8 +43,14 @@ class OpenCSVFile:
     write_out: Dict
     active: int
     lock: asyncio.Lock
+    # Keys of records updated since the file was opened, by tag
+    dirty: Dict[str, Set[str]]
     write_back_key: bool = True
     write_back_tag: bool = False
+    # Header of the file when it was opened
+    fieldnames: List[str] = None
+    # Number of rows with the same tag and key as a row after them
+    superseded: int = 0
 
     async def inc(self):
         async with self.lock:
@@ -45,12 +68,133 @@ CSV_SOURCE_CONFIG_DEFAULT_tag_COLUMN = "tag"
 CSV_SOURCE_CONFIG_DEFAULT_LOADFILES_NAME = None
 
 
+def parse_csv_value(feature: Optional[Feature], value: str) -> Any:
+    """
+    Parse the value of a column using the dtype of the feature for the column
+    if there is one, otherwise as a Python literal if possible
+    """
+    if feature is not None and feature.length == 1:
+        try:
+            if feature.dtype is bool:
+                return value.strip().lower() in ("1", "true", "yes", "on")
+            return feature.dtype(value)
+        except (TypeError, ValueError):
+            pass
+    try:
+        return ast.literal_eval(value)
+    except (SyntaxError, ValueError):
+        return value
+
+
+def parse_csv_rows(
+    chunk: bytes,
+    fieldnames: List[str],
+    raw: Set[str],
+    dtypes: Dict[str, Feature],
+) -> List[Dict[str, Any]]:
+    """
+    Parse the rows in a chunk of a CSV file, and the non-empty values of
+    columns not in raw. Run by worker processes.
+    """
+    rows = []
+    for values in csv.reader(
+        io.StringIO(chunk.decode(), newline=""), dialect="strip"
+    ):
+        if not values:
+            continue
+        row = dict(itertools.zip_longest(fieldnames, values))
+        for name, value in row.items():
+            if name not in raw and isinstance(value, str) and value != "":
+                row[name] = parse_csv_value(dtypes.get(name, None), value)
+        rows.append(row)
+    return rows
+
+
 @config
 class CSVSourceConfig(FileSourceConfig):
     key: str = CSV_SOURCE_CONFIG_DEFAULT_KEY
     tag: str = CSV_SOURCE_CONFIG_DEFAULT_tag
     tagcol: str = CSV_SOURCE_CONFIG_DEFAULT_tag_COLUMN
     loadfiles: List[str] = CSV_SOURCE_CONFIG_DEFAULT_LOADFILES_NAME
+    features: Features = field(
+        "Columns to parse using the feature's dtype. Other columns are parsed "
+        "as Python literals if possible",
+        default_factory=lambda: Features(),
+    )
+    stream: bool = field(
+        "Read records from the file as they are requested rather than loading "
+        "the whole file into memory when opened. Read only",
+        default=False,
+    )
+    index: bool = field(
+        "When streaming, keep an index of the byte offset of each record's "
+        "row in a file next to the CSV file (its filename with .index "
+        "appended) so that records can be looked up by key without reading "
+        "the file. Not supported for compressed files",
+        default=False,
+    )
+    journal: bool = field(
+        "When closed, append rows for records which were updated to the end "
+        "of the file rather than rewriting the whole file. Rows take "
+        "precedence over earlier rows with the same tag and key",
+        default=False,
+    )
+    compact: int = field(
+        "When journaling, rewrite the whole file rather than appending to it "
+        "once it has this many rows superseded by rows appended later",
+        default=1000,
+    )
+    workers: int = field(
+        "Number of processes to parse the file with when it's opened. The "
+        "file is split into chunks which are parsed in parallel, without "
+        "blocking the event loop. 0 parses it on the event loop",
+        default=0,
+    )
+    chunk_size: int = field(
+        "Size in bytes of the chunks the file is split into when parsed by "
+        "workers",
+        default=4 * 1024 * 1024,
+    )
+
+
+class CSVSourceContext(MemorySourceContext):
+    async def update(self, record):
+        if getattr(self.parent.config, "stream", False):
+            raise ValueError(
+                f"{self.parent.config.filename} is read only when streaming"
+            )
+        await super().update(record)
+
+    async def records(self) -> AsyncIterator[Record]:
+        if not getattr(self.parent.config, "stream", False):
+            async for record in super().records():
+                yield record
+            return
+        async for _offset, tag, record in self.parent.stream_records():
+            if tag == self.parent.config.tag:
+                yield record
+
+    async def record(self, key: str) -> Record:
+        if not getattr(self.parent.config, "stream", False):
+            return await super().record(key)
+        if self.parent.config.index:
+            return await self.parent.indexed_record(key)
+        async for record in self.records():
+            if record.key == key:
+                return record
+        return Record(key)
+
+    async def feature_batches(
+        self, features: List[str], batch_size: int = FEATURE_BATCH_SIZE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        if not getattr(self.parent.config, "stream", False):
+            batches = super().feature_batches(features, batch_size)
+        else:
+            batches = BaseSourceContext.feature_batches(
+                self, features, batch_size
+            )
+        async for batch in batches:
+            yield batch
 
 
 # CSVSource is a bit of a mess
@@ -58,9 +202,39 @@ class CSVSourceConfig(FileSourceConfig):
 class CSVSource(FileSource, MemorySource):
     """
     Uses a CSV file as the source of record feature data
+
+    Set ``stream`` to read records from the file as they are requested, rather
+    than loading every record into memory when the source is opened. When
+    streaming, records with duplicate keys are all yielded, and ``index`` may
+    be set to look up records by key using an index of byte offsets stored
+    next to the file.
+
+    >>> import asyncio
+    >>> import pathlib
+    >>> from dffml import *
+    >>>
+    >>> _ = pathlib.Path("streaming.csv").write_text("key,x\\na,1\\nb,2\\n")
+    >>>
+    >>> async def main():
+    ...     async with CSVSource(
+    ...         filename="streaming.csv",
+    ...         features=Features(Feature("x", int, 1)),
+    ...         stream=True,
+    ...         index=True,
+    ...     ) as source:
+    ...         async with source() as sctx:
+    ...             async for record in sctx.records():
+    ...                 print(record.key, record.features())
+    ...             print((await sctx.record("b")).features())
+    >>>
+    >>> asyncio.run(main())
+    a {'x': 1}
+    b {'x': 2}
+    {'x': 2}
     """
 
     CONFIG = CSVSourceConfig
+    CONTEXT = CSVSourceContext
 
     # Headers we've added to track data other than feature data for a record
     CSV_HEADERS = ["prediction", "confidence"]
@@ -68,6 +242,62 @@ class CSVSource(FileSource, MemorySource):
     OPEN_CSV_FILES: Dict[str, OpenCSVFile] = {}
     OPEN_CSV_FILES_LOCK: asyncio.Lock = asyncio.Lock()
     CONFIG_LOADER = ConfigLoaders()
+    # Suffixes of files which can't be indexed by byte offset
+    COMPRESSED_SUFFIXES = [".gz", ".bz2", ".xz", ".lzma", ".zip"]
+
+    def __init__(self, config):
+        super().__init__(config)
+        # Features by name, used to parse the columns of the same name
+        self.dtypes = {
+            feature.name: feature
+            for feature in getattr(self.config, "features", [])
+        }
+
+    async def _open(self):
+        if not getattr(self.config, "stream", False):
+            if not getattr(self.config, "workers", 0) or not os.path.isfile(
+                self.config.filename
+            ):
+                return await super()._open()
+            # Workers are given bytes, decompressed as they are read
+            with self._open_read(binary=True) as fd:
+                return await self.load_fd(fd)
+        if self.config.readwrite:
+            raise ValueError("CSVSource is read only when streaming")
+        if not os.path.isfile(self.config.filename):
+            if self.config.allowempty:
+                return
+            raise FileNotFoundError(
+                errno.ENOENT, os.strerror(errno.ENOENT), self.config.filename,
+            )
+        if self.config.index:
+            if self.config.filename.suffix in self.COMPRESSED_SUFFIXES:
+                raise ValueError(
+                    f"{self.config.filename} is compressed, it can't be indexed"
+                )
+            await self.build_index()
+
+    async def _release(self):
+        """
+        Stop sharing the loaded file with other sources when closed without
+        writing, so that the file is loaded again when next opened
+        """
+        async with self.OPEN_CSV_FILES_LOCK:
+            open_file = self.OPEN_CSV_FILES.get(self.config.filename, None)
+            if open_file is not None and await open_file.dec():
+                del self.OPEN_CSV_FILES[self.config.filename]
+
+    async def _close(self):
+        if getattr(self.config, "stream", False):
+            return
+        if not self.config.readwrite:
+            return await self._release()
+        if not (
+            self.config.readwrite and getattr(self.config, "journal", False)
+        ):
+            return await super()._close()
+        if not await self.append_dirty():
+            await self._close_atomic()
 
     @asynccontextmanager
     async def _open_csv(self, fd=None):
@@ -75,7 +305,7 @@ class CSVSource(FileSource, MemorySource):
             if self.config.filename not in self.OPEN_CSV_FILES:
                 self.logger.debug(f"{self.config.filename} first open")
                 open_file = OpenCSVFile(
-                    active=1, lock=asyncio.Lock(), write_out={}
+                    active=1, lock=asyncio.Lock(), write_out={}, dirty={}
                 )
                 self.OPEN_CSV_FILES[self.config.filename] = open_file
                 if fd is not None:
@@ -89,95 +319,316 @@ class CSVSource(FileSource, MemorySource):
         async with self._open_csv():
             return {}
 
+    def parse_value(self, name: str, value: str) -> Any:
+        """
+        Parse the value of a column using the dtype of the feature with the
+        same name if there is one, otherwise as a Python literal if possible
+        """
+        return parse_csv_value(self.dtypes.get(name, None), value)
+
+    def row_tag_key(
+        self, row: Dict[str, str], index: Dict[str, int]
+    ) -> Tuple[str, str]:
+        """
+        Remove the tag and key from a row and return them. If there is no key
+        column the key is the row's index within rows with the same tag.
+        """
+        # Grab tag from row
+        tag = row.get(self.config.tagcol, self.config.tag)
+        if self.config.tagcol in row:
+            del row[self.config.tagcol]
+        index.setdefault(tag, 0)
+        # Grab key from row
+        key = row.get(self.config.key, str(index[tag]))
+        if self.config.key in row:
+            del row[self.config.key]
+        else:
+            index[tag] += 1
+        return tag, key
+
+    async def row_record(
+        self, key: str, row: Dict[str, str], parsed: bool = False
+    ) -> Record:
+        """
+        Create a record from a row which has had its tag and key removed. If
+        parsed is True the row's feature values have already been parsed.
+        """
+        # Load via ConfigLoaders if loadfiles parameter is given
+        cfgl_data = {}
+        if self.config.loadfiles:
+            for loadfile in self.config.loadfiles:
+                async with self.CONFIG_LOADER as cfgl:
+                    _, cfgl_data[loadfile] = await cfgl.load_file(
+                        row[loadfile]
+                    )
+        # Record data we are going to parse from this row (must include
+        # features).
+        record_data = {}
+        # Parse headers we as the CSV source added
+        csv_meta = {}
+        row_keys = []
+        # getting all keys starting with "prediction","confidence"
+        for header in self.CSV_HEADERS:
+            row_keys.extend(
+                list(filter(lambda x: x.startswith(header + "_"), row.keys()))
+            )
+        # pop all prediction data from row and save in csv_meta
+        for header in row_keys:
+            value = row.get(header, None)
+            if value is not None and value != "":
+                csv_meta[header] = row[header]
+                # Remove from feature data
+                del row[header]
+        # Set the features
+        features = {}
+        for _key, _value in row.items():
+            if self.config.loadfiles:
+                if _key in self.config.loadfiles:
+                    _value = cfgl_data[_key]
+            if _value != "":
+                if isinstance(_value, str) and not parsed:
+                    features[_key] = self.parse_value(_key, _value)
+                else:
+                    features[_key] = _value
+        if features:
+            record_data["features"] = features
+
+        # Getting all prediction target names
+        target_keys = filter(
+            lambda x: x.startswith("prediction_"), csv_meta.keys()
+        )
+        target_keys = map(lambda x: x.replace("prediction_", ""), target_keys)
+
+        predictions = {
+            target_name: {
+                "value": str(csv_meta["prediction_" + target_name]),
+                "confidence": float(csv_meta["confidence_" + target_name]),
+            }
+            for target_name in target_keys
+        }
+        record_data.update({"prediction": predictions})
+        return Record(key, data=record_data)
+
     async def read_csv(self, fd, open_file):
-        dict_reader = csv.DictReader(fd, dialect="strip")
+        parallel = bool(getattr(self.config, "workers", 0))
+        if parallel:
+            fieldnames = self._read_header(fd)
+        else:
+            dict_reader = csv.DictReader(fd, dialect="strip")
+            fieldnames = dict_reader.fieldnames
         # Record what headers are present when the file was opened
-        if not self.config.key in dict_reader.fieldnames:
+        open_file.fieldnames = fieldnames
+        if not self.config.key in fieldnames:
             open_file.write_back_key = False
-        if self.config.tagcol in dict_reader.fieldnames:
+        if self.config.tagcol in fieldnames:
             open_file.write_back_tag = True
         # Store all the records by their tag in write_out
         open_file.write_out = {}
         # If there is no key track row index to be used as key by tag
         index = {}
-        for row in dict_reader:
-            # Grab tag from row
-            tag = row.get(self.config.tagcol, self.config.tag)
-            # Load via ConfigLoaders if loadfiles parameter is given
-            cfgl_data = {}
-            if self.config.loadfiles:
-                for loadfile in self.config.loadfiles:
-                    async with self.CONFIG_LOADER as cfgl:
-                        _, cfgl_data[loadfile] = await cfgl.load_file(
-                            row[loadfile]
-                        )
-            if self.config.tagcol in row:
-                del row[self.config.tagcol]
-            index.setdefault(tag, 0)
-            # Grab key from row
-            key = row.get(self.config.key, str(index[tag]))
-            if self.config.key in row:
-                del row[self.config.key]
-            else:
-                index[tag] += 1
-            # Record data we are going to parse from this row (must include
-            # features).
-            record_data = {}
-            # Parse headers we as the CSV source added
-            csv_meta = {}
-            row_keys = []
-            # getting all keys starting with "prediction","confidence"
-            for header in self.CSV_HEADERS:
-                row_keys.extend(
-                    list(
-                        filter(
-                            lambda x: x.startswith(header + "_"), row.keys()
-                        )
-                    )
-                )
-            # pop all prediction data from row and save in csv_meta
-            for header in row_keys:
-                value = row.get(header, None)
-                if value is not None and value != "":
-                    csv_meta[header] = row[header]
-                    # Remove from feature data
-                    del row[header]
-            # Set the features
-            features = {}
-            for _key, _value in row.items():
-                if self.config.loadfiles:
-                    if _key in self.config.loadfiles:
-                        _value = cfgl_data[_key]
-                if _value != "":
-                    try:
-                        features[_key] = ast.literal_eval(_value)
-                    except (SyntaxError, ValueError):
-                        features[_key] = _value
-            if features:
-                record_data["features"] = features
-
-            # Getting all prediction target names
-            target_keys = filter(
-                lambda x: x.startswith("prediction_"), csv_meta.keys()
+
+        async def add_row(row):
+            tag, key = self.row_tag_key(row, index)
+            # Add the record to our internal memory representation
+            open_file.write_out.setdefault(tag, {})
+            if key in open_file.write_out[tag]:
+                open_file.superseded += 1
+            open_file.write_out[tag][key] = await self.row_record(
+                key, row, parsed=parallel
             )
-            target_keys = map(
-                lambda x: x.replace("prediction_", ""), target_keys
+
+        if not parallel:
+            for row in dict_reader:
+                await add_row(row)
+            return
+        async for row in self.parse_rows_parallel(fd, fieldnames):
+            await add_row(row)
+
+    @staticmethod
+    def _read_header(fd) -> Optional[List[str]]:
+        """
+        Read the header row from a binary file
+        """
+        header = b""
+        for line in iter(fd.readline, b""):
+            header += line
+            # Rows end where quotes are balanced
+            if header.count(b'"') % 2 == 0:
+                break
+        return next(
+            csv.reader(io.StringIO(header.decode(), newline=""), "strip"),
+            None,
+        )
+
+    @staticmethod
+    def _row_chunks(fd, chunk_size: int) -> Iterator[bytes]:
+        """
+        Split the rest of a binary file into chunks of roughly chunk_size bytes
+        which end on row boundaries
+        """
+        carry = b""
+        while True:
+            block = fd.read(chunk_size)
+            if not block:
+                if carry:
+                    yield carry
+                return
+            block = carry + block
+            # Find the last newline which isn't within a quoted value, meaning
+            # quotes before it are balanced. Chunks start on row boundaries.
+            quotes = block.count(b'"')
+            split = len(block)
+            while True:
+                newline = block.rfind(b"\n", 0, split)
+                if newline == -1:
+                    carry = block
+                    break
+                quotes -= block.count(b'"', newline, split)
+                split = newline
+                if quotes % 2 == 0:
+                    yield block[: newline + 1]
+                    carry = block[newline + 1 :]
+                    break
+
+    async def parse_rows_parallel(
+        self, fd, fieldnames: List[str]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Parse the rows of the rest of a binary file in worker processes. Chunks
+        are read, and decompressed, in a thread. Rows are yielded in order.
+        """
+        loop = asyncio.get_event_loop()
+        # Columns which row_record expects as strings
+        raw = {self.config.tagcol, self.config.key}
+        raw.update(self.config.loadfiles or [])
+        raw.update(
+            name
+            for name in fieldnames
+            if name.startswith(
+                tuple(header + "_" for header in self.CSV_HEADERS)
             )
+        )
+        chunks = self._row_chunks(fd, self.config.chunk_size)
+        pending = collections.deque()
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.config.workers
+        ) as pool:
+            while True:
+                chunk = await loop.run_in_executor(None, next, chunks, None)
+                if chunk is not None:
+                    pending.append(
+                        loop.run_in_executor(
+                            pool,
+                            parse_csv_rows,
+                            chunk,
+                            fieldnames,
+                            raw,
+                            self.dtypes,
+                        )
+                    )
+                # Keep every worker busy without reading the whole file ahead
+                # of the rows which have been parsed
+                if not pending:
+                    break
+                if chunk is None or len(pending) > 2 * self.config.workers:
+                    for row in await pending.popleft():
+                        yield row
 
-            predictions = {
-                target_name: {
-                    "value": str(csv_meta["prediction_" + target_name]),
-                    "confidence": float(csv_meta["confidence_" + target_name]),
-                }
-                for target_name in target_keys
-            }
-            record_data.update({"prediction": predictions})
-            # If there was no data in the row, skip it
-            if not record_data and key == str(index[tag] - 1):
+    @staticmethod
+    def _offset_lines(fd, offset: int = 0) -> Iterator[Tuple[int, str]]:
+        """
+        Read decoded lines from a binary file along with the byte offset each
+        line starts at
+        """
+        for line in iter(fd.readline, b""):
+            yield offset, line.decode()
+            offset += len(line)
+
+    def _stream_rows(
+        self, fd, fieldnames: List[str] = None, offset: int = 0
+    ) -> Iterator[Tuple[int, Dict[str, str]]]:
+        """
+        Parse rows from a binary file along with the byte offset each row
+        starts at. Rows may span multiple lines. The first row is the header
+        unless fieldnames are given.
+        """
+        lines = self._offset_lines(fd, offset)
+        row_offset = [offset]
+
+        def track_offsets():
+            for offset, line in lines:
+                if not row_offset:
+                    row_offset.append(offset)
+                yield line
+
+        reader = csv.reader(track_offsets(), dialect="strip")
+        if fieldnames is None:
+            fieldnames = next(reader, None)
+            if fieldnames is None:
+                return
+        row_offset.clear()
+        for values in reader:
+            offset = row_offset.pop()
+            if not values:
                 continue
-            # Add the record to our internal memory representation
-            open_file.write_out.setdefault(tag, {})
-            open_file.write_out[tag][key] = Record(key, data=record_data)
+            yield offset, dict(itertools.zip_longest(fieldnames, values))
+
+    async def stream_records(self) -> AsyncIterator[Tuple[int, str, Record]]:
+        """
+        Read records from the file one row at a time. Yields the byte offset of
+        each row, along with the tag and record parsed from it.
+        """
+        if not os.path.isfile(self.config.filename):
+            return
+        index = {}
+        with self._open_read(binary=True) as fd:
+            for offset, row in self._stream_rows(fd):
+                tag, key = self.row_tag_key(row, index)
+                yield offset, tag, await self.row_record(key, row)
+
+    async def build_index(self):
+        """
+        Create or update the index of byte offsets of each record's row, unless
+        it's up to date with the file
+        """
+        # Tags and keys are joined by a null byte, which won't be in the
+        # stamp's key
+        stamp_key = "\x00stamp"
+        stamp = self._index_stamp()
+        with dbm.open(self.index_filename, "c") as index:
+            if index.get(stamp_key, b"").decode() == stamp:
+                return
+            self.logger.debug("Building index %s", self.index_filename)
+            for key in list(index.keys()):
+                del index[key]
+            async for offset, tag, record in self.stream_records():
+                index[f"{tag}\x00{record.key}"] = str(offset)
+            index[stamp_key] = stamp
+
+    async def indexed_record(self, key: str) -> Record:
+        """
+        Read the row of the record with the given key using the index
+        """
+        if not os.path.isfile(self.config.filename):
+            return Record(key)
+        with dbm.open(self.index_filename, "r") as index:
+            offset = index.get(f"{self.config.tag}\x00{key}", None)
+        if offset is None:
+            return Record(key)
+        with self._open_read(binary=True) as fd:
+            fieldnames = next(
+                csv.reader(
+                    (line for _offset, line in self._offset_lines(fd)),
+                    dialect="strip",
+                )
+            )
+            fd.seek(int(offset))
+            for _offset, row in self._stream_rows(
+                fd, fieldnames=fieldnames, offset=int(offset)
+            ):
+                self.row_tag_key(row, {})
+                return await self.row_record(key, row)
+        return Record(key)
 
     async def load_fd(self, fd):
         """
@@ -193,8 +644,7 @@ class CSVSource(FileSource, MemorySource):
         """
         async with self.OPEN_CSV_FILES_LOCK:
             open_file = self.OPEN_CSV_FILES[self.config.filename]
-            open_file.write_out.setdefault(self.config.tag, {})
-            open_file.write_out[self.config.tag].update(self.mem)
+            self.merge_open_file(open_file)
             # Bail if not last open source for this file
             if not (await open_file.dec()):
                 return
@@ -225,22 +675,93 @@ class CSVSource(FileSource, MemorySource):
             writer.writeheader()
             for tag, records in open_file.write_out.items():
                 for record in records.values():
-                    record_data = record.dict()
-                    row = {name: "" for name in fieldnames}
-                    # Always write the tag
-                    row[self.config.tagcol] = tag
-                    # Write the key if it existed
-                    if open_file.write_back_key:
-                        row[self.config.key] = record.key
-                    # Write the features
-                    for key, value in record_data.get("features", {}).items():
-                        row[key] = value
-                    # Write the prediction
-                    if "prediction" in record_data:
-                        for key, value in record_data["prediction"].items():
-                            row["prediction_" + key] = value["value"]
-                            row["confidence_" + key] = value["confidence"]
-                    writer.writerow(row)
+                    writer.writerow(
+                        self.record_row(open_file, fieldnames, tag, record)
+                    )
             del self.OPEN_CSV_FILES[self.config.filename]
             self.logger.debug(f"{self.config.filename} written")
         self.logger.debug("%r saved %d records", self, len(self.mem))
+
+    def merge_open_file(self, open_file: OpenCSVFile):
+        """
+        Merge records held by this source into those of the open file
+        """
+        open_file.write_out.setdefault(self.config.tag, {})
+        open_file.write_out[self.config.tag].update(self.mem)
+        open_file.dirty.setdefault(self.config.tag, set())
+        open_file.dirty[self.config.tag].update(self.dirty)
+        self.dirty.clear()
+
+    def record_row(
+        self,
+        open_file: OpenCSVFile,
+        fieldnames: List[str],
+        tag: str,
+        record: Record,
+    ) -> Dict[str, Any]:
+        """
+        Create a row from a record. The row may have columns which are not in
+        fieldnames if the record has features or predictions which aren't.
+        """
+        record_data = record.dict()
+        row = {name: "" for name in fieldnames}
+        # Always write the tag
+        row[self.config.tagcol] = tag
+        # Write the key if it existed
+        if open_file.write_back_key:
+            row[self.config.key] = record.key
+        # Write the features
+        for key, value in record_data.get("features", {}).items():
+            row[key] = value
+        # Write the prediction
+        if "prediction" in record_data:
+            for key, value in record_data["prediction"].items():
+                row["prediction_" + key] = value["value"]
+                row["confidence_" + key] = value["confidence"]
+        return row
+
+    async def append_dirty(self) -> bool:
+        """
+        Append rows for records updated since the file was opened to the end of
+        the file. Returns False if the whole file should be rewritten instead,
+        because it's compressed, has many superseded rows, or doesn't have
+        columns for everything in the updated records.
+        """
+        async with self.OPEN_CSV_FILES_LOCK:
+            open_file = self.OPEN_CSV_FILES[self.config.filename]
+            self.merge_open_file(open_file)
+            # Leave writing to the last open source for this file
+            if open_file.active > 1:
+                await open_file.dec()
+                return True
+            fieldnames = open_file.fieldnames
+            if (
+                not fieldnames
+                or not open_file.write_back_key
+                or self.config.tagcol not in fieldnames
+                or self.config.filename.suffix in self.COMPRESSED_SUFFIXES
+                or open_file.superseded >= self.config.compact
+            ):
+                return False
+            rows = [
+                self.record_row(
+                    open_file, fieldnames, tag, open_file.write_out[tag][key],
+                )
+                for tag, keys in open_file.dirty.items()
+                for key in keys
+            ]
+            if any(not set(row).issubset(fieldnames) for row in rows):
+                return False
+            if rows:
+                # Start a new line if the file doesn't end with one
+                newline = self._missing_newline(self.config.filename)
+                with open(self.config.filename, "a", newline="") as fd:
+                    if newline:
+                        fd.write("\r\n")
+                    writer = csv.DictWriter(fd, fieldnames=fieldnames)
+                    writer.writerows(rows)
+            del self.OPEN_CSV_FILES[self.config.filename]
+            self.logger.debug(
+                f"{self.config.filename} appended {len(rows)} rows"
+            )
+        return True
@@ -1,12 +1,56 @@
+import importlib
 import collections
-from typing import Type, AsyncIterator, List
+from typing import Type, AsyncIterator, List, Dict, Any, Optional
 
 from ..base import config, BaseConfig
-from ..db.base import BaseDatabase, Condition
+from ..db.base import BaseDatabase, Condition, Conditions
 from ..record import Record
-from ..source.source import BaseSource, BaseSourceContext
+from ..source.source import (
+    BaseSource,
+    BaseSourceContext,
+    FeatureCondition,
+    FEATURE_BATCH_SIZE,
+    query_conditions,
+)
 from ..util.entrypoint import entrypoint
 
+# Number of keys to look up per query. SQLite limits the number of values
+# bound to a statement to 999 before version 3.32.0
+QUERY_KEYS_BATCH_SIZE = 512
+
+
+def record_query_conditions(
+    key_column: str,
+    feature_columns: Dict[str, str],
+    keys: Optional[List[str]] = None,
+    key_start: Optional[str] = None,
+    key_end: Optional[str] = None,
+    conditions: Optional[List[FeatureCondition]] = None,
+) -> Conditions:
+    """
+    Translate the arguments to :py:meth:`BaseSourceContext.query
+    <dffml.source.source.BaseSourceContext.query>` into database conditions.
+    ``feature_columns`` maps feature names to the names of their columns.
+    """
+    db_conditions = []
+    if keys is not None:
+        db_conditions.append([Condition(key_column, "IN", list(keys))])
+    if key_start is not None:
+        db_conditions.append([Condition(key_column, ">=", key_start)])
+    if key_end is not None:
+        db_conditions.append([Condition(key_column, "<", key_end)])
+    for condition in query_conditions(conditions):
+        db_conditions.append(
+            [
+                Condition(
+                    feature_columns[condition.feature],
+                    condition.operation,
+                    condition.value,
+                )
+            ]
+        )
+    return db_conditions
+
 
 @config
 class DbSourceConfig(BaseConfig):
@@ -16,13 +60,19 @@ class DbSourceConfig(BaseConfig):
 
 
 class DbSourceContext(BaseSourceContext):
-    async def update(self, record: Record):
+    def record_row(self, record: Record) -> Dict[str, Any]:
+        """
+        Values of each of the model columns for a record
+        """
         model_columns = self.parent.config.model_columns
         key_value_pairs = collections.OrderedDict()
         for key in model_columns:
             if key.startswith("feature_"):
                 modified_key = key.replace("feature_", "")
-                key_value_pairs[key] = record.data.features[modified_key]
+                # Records returned by query() may only have some features, the
+                # columns of the others are left as they are
+                if modified_key in record.data.features:
+                    key_value_pairs[key] = record.data.features[modified_key]
             elif "_value" in key:
                 target = key.replace("_value", "")
                 if record.data.prediction:
@@ -41,17 +91,114 @@ class DbSourceContext(BaseSourceContext):
                     key_value_pairs[key] = 1
             else:
                 key_value_pairs[key] = record.data.__dict__[key]
+        return key_value_pairs
+
+    async def update(self, record: Record):
         async with self.parent.db() as db_ctx:
             await db_ctx.insert_or_update(
-                self.parent.config.table_name, key_value_pairs
+                self.parent.config.table_name, self.record_row(record)
             )
         self.logger.debug("update: %s", await self.record(record.key))
 
+    async def update_many(self, records: List[Record]):
+        async with self.parent.db() as db_ctx:
+            await db_ctx.insert_or_update_many(
+                self.parent.config.table_name,
+                [self.record_row(record) for record in records],
+            )
+        self.logger.debug("update_many: %d records", len(records))
+
     async def records(self) -> AsyncIterator[Record]:
         async with self.parent.db() as db_ctx:
             async for result in db_ctx.lookup(self.parent.config.table_name):
                 yield self.convert_to_record(result)
 
+    async def query(
+        self,
+        features: Optional[List[str]] = None,
+        keys: Optional[List[str]] = None,
+        key_start: Optional[str] = None,
+        key_end: Optional[str] = None,
+        conditions: Optional[List[FeatureCondition]] = None,
+    ) -> AsyncIterator[Record]:
+        conditions = query_conditions(conditions)
+        feature_columns = {
+            feature: f"feature_{feature}"
+            for feature in (features or [])
+            + [condition.feature for condition in conditions]
+        }
+        # Every record has every column, so no records have features which
+        # aren't columns of the table
+        if keys == [] or not all(
+            column in self.parent.config.model_columns
+            for column in feature_columns.values()
+        ):
+            return
+        # Only select the columns for the requested features
+        cols = None
+        if features is not None:
+            cols = ["key"] + [feature_columns[feature] for feature in features]
+        # Look up keys a batch at a time to stay within the database's limit
+        # on the number of values bound to a query
+        key_batches = [None]
+        if keys is not None:
+            key_batches = [
+                keys[i : i + QUERY_KEYS_BATCH_SIZE]
+                for i in range(0, len(keys), QUERY_KEYS_BATCH_SIZE)
+            ]
+        async with self.parent.db() as db_ctx:
+            for key_batch in key_batches:
+                async for row in db_ctx.lookup(
+                    self.parent.config.table_name,
+                    cols=cols,
+                    conditions=record_query_conditions(
+                        "key",
+                        feature_columns,
+                        keys=key_batch,
+                        key_start=key_start,
+                        key_end=key_end,
+                        conditions=conditions,
+                    ),
+                ):
+                    yield self.convert_to_record(row)
+
+    async def records_by_keys(self, keys: List[str]) -> Dict[str, Record]:
+        records = {key: Record(key) for key in keys}
+        # Look up all the records in one query
+        async for record in self.query(keys=list(records)):
+            records[record.key].merge(record)
+        return records
+
+    async def feature_batches(
+        self, features: List[str], batch_size: int = FEATURE_BATCH_SIZE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        np = importlib.import_module("numpy")
+        columns = [f"feature_{feature}" for feature in features]
+        # Every record has every column, so either all or no records have
+        # the requested features
+        if not all(
+            column in self.parent.config.model_columns for column in columns
+        ):
+            return
+        rows = []
+        async with self.parent.db() as db_ctx:
+            # Only select the columns for the requested features
+            async for row in db_ctx.lookup(
+                self.parent.config.table_name, cols=columns
+            ):
+                rows.append(row)
+                if len(rows) == batch_size:
+                    yield {
+                        feature: np.array([row[column] for row in rows])
+                        for feature, column in zip(features, columns)
+                    }
+                    rows = []
+        if rows:
+            yield {
+                feature: np.array([row[column] for row in rows])
+                for feature, column in zip(features, columns)
+            }
+
     def convert_to_record(self, result):
         modified_record = {
             "key": "",
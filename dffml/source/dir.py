@@ -3,12 +3,16 @@ Loads files from a directory
 """
 import os
 import glob
+import asyncio
 import pathlib
-from typing import List
+import collections
+import concurrent.futures
+from typing import Any, Dict, List, Tuple, Iterator, AsyncIterator, Optional
 
 from ..record import Record
 from ..base import config, field
-from .memory import MemorySource
+from .memory import MemorySource, MemorySourceContext
+from .source import BaseSourceContext, FEATURE_BATCH_SIZE
 from ..util.entrypoint import entrypoint
 from ..source.source import BaseSource
 from ..configloader.configloader import ConfigLoaders
@@ -29,6 +33,62 @@ class DirectorySourceConfig:
         "Image labels", default_factory=lambda: ["unlabelled"]
     )
     save: BaseSource = None
+    lazy: bool = field(
+        "Find the files when opened, but only decode a file when its record "
+        "is accessed, rather than decoding every file when opened",
+        default=False,
+    )
+    workers: int = field(
+        "When lazy, number of threads decoding files. Also how many records "
+        "ahead of the one being used are decoded when iterating over records",
+        default=4,
+    )
+    cache_size: int = field(
+        "When lazy, number of decoded files to keep in memory", default=128
+    )
+
+
+class DirectorySourceContext(MemorySourceContext):
+    async def records(self) -> AsyncIterator[Record]:
+        if not self.parent.config.lazy:
+            async for record in super().records():
+                yield record
+            return
+        # Decode the files of upcoming records while earlier ones are used
+        ahead = collections.deque()
+        try:
+            for key in self.parent.paths:
+                ahead.append(asyncio.ensure_future(self.record(key)))
+                if len(ahead) > self.parent.config.workers:
+                    yield await ahead.popleft()
+            while ahead:
+                yield await ahead.popleft()
+        finally:
+            for task in ahead:
+                task.cancel()
+        # Records added by updates which aren't files
+        for key, record in list(self.parent.mem.items()):
+            if key not in self.parent.paths:
+                yield record
+
+    async def record(self, key: str) -> Record:
+        if not self.parent.config.lazy or key in self.parent.mem:
+            return await super().record(key)
+        if key not in self.parent.paths:
+            return Record(key)
+        return self.parent.file_record(key, await self.parent.decode(key))
+
+    async def feature_batches(
+        self, features: List[str], batch_size: int = FEATURE_BATCH_SIZE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        if not self.parent.config.lazy:
+            batches = super().feature_batches(features, batch_size)
+        else:
+            batches = BaseSourceContext.feature_batches(
+                self, features, batch_size
+            )
+        async for batch in batches:
+            yield batch
 
 
 @entrypoint("dir")
@@ -38,12 +98,20 @@ class DirectorySource(MemorySource):
     """
 
     CONFIG = DirectorySourceConfig
+    CONTEXT = DirectorySourceContext
     CONFIG_LOADER = ConfigLoaders()
 
     def __init__(self, config):
         super().__init__(config)
         if isinstance(getattr(self.config, "foldername", None), str):
             self.config.foldername = pathlib.Path(self.config.foldername)
+        # When lazy, paths and labels of files by their record's key, and
+        # recently decoded files
+        self.paths: Dict[str, Tuple[pathlib.Path, Optional[str]]] = {}
+        self.decoded: Dict[str, Any] = collections.OrderedDict()
+        self.decoding: Dict[str, asyncio.Future] = {}
+        self.config_loaders = None
+        self.pool = None
 
     async def __aenter__(self) -> "BaseSourceContext":
         await self._open()
@@ -86,40 +154,103 @@ class DirectorySource(MemorySource):
 
     async def _close(self):
         if self.config.save:
+            if self.config.lazy:
+                async with self() as sctx:
+                    self.mem = {
+                        record.key: record async for record in sctx.records()
+                    }
             await save(self.config.save, self.mem)
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+            await self.config_loaders.__aexit__(None, None, None)
+            self.config_loaders = None
+            self.decoded.clear()
 
-    async def load_fd(self):
-        self.mem = {}
-
-        # Iterate over the labels list
+    def files(self) -> Iterator[Tuple[str, pathlib.Path, Optional[str]]]:
+        """
+        Find files and yield the key of the record for each, along with the
+        file's path and its label, which is None if unlabelled
+        """
         for label in self.config.labels:
             if self.config.labels == ["unlabelled"]:
                 folders = self.config.foldername
             else:
                 folders = self.config.foldername.joinpath(label)
-
-            # Go through all image files and read them using pngconfigloader
             for file_name in map(
                 os.path.basename, glob.glob(str(folders) + "/*")
             ):
-                image_filename = folders.joinpath(file_name)
-                async with self.CONFIG_LOADER as cfgl:
-                    _, feature_data = await cfgl.load_file(image_filename)
-
-                if self.config.labels != ["unlabelled"]:
-                    file_name = label + "/" + file_name
-
-                self.mem[file_name] = Record(
-                    file_name,
-                    data={
-                        "features": {
-                            self.config.feature: feature_data,
-                            "label": label,
-                        }
-                    },
-                )
-
                 if self.config.labels == ["unlabelled"]:
-                    del self.mem[file_name].features()["label"]
+                    yield file_name, folders.joinpath(file_name), None
+                else:
+                    yield label + "/" + file_name, folders.joinpath(
+                        file_name
+                    ), label
+
+    def file_record(self, key: str, feature_data: Any) -> Record:
+        """
+        Create the record for a file from its decoded data
+        """
+        _path, label = self.paths[key]
+        features = {self.config.feature: feature_data}
+        if label is not None:
+            features["label"] = label
+        return Record(key, data={"features": features})
+
+    async def decode(self, key: str) -> Any:
+        """
+        Decode the file of the record with the given key in the thread pool,
+        unless it was decoded recently
+        """
+        if key in self.decoded:
+            self.decoded.move_to_end(key)
+            return self.decoded[key]
+        if key not in self.decoding:
+            path, _label = self.paths[key]
+            parser = await self.config_loaders.load_parser(
+                path.suffix.replace(".", "")
+            )
+            self.decoding[key] = asyncio.get_event_loop().run_in_executor(
+                self.pool, self.decode_file, parser, path
+            )
+        try:
+            feature_data = await asyncio.shield(self.decoding[key])
+        finally:
+            self.decoding.pop(key, None)
+        self.decoded[key] = feature_data
+        while len(self.decoded) > self.config.cache_size:
+            self.decoded.popitem(last=False)
+        return feature_data
+
+    @staticmethod
+    def decode_file(parser, path: pathlib.Path) -> Any:
+        """
+        Decode a file using a config loader. Run in a thread, with its own
+        event loop for the config loader's coroutine.
+        """
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(parser.loadb(path.read_bytes()))
+        finally:
+            loop.close()
+
+    async def load_fd(self):
+        self.mem = {}
+        self.paths = {key: (path, label) for key, path, label in self.files()}
+
+        if self.config.lazy:
+            self.config_loaders = ConfigLoaders()
+            await self.config_loaders.__aenter__()
+            self.pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.config.workers
+            )
+            self.logger.debug("%r found %d files", self, len(self.paths))
+            return
+
+        # Go through all image files and read them using pngconfigloader
+        for key, (path, _label) in self.paths.items():
+            async with self.CONFIG_LOADER as cfgl:
+                _, feature_data = await cfgl.load_file(path)
+            self.mem[key] = self.file_record(key, feature_data)
 
         self.logger.debug("%r loaded %d records", self, len(self.mem))
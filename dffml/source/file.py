@@ -7,6 +7,7 @@ import bz2
 import gzip
 import lzma
 import errno
+import shutil
 import zipfile
 from contextlib import contextmanager
 import pathlib
@@ -69,59 +70,121 @@ class FileSource(BaseSource):
                     os.strerror(errno.ENOENT),
                     self.config.filename,
                 )
+        with self._open_read() as fd:
+            await self.load_fd(fd)
+
+    def _open_read(self, binary: bool = False):
+        """
+        Open the file for reading, decompressing it if its suffix says it's
+        compressed. Opened in READMODE unless binary is True.
+        """
+        mode = "rb" if binary else self.READMODE
+        mode_compressed = "rb" if binary else self.READMODE_COMPRESSED
         if self.config.filename.suffix == ".gz":
-            opener = gzip.open(self.config.filename, self.READMODE_COMPRESSED)
+            return gzip.open(self.config.filename, mode_compressed)
         elif self.config.filename.suffix == ".bz2":
-            opener = bz2.open(self.config.filename, self.READMODE_COMPRESSED)
+            return bz2.open(self.config.filename, mode_compressed)
         elif (
             self.config.filename.suffix == ".xz"
             or self.config.filename.suffix == ".lzma"
         ):
-            opener = lzma.open(self.config.filename, self.READMODE_COMPRESSED)
+            return lzma.open(self.config.filename, mode_compressed)
         elif self.config.filename.suffix == ".zip":
-            opener = self.zip_opener_helper()
-        else:
-            opener = open(self.config.filename, self.READMODE)
-        with opener as fd:
-            await self.load_fd(fd)
+            if binary:
+                return self.zip_opener_helper(binary=True)
+            return self.zip_opener_helper()
+        return open(self.config.filename, mode)
 
     async def _close(self):
         if self.config.readwrite:
-            if self.config.filename.suffix == ".gz":
-                close = gzip.open(
-                    self.config.filename, self.WRITEMODE_COMPRESSED
-                )
-            elif self.config.filename.suffix == ".bz2":
-                close = bz2.open(
-                    self.config.filename, self.WRITEMODE_COMPRESSED
-                )
-            elif (
-                self.config.filename.suffix == ".xz"
-                or self.config.filename.suffix == ".lzma"
-            ):
-                close = lzma.open(
-                    self.config.filename, self.WRITEMODE_COMPRESSED
-                )
-            elif self.config.filename.suffix == ".zip":
-                close = self.zip_closer_helper()
-            else:
-                close = open(self.config.filename, self.WRITEMODE, newline="")
-            with close as fd:
+            with self._open_write() as fd:
                 await self.dump_fd(fd)
 
+    async def _close_atomic(self):
+        """
+        Write the file to a temporary file next to it, then rename the
+        temporary file over the original. A crash while writing leaves the
+        original file intact.
+        """
+        filename = self.config.filename.with_name(
+            self.config.filename.name + ".tmp"
+        )
+        with self._open_write(filename) as fd:
+            await self.dump_fd(fd)
+        if os.path.isfile(self.config.filename):
+            shutil.copymode(self.config.filename, filename)
+        os.replace(filename, self.config.filename)
+
+    def _open_write(self, filename: pathlib.Path = None):
+        """
+        Open the file, or another file, for writing, compressing it if the
+        source's filename's suffix says it's compressed.
+        """
+        if filename is None:
+            filename = self.config.filename
+        if self.config.filename.suffix == ".gz":
+            return gzip.open(filename, self.WRITEMODE_COMPRESSED)
+        elif self.config.filename.suffix == ".bz2":
+            return bz2.open(filename, self.WRITEMODE_COMPRESSED)
+        elif (
+            self.config.filename.suffix == ".xz"
+            or self.config.filename.suffix == ".lzma"
+        ):
+            return lzma.open(filename, self.WRITEMODE_COMPRESSED)
+        elif self.config.filename.suffix == ".zip":
+            if filename != self.config.filename:
+                return self.zip_closer_helper(filename)
+            return self.zip_closer_helper()
+        return open(filename, self.WRITEMODE, newline="")
+
+    @staticmethod
+    def _missing_newline(filename) -> bool:
+        """
+        True if the last line of an uncompressed file doesn't end with a
+        newline, which it won't if the process died while appending to it
+        """
+        if not os.path.isfile(filename):
+            return False
+        with open(filename, "rb") as fd:
+            fd.seek(0, os.SEEK_END)
+            if not fd.tell():
+                return False
+            fd.seek(-1, os.SEEK_END)
+            return fd.read(1) != b"\n"
+
+    @property
+    def index_filename(self) -> str:
+        """
+        File next to the file which sources may keep an index of it in
+        """
+        return str(self.config.filename) + ".index"
+
+    def _index_stamp(self) -> str:
+        """
+        Identifies the contents of the file an index was built from
+        """
+        stat = os.stat(self.config.filename)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
     @contextmanager
-    def zip_opener_helper(self):
+    def zip_opener_helper(self, binary: bool = False):
         with zipfile.ZipFile(self.config.filename) as archive:
             with archive.open(
-                self.__class__.__qualname__, mode=self.READMODE
+                self.__class__.__qualname__,
+                mode="r" if binary else self.READMODE,
             ) as zip_fd:
+                if binary:
+                    yield zip_fd
+                    return
                 with io.TextIOWrapper(zip_fd, write_through=True) as fd:
                     yield fd
 
     @contextmanager
-    def zip_closer_helper(self):
+    def zip_closer_helper(self, filename: pathlib.Path = None):
+        if filename is None:
+            filename = self.config.filename
         with zipfile.ZipFile(
-            self.config.filename, self.WRITEMODE, compression=zipfile.ZIP_BZIP2
+            filename, self.WRITEMODE, compression=zipfile.ZIP_BZIP2
         ) as archive:
             with archive.open(
                 self.__class__.__qualname__,
@@ -3,11 +3,16 @@
 """
 Loads records from an IDX1 file
 """
+import io
 import struct
+import importlib
+import collections.abc
+from typing import Dict, List, Any, Tuple, Iterator, AsyncIterator
 
 from ..record import Record
 from ..base import config, field
-from .memory import MemorySource
+from .memory import MemorySource, MemorySourceContext
+from .source import FEATURE_BATCH_SIZE
 from .file import BinaryFileSource
 from ..util.entrypoint import entrypoint
 
@@ -24,31 +29,115 @@ class IDX1SourceConfig(IDXSourceConfig):
     pass
 
 
+class IDXRecords(collections.abc.MutableMapping):
+    """
+    Records of an IDX file, keyed by their index in the file. Records are
+    created when accessed, with the feature set to the record's row of the
+    array, which is a view, so the file's data is not copied. Records which
+    are set are kept separately and take precedence.
+    """
+
+    def __init__(self, feature: str, array):
+        self.feature = feature
+        self.array = array
+        self.updated: Dict[str, Record] = {}
+
+    def index(self, key: str) -> int:
+        if (
+            isinstance(key, str)
+            and key.isdigit()
+            and int(key) < len(self.array)
+        ):
+            return int(key)
+        raise KeyError(key)
+
+    def __getitem__(self, key: str) -> Record:
+        if key in self.updated:
+            return self.updated[key]
+        value = self.array[self.index(key)]
+        # Rows of 1-D arrays are single values
+        if self.array.ndim == 1:
+            value = value.item()
+        return Record(key, data={"features": {self.feature: value}})
+
+    def __setitem__(self, key: str, record: Record):
+        self.updated[key] = record
+
+    def __delitem__(self, key: str):
+        del self.updated[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self.array)):
+            yield str(i)
+        for key in self.updated:
+            try:
+                self.index(key)
+            except KeyError:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self.array) + sum(
+            1
+            for key in self.updated
+            if not key.isdigit() or int(key) >= len(self.array)
+        )
+
+
+class IDXSourceContext(MemorySourceContext):
+    async def feature_batches(
+        self, features: List[str], batch_size: int = FEATURE_BATCH_SIZE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        mem = self.parent.mem
+        if (
+            not isinstance(mem, IDXRecords)
+            or mem.updated
+            or features != [mem.feature]
+        ):
+            async for batch in super().feature_batches(features, batch_size):
+                yield batch
+            return
+        # Contiguous slices of the array, which are views of it
+        for i in range(0, len(mem.array), batch_size):
+            yield {mem.feature: mem.array[i : i + batch_size]}
+
+
 @entrypoint("idx1")
 class IDX1Source(BinaryFileSource, MemorySource):
     """
     Source to read files in IDX1 format (such as MNIST digit label dataset).
+
+    Uncompressed files are memory mapped, and compressed files are read into
+    memory once, so that records are views of the data rather than copies.
     """
 
     CONFIG = IDX1SourceConfig
+    CONTEXT = IDXSourceContext
+
+    def load_array(self, xfile, offset: int, dtype: str, shape: Tuple[int]):
+        """
+        Array of the data after the header, which is offset bytes long
+        """
+        np = importlib.import_module("numpy")
+        if isinstance(xfile, io.BufferedReader):
+            return np.memmap(
+                self.config.filename,
+                dtype=dtype,
+                mode="r",
+                offset=offset,
+                shape=shape,
+            )
+        count = int(np.prod(shape))
+        data = xfile.read(count * np.dtype(dtype).itemsize)
+        return np.frombuffer(data, dtype=dtype, count=count).reshape(shape)
 
     async def load_fd(self, xfile):
         # Reading the binary datafile's details
         magic, size = struct.unpack(">II", xfile.read(8))
 
-        # Reading the rest of binary datafile one byte at a time
-        self.mem = {}
-        for i in range(size):
-            self.mem[str(i)] = Record(
-                str(i),
-                data={
-                    "features": {
-                        self.config.feature: struct.unpack(
-                            ">b", xfile.read(1)
-                        )[0]
-                    }
-                },
-            )
+        # Labels are signed bytes
+        self.mem = IDXRecords(
+            self.config.feature, self.load_array(xfile, 8, "i1", (size,))
+        )
 
         self.logger.debug("%r loaded %d records", self, len(self.mem))
 
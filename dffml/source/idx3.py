@@ -5,9 +5,8 @@ Loads records from an IDX3 file
 """
 import struct
 
-from ..record import Record
 from ..util.entrypoint import entrypoint
-from .idx1 import IDX1Source, IDXSourceConfig
+from .idx1 import IDX1Source, IDXSourceConfig, IDXRecords
 
 
 class IDX3SourceConfig(IDXSourceConfig):
@@ -18,6 +17,8 @@ class IDX3SourceConfig(IDXSourceConfig):
 class IDX3Source(IDX1Source):
     """
     Source to read files in IDX3 format (such as MNIST digit image dataset).
+
+    Each record's feature is its image, flattened into a row of the array.
     """
 
     CONFIG = IDX3SourceConfig
@@ -27,19 +28,10 @@ class IDX3Source(IDX1Source):
         magic, size = struct.unpack(">II", xfile.read(8))
         nrows, ncols = struct.unpack(">II", xfile.read(8))
 
-        self.mem = {}
-        inner_array_size = nrows * ncols
-        for i in range(0, size):
-            self.mem[str(i)] = Record(
-                str(i),
-                data={
-                    "features": {
-                        self.config.feature: struct.unpack(
-                            f">{inner_array_size}B",
-                            xfile.read(inner_array_size),
-                        )
-                    }
-                },
-            )
+        # Pixels are unsigned bytes
+        self.mem = IDXRecords(
+            self.config.feature,
+            self.load_array(xfile, 16, "u1", (size, nrows * ncols)),
+        )
 
         self.logger.debug("%r loaded %d records", self, len(self.mem))
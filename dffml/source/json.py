@@ -1,11 +1,13 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2019 Intel Corporation
+import os
 import json
 import asyncio
 from dataclasses import dataclass
 from contextlib import asynccontextmanager
-from typing import Dict
+from typing import Dict, Set
 
+from ..base import config, field
 from ..record import Record
 from .memory import MemorySource
 from .file import FileSource, FileSourceConfig
@@ -16,8 +18,25 @@ from .log import LOGGER
 LOGGER = LOGGER.getChild("json")
 
 
+@config
 class JSONSourceConfig(FileSourceConfig):
-    pass  # pragma: no cov
+    journal: bool = field(
+        "When closed, append records which were updated to a journal file "
+        "next to the file (its filename with .journal appended) rather than "
+        "rewriting the whole file. The journal is replayed when the file is "
+        "opened",
+        default=False,
+    )
+    compact: int = field(
+        "When journaling, rewrite the whole file and remove the journal once "
+        "the journal has this many entries",
+        default=1000,
+    )
+    thread: bool = field(
+        "Read and parse the file in a thread when it's opened, rather than on "
+        "the event loop",
+        default=False,
+    )
 
 
 @dataclass
@@ -25,6 +44,10 @@ class OpenJSONFile:
     data: Dict[str, Dict]
     active: int
     lock: asyncio.Lock
+    # Keys of records updated since the file was opened, by tag
+    dirty: Dict[str, Set[str]]
+    # Number of entries in the journal when the file was opened
+    journaled: int = 0
 
     async def inc(self):
         async with self.lock:
@@ -52,13 +75,13 @@ class JSONSource(FileSource, MemorySource):
         async with self.OPEN_JSON_FILES_LOCK:
             if self.config.filename not in self.OPEN_JSON_FILES:
                 self.logger.debug(f"{self.config.filename} first open")
-                self.OPEN_JSON_FILES[self.config.filename] = OpenJSONFile(
-                    data={}, active=1, lock=asyncio.Lock()
+                open_file = OpenJSONFile(
+                    data={}, active=1, lock=asyncio.Lock(), dirty={}
                 )
+                self.OPEN_JSON_FILES[self.config.filename] = open_file
                 if fd is not None:
-                    self.OPEN_JSON_FILES[
-                        self.config.filename
-                    ].data = json.load(fd)
+                    open_file.data = await self.parse_json(fd)
+                    self.replay_journal(open_file)
             else:
                 self.logger.debug(f"{self.config.filename} already open")
                 await self.OPEN_JSON_FILES[self.config.filename].inc()
@@ -89,3 +112,105 @@ class JSONSource(FileSource, MemorySource):
                 json.dump(records, fd)
                 self.logger.debug(f"{self.config.filename} written")
         LOGGER.debug("%r saved %d records", self, len(self.mem))
+
+    async def parse_json(self, fd):
+        if not getattr(self.config, "thread", False):
+            return json.load(fd)
+        return await asyncio.get_event_loop().run_in_executor(
+            None, json.load, fd
+        )
+
+    @property
+    def journal_filename(self) -> str:
+        return str(self.config.filename) + ".journal"
+
+    def replay_journal(self, open_file: OpenJSONFile):
+        """
+        Apply updates appended to the journal to the data loaded from the file
+        """
+        if not os.path.isfile(self.journal_filename):
+            return
+        with open(self.journal_filename) as fd:
+            for line in fd:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Only the last entry is partially written if the
+                    # process died while appending
+                    LOGGER.warning(
+                        "%s: skipping malformed entry %d",
+                        self.journal_filename,
+                        open_file.journaled + 1,
+                    )
+                    continue
+                open_file.data.setdefault(entry["tag"], {})
+                open_file.data[entry["tag"]][entry["key"]] = entry["data"]
+                open_file.journaled += 1
+
+    async def _release(self):
+        """
+        Stop sharing the loaded file with other sources when closed without
+        writing, so that the file is loaded again when next opened
+        """
+        async with self.OPEN_JSON_FILES_LOCK:
+            open_file = self.OPEN_JSON_FILES.get(self.config.filename, None)
+            if open_file is not None and await open_file.dec():
+                del self.OPEN_JSON_FILES[self.config.filename]
+
+    async def _close(self):
+        if not self.config.readwrite:
+            return await self._release()
+        if not getattr(self.config, "journal", False):
+            await super()._close()
+        elif await self.append_dirty():
+            return
+        else:
+            await self._close_atomic()
+        # Once the last open source for this file has rewritten it, the file
+        # holds all the updates in the journal
+        if (
+            self.config.filename not in self.OPEN_JSON_FILES
+            and os.path.isfile(self.journal_filename)
+        ):
+            os.unlink(self.journal_filename)
+
+    async def append_dirty(self) -> bool:
+        """
+        Append records updated since the file was opened to the journal.
+        Returns False if the whole file should be rewritten instead, because
+        it doesn't exist yet or the journal has grown too long.
+        """
+        async with self.OPEN_JSON_FILES_LOCK:
+            open_file = self.OPEN_JSON_FILES[self.config.filename]
+            records = open_file.data.setdefault(self.config.tag, {})
+            for key in self.dirty:
+                records[key] = self.mem[key].dict()
+            open_file.dirty.setdefault(self.config.tag, set())
+            open_file.dirty[self.config.tag].update(self.dirty)
+            self.dirty.clear()
+            # Leave writing to the last open source for this file
+            if open_file.active > 1:
+                await open_file.dec()
+                return True
+            if (
+                not os.path.isfile(self.config.filename)
+                or open_file.journaled >= self.config.compact
+            ):
+                return False
+            # End the last entry if the process died while appending it, so
+            # that it's the only one skipped when the journal is replayed
+            newline = self._missing_newline(self.journal_filename)
+            with open(self.journal_filename, "a") as fd:
+                if newline:
+                    fd.write("\n")
+                for tag, keys in open_file.dirty.items():
+                    for key in keys:
+                        entry = {
+                            "tag": tag,
+                            "key": key,
+                            "data": open_file.data[tag][key],
+                        }
+                        fd.write(json.dumps(entry) + "\n")
+            del self.OPEN_JSON_FILES[self.config.filename]
+            self.logger.debug(f"{self.journal_filename} updated")
+        return True
@@ -0,0 +1,355 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2020 Intel Corporation
+"""
+Loads records from a JSON lines file, one record per line
+"""
+import os
+import bz2
+import dbm
+import gzip
+import json
+import lzma
+import errno
+from typing import Dict, Tuple, Optional, Iterable, Iterator, AsyncIterator
+
+from ..record import Record
+from .memory import MemorySource, MemorySourceContext
+from .file import FileSource, FileSourceConfig
+from ..base import config, field
+from ..util.entrypoint import entrypoint
+
+JSONL_SOURCE_DEFAULT_TAG = "untagged"
+
+
+@config
+class JSONLinesSourceConfig(FileSourceConfig):
+    stream: bool = field(
+        "Read records from the file as they are requested rather than loading "
+        "the whole file into memory when opened. Updates are appended to the "
+        "file as they are made",
+        default=False,
+    )
+    index: bool = field(
+        "When streaming, keep an index of the byte offset of each record's "
+        "line in a file next to the file (its filename with .index appended) "
+        "so that records can be looked up by key without reading the file. "
+        "Not supported for compressed files",
+        default=False,
+    )
+    compact: int = field(
+        "When not streaming, rewrite the whole file rather than appending "
+        "updated records to it once it has this many lines superseded by "
+        "lines appended later",
+        default=1000,
+    )
+
+
+class JSONLinesSourceContext(MemorySourceContext):
+    async def update(self, record: Record):
+        if not self.parent.config.stream:
+            return await super().update(record)
+        if not self.parent.config.readwrite:
+            raise ValueError(f"{self.parent.config.filename} is read only")
+        self.parent.append([record])
+
+    async def records(self) -> AsyncIterator[Record]:
+        if not self.parent.config.stream:
+            async for record in super().records():
+                yield record
+            return
+        for _offset, tag, record in self.parent.stream_records():
+            if tag == self.parent.config.tag:
+                yield record
+
+    async def record(self, key: str) -> Record:
+        if not self.parent.config.stream:
+            return await super().record(key)
+        if self.parent.config.index:
+            return self.parent.indexed_record(key)
+        # Lines appended later take precedence
+        found = Record(key)
+        async for record in self.records():
+            if record.key == key:
+                found = record
+        return found
+
+
+@entrypoint("jsonl")
+class JSONLinesSource(FileSource, MemorySource):
+    """
+    Stores records in a JSON lines file, one record per line. Records are
+    tagged by their ``tag`` property, and are untagged if they don't have one.
+
+    Updated records are appended to the file when it's closed, rather than
+    rewriting the whole file. Lines appended later take precedence over
+    earlier lines for the same record. The file is rewritten once it has
+    ``compact`` superseded lines. Lines which aren't valid JSON, such as one
+    left partially written when a process died while appending, are skipped.
+
+    Set ``stream`` to read records from the file as they are requested, rather
+    than loading every record into memory when the source is opened. Updates
+    are appended to the file as they are made, and ``index`` may be set to
+    look up records by key using an index of byte offsets stored next to the
+    file.
+
+    >>> import asyncio
+    >>> from dffml import *
+    >>>
+    >>> async def main():
+    ...     async with JSONLinesSource(
+    ...         filename="records.jsonl", readwrite=True, allowempty=True
+    ...     ) as source:
+    ...         async with source() as sctx:
+    ...             await sctx.update(Record("a", data={"features": {"x": 1}}))
+    ...     async with JSONLinesSource(
+    ...         filename="records.jsonl", stream=True, index=True
+    ...     ) as source:
+    ...         async with source() as sctx:
+    ...             print((await sctx.record("a")).features())
+    >>>
+    >>> asyncio.run(main())
+    {'x': 1}
+    """
+
+    CONFIG = JSONLinesSourceConfig
+    CONTEXT = JSONLinesSourceContext
+
+    # Tags and keys are joined by a null byte in the index, so this key won't
+    # collide with any of theirs
+    INDEX_STAMP_KEY = "\x00stamp"
+
+    def __init__(self, config: JSONLinesSourceConfig) -> None:
+        super().__init__(config)
+        # Lines superseded by lines after them when the file was opened
+        self.superseded = 0
+        # File updates are appended to when streaming
+        self.append_fd = None
+
+    async def _open(self):
+        self.superseded = 0
+        if not self.config.stream:
+            return await super()._open()
+        if self.config.readwrite and self.config.filename.suffix == ".zip":
+            raise ValueError(
+                f"{self.config.filename} is a zip file, it can't be appended to"
+            )
+        if self.config.index and self.compressed:
+            raise ValueError(
+                f"{self.config.filename} is compressed, it can't be indexed"
+            )
+        if not os.path.isfile(self.config.filename):
+            if not self.config.allowempty:
+                raise FileNotFoundError(
+                    errno.ENOENT,
+                    os.strerror(errno.ENOENT),
+                    self.config.filename,
+                )
+        elif self.config.index:
+            self.build_index()
+        if self.config.readwrite:
+            self.append_fd = self._open_append()
+
+    async def _close(self):
+        if self.config.stream:
+            if self.append_fd is not None:
+                self.append_fd.close()
+                self.append_fd = None
+                # The index was updated as lines were appended
+                if self.config.index:
+                    with dbm.open(self.index_filename, "c") as index:
+                        index[self.INDEX_STAMP_KEY] = self._index_stamp()
+            return
+        if not self.config.readwrite:
+            return
+        if (
+            not os.path.isfile(self.config.filename)
+            or self.config.filename.suffix == ".zip"
+            or self.superseded >= self.config.compact
+        ):
+            return await self._close_atomic()
+        with self._open_append() as self.append_fd:
+            self.append(
+                record for key, record in self.mem.items() if key in self.dirty
+            )
+        self.append_fd = None
+        self.logger.debug(
+            "%r appended %d records", self, len(self.dirty),
+        )
+        self.dirty.clear()
+
+    @property
+    def compressed(self) -> bool:
+        return self.config.filename.suffix in (
+            ".gz",
+            ".bz2",
+            ".xz",
+            ".lzma",
+            ".zip",
+        )
+
+    def _open_append(self):
+        """
+        Open the file for appending bytes to, compressing them if its suffix
+        says it's compressed. Compressed streams are appended as new members.
+        Lines appended start on a line of their own, even if the file's last
+        line doesn't end with a newline.
+        """
+        if not self.compressed:
+            newline = self._missing_newline(self.config.filename)
+            fd = open(self.config.filename, "ab")
+            if newline:
+                fd.write(b"\n")
+            return fd
+        # Finding the last byte of a compressed file means decompressing all
+        # of it, so start with a newline. Blank lines are skipped.
+        newline = (
+            os.path.isfile(self.config.filename)
+            and os.stat(self.config.filename).st_size > 0
+        )
+        if self.config.filename.suffix == ".gz":
+            fd = gzip.open(self.config.filename, "ab")
+        elif self.config.filename.suffix == ".bz2":
+            fd = bz2.open(self.config.filename, "ab")
+        else:
+            fd = lzma.open(self.config.filename, "ab")
+        if newline:
+            fd.write(b"\n")
+        return fd
+
+    def record_line(self, record: Record) -> str:
+        line = record.dict()
+        if self.config.tag != JSONL_SOURCE_DEFAULT_TAG:
+            line["tag"] = self.config.tag
+        return json.dumps(line) + "\n"
+
+    @staticmethod
+    def line_record(line: Dict) -> Tuple[str, Record]:
+        tag = line.pop("tag", JSONL_SOURCE_DEFAULT_TAG)
+        return tag, Record(line["key"], data=line)
+
+    def append(self, records: Iterable[Record]):
+        """
+        Append lines for records to the file, updating the index if there is
+        one
+        """
+        index = None
+        if self.config.stream and self.config.index:
+            index = dbm.open(self.index_filename, "c")
+        try:
+            for record in records:
+                offset = self.append_fd.tell()
+                self.append_fd.write(self.record_line(record).encode())
+                if index is not None:
+                    index[f"{self.config.tag}\x00{record.key}"] = str(offset)
+        finally:
+            if index is not None:
+                index.close()
+        self.append_fd.flush()
+
+    def parse_line(self, line) -> Optional[Dict]:
+        """
+        Parse a line of the file. Returns None if it's blank, or if it isn't
+        valid JSON, which it won't be if the process died while appending it.
+        """
+        if not line.strip():
+            return None
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            self.logger.warning(
+                "%s: skipping malformed line: %r",
+                self.config.filename,
+                line[:80],
+            )
+            return None
+
+    def _lines(self, fd, offset: int = 0) -> Iterator[Tuple[int, Dict]]:
+        """
+        Parse lines from a binary file along with the byte offset each starts
+        at
+        """
+        for line in iter(fd.readline, b""):
+            data = self.parse_line(line)
+            if data is not None:
+                yield offset, data
+            offset += len(line)
+
+    def stream_records(self) -> Iterator[Tuple[int, str, Record]]:
+        """
+        Read records from the file one line at a time. Yields the byte offset
+        of each line, along with the tag and record parsed from it.
+        """
+        if not os.path.isfile(self.config.filename):
+            return
+        with self._open_read(binary=True) as fd:
+            for offset, line in self._lines(fd):
+                yield (offset, *self.line_record(line))
+
+    def build_index(self):
+        """
+        Create or update the index of byte offsets of each record's line,
+        unless it's up to date with the file
+        """
+        stamp = self._index_stamp()
+        with dbm.open(self.index_filename, "c") as index:
+            if index.get(self.INDEX_STAMP_KEY, b"").decode() == stamp:
+                return
+            self.logger.debug("Building index %s", self.index_filename)
+            for key in list(index.keys()):
+                del index[key]
+            for offset, tag, record in self.stream_records():
+                index[f"{tag}\x00{record.key}"] = str(offset)
+            index[self.INDEX_STAMP_KEY] = stamp
+
+    def indexed_record(self, key: str) -> Record:
+        """
+        Read the line of the record with the given key using the index
+        """
+        if not os.path.isfile(self.config.filename):
+            return Record(key)
+        with dbm.open(self.index_filename, "c") as index:
+            offset = index.get(f"{self.config.tag}\x00{key}", None)
+        if offset is None:
+            return Record(key)
+        with open(self.config.filename, "rb") as fd:
+            fd.seek(int(offset))
+            return self.line_record(json.loads(fd.readline()))[1]
+
+    async def load_fd(self, fd):
+        self.mem = {}
+        tagged = set()
+        for line in fd:
+            data = self.parse_line(line)
+            if data is None:
+                continue
+            tag, record = self.line_record(data)
+            if (tag, record.key) in tagged:
+                self.superseded += 1
+            tagged.add((tag, record.key))
+            if tag == self.config.tag:
+                self.mem[record.key] = record
+        self.logger.debug("%r loaded %d records", self, len(self.mem))
+
+    async def dump_fd(self, fd):
+        # Keep the last line of each record with another tag
+        others = {}
+        if os.path.isfile(self.config.filename):
+            with self._open_read() as original:
+                for line in original:
+                    data = self.parse_line(line)
+                    if data is None:
+                        continue
+                    tag = data.get("tag", JSONL_SOURCE_DEFAULT_TAG)
+                    if tag != self.config.tag:
+                        others[(tag, data["key"])] = line.rstrip("\n")
+        for line in others.values():
+            fd.write(line + "\n")
+        for record in self.mem.values():
+            fd.write(self.record_line(record))
+        self.dirty.clear()
+        self.logger.debug(
+            "%r saved %d records, kept %d records with other tags",
+            self,
+            len(self.mem),
+            len(others),
+        )
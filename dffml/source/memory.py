@@ -3,17 +3,20 @@
 """
 Fake data sources used for testing
 """
-from typing import Dict, List, AsyncIterator
+import importlib
+import itertools
+from typing import Dict, List, Set, Any, AsyncIterator
 
 from ..base import config, field
 from ..record import Record
-from .source import BaseSourceContext, BaseSource
+from .source import BaseSourceContext, BaseSource, FEATURE_BATCH_SIZE
 from ..util.entrypoint import entrypoint
 
 
 class MemorySourceContext(BaseSourceContext):
     async def update(self, record):
         self.parent.mem[record.key] = record
+        self.parent.dirty.add(record.key)
 
     async def records(self) -> AsyncIterator[Record]:
         for record in self.parent.mem.values():
@@ -22,6 +25,23 @@ class MemorySourceContext(BaseSourceContext):
     async def record(self, key: str) -> Record:
         return self.parent.mem.get(key, Record(key))
 
+    async def feature_batches(
+        self, features: List[str], batch_size: int = FEATURE_BATCH_SIZE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        np = importlib.import_module("numpy")
+        rows = filter(
+            lambda row: all(feature in row for feature in features),
+            map(lambda record: record.data.features, self.parent.mem.values()),
+        )
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+            yield {
+                feature: np.array([row[feature] for row in batch])
+                for feature in features
+            }
+
 
 @config
 class MemorySourceConfig:
@@ -43,6 +63,8 @@ class MemorySource(BaseSource):
     def __init__(self, config: MemorySourceConfig) -> None:
         super().__init__(config)
         self.mem: Dict[str, Record] = {}
+        # Keys of records which have been updated since the source was opened
+        self.dirty: Set[str] = set()
         if isinstance(self.config, MemorySourceConfig):
             self.mem = {record.key: record for record in self.config.records}
 
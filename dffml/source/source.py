@@ -5,8 +5,11 @@ Source subclasses are responsible for generating an integer value given an open
 source project's source URL.
 """
 import abc
+import operator
 import unittest
-from typing import AsyncIterator, List, Optional, Callable
+import importlib
+import collections
+from typing import AsyncIterator, List, Optional, Callable, Dict, Any
 
 from ..base import (
     BaseDataFlowFacilitatorObjectContext,
@@ -21,6 +24,12 @@ from ..util.asynchelper import (
 from ..util.entrypoint import base_entry_point
 from .log import LOGGER
 
+# Default number of records in each batch yielded by feature_batches
+FEATURE_BATCH_SIZE = 1024
+# Number of records from the first source whose keys are looked up in the
+# other sources at a time when merging records from multiple sources
+MERGE_BATCH_SIZE = 1024
+
 
 class NoRecordsWithMatchingFeatures(Exception):
     """
@@ -41,6 +50,115 @@ class NoRecordsWithMatchingFeaturesHelper(unittest.TestCase):
         super().__init__(methodName="defaultTestResult")
 
 
+# Operations which may be used in the conditions of a query, and the functions
+# used to check them
+QUERY_OPERATIONS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+FeatureCondition = collections.namedtuple(
+    "FeatureCondition", ["feature", "operation", "value"]
+)
+
+
+def query_conditions(
+    conditions: Optional[List[FeatureCondition]] = None,
+) -> List[FeatureCondition]:
+    """
+    Convert conditions given as tuples of (feature, operation, value) to
+    :py:class:`FeatureCondition` objects, checking that their operations are
+    one of the :py:data:`QUERY_OPERATIONS`.
+    """
+    if conditions is None:
+        return []
+    conditions = list(map(FeatureCondition._make, conditions))
+    for condition in conditions:
+        if condition.operation not in QUERY_OPERATIONS:
+            raise ValueError(
+                f"Unsupported operation {condition.operation!r} in "
+                f"{condition!r}, must be one of {list(QUERY_OPERATIONS)}"
+            )
+    return conditions
+
+
+def record_query_check(
+    features: Optional[List[str]] = None,
+    keys: Optional[List[str]] = None,
+    key_start: Optional[str] = None,
+    key_end: Optional[str] = None,
+    conditions: Optional[List[FeatureCondition]] = None,
+) -> Callable[[Record], bool]:
+    """
+    Returns a function which checks if a record satisfies a query. See
+    :py:meth:`BaseSourceContext.query` for the meaning of each argument.
+    """
+    conditions = query_conditions(conditions)
+    if keys is not None:
+        keys = set(keys)
+
+    def check(record: Record) -> bool:
+        if keys is not None and record.key not in keys:
+            return False
+        if key_start is not None and record.key < key_start:
+            return False
+        if key_end is not None and record.key >= key_end:
+            return False
+        record_features = record.features()
+        if features is not None and not all(
+            feature in record_features for feature in features
+        ):
+            return False
+        for condition in conditions:
+            if condition.feature not in record_features:
+                return False
+            try:
+                if not QUERY_OPERATIONS[condition.operation](
+                    record_features[condition.feature], condition.value
+                ):
+                    return False
+            except TypeError:
+                # Values which can't be compared, such as None and a number
+                return False
+        return True
+
+    return check
+
+
+async def record_feature_batches(
+    records: AsyncIterator[Record],
+    features: List[str],
+    batch_size: int = FEATURE_BATCH_SIZE,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Group the values of features of records which have all the requested
+    features into NumPy arrays, one for each feature, of up to ``batch_size``
+    values.
+    """
+    np = importlib.import_module("numpy")
+    rows = []
+    async for record in records:
+        record_features = record.features(features)
+        if len(record_features) != len(features):
+            continue
+        rows.append(record_features)
+        if len(rows) == batch_size:
+            yield {
+                feature: np.array([row[feature] for row in rows])
+                for feature in features
+            }
+            rows = []
+    if rows:
+        yield {
+            feature: np.array([row[feature] for row in rows])
+            for feature in features
+        }
+
+
 class BaseSourceContext(BaseDataFlowFacilitatorObjectContext):
     def __init__(self, parent: "BaseSource") -> None:
         self.parent = parent
@@ -71,6 +189,37 @@ class BaseSourceContext(BaseDataFlowFacilitatorObjectContext):
         {'key': 'one', 'features': {'feed': 'face'}, 'extra': {}}
         """
 
+    async def update_many(self, records: List[Record]):
+        """
+        Updates many records for a source. Sources which can write several
+        records more efficiently than one at a time should override this
+        method. By default :py:meth:`update` is called for each record.
+
+        Examples
+        --------
+
+        >>> import asyncio
+        >>> from dffml import *
+        >>>
+        >>> async def main():
+        ...     async with MemorySource(records=[]) as source:
+        ...         async with source() as ctx:
+        ...             await ctx.update_many(
+        ...                 [
+        ...                     Record("one", data=dict(features=dict(feed="face"))),
+        ...                     Record("two", data=dict(features=dict(dead="beef"))),
+        ...                 ]
+        ...             )
+        ...             async for record in ctx.records():
+        ...                 print(record.export())
+        >>>
+        >>> asyncio.run(main())
+        {'key': 'one', 'features': {'feed': 'face'}, 'extra': {}}
+        {'key': 'two', 'features': {'dead': 'beef'}, 'extra': {}}
+        """
+        for record in records:
+            await self.update(record)
+
     @abc.abstractmethod
     async def records(self) -> AsyncIterator[Record]:
         """
@@ -121,6 +270,113 @@ class BaseSourceContext(BaseDataFlowFacilitatorObjectContext):
         {'key': 'one', 'extra': {}}
         """
 
+    async def records_by_keys(self, keys: List[str]) -> Dict[str, Record]:
+        """
+        Returns a dict mapping each key to its record, as :py:meth:`record`
+        would return it. Sources which can look up many records at once, such
+        as databases, should override this method. By default
+        :py:meth:`record` is called for each key.
+
+        Examples
+        --------
+
+        >>> import asyncio
+        >>> from dffml import *
+        >>>
+        >>> async def main():
+        ...     async with MemorySource(records=[
+        ...         Record(str(i), data=dict(features=dict(x=i)))
+        ...         for i in range(5)
+        ...     ]) as source:
+        ...         async with source() as ctx:
+        ...             records = await ctx.records_by_keys(["1", "3", "7"])
+        ...             for key, record in records.items():
+        ...                 print(key, record.features())
+        >>>
+        >>> asyncio.run(main())
+        1 {'x': 1}
+        3 {'x': 3}
+        7 {}
+        """
+        return {key: await self.record(key) for key in keys}
+
+    async def query(
+        self,
+        features: Optional[List[str]] = None,
+        keys: Optional[List[str]] = None,
+        key_start: Optional[str] = None,
+        key_end: Optional[str] = None,
+        conditions: Optional[List[FeatureCondition]] = None,
+    ) -> AsyncIterator[Record]:
+        """
+        Returns the records which satisfy all of the given arguments. Sources
+        which can select records and features without reading every record,
+        such as databases, should override this method. By default all
+        records are read and checked.
+
+        Parameters
+        ----------
+        features : list, optional
+            Only records which have all of these features. Records returned
+            may only have these features, since sources may only read them.
+        keys : list, optional
+            Only records with one of these keys.
+        key_start : str, optional
+            Only records with keys greater than or equal to this key.
+        key_end : str, optional
+            Only records with keys less than this key.
+        conditions : list, optional
+            Tuples of (feature, operation, value). Only records whose value for
+            each feature compared to the value with the operation is true.
+            Operations are one of ``=``, ``!=``, ``<``, ``<=``, ``>``, ``>=``.
+
+        Examples
+        --------
+
+        >>> import asyncio
+        >>> from dffml import *
+        >>>
+        >>> async def main():
+        ...     async with MemorySource(records=[
+        ...         Record(str(i), data=dict(features=dict(x=i, y=i * 2)))
+        ...         for i in range(5)
+        ...     ]) as source:
+        ...         async with source() as ctx:
+        ...             async for record in ctx.query(
+        ...                 features=["y"], key_start="1", conditions=[("x", "<", 3)]
+        ...             ):
+        ...                 print(record.key, record.feature("y"))
+        >>>
+        >>> asyncio.run(main())
+        1 2
+        2 4
+        """
+        check = record_query_check(
+            features=features,
+            keys=keys,
+            key_start=key_start,
+            key_end=key_end,
+            conditions=conditions,
+        )
+        async for record in self.records():
+            if check(record):
+                yield record
+
+    async def feature_batches(
+        self, features: List[str], batch_size: int = FEATURE_BATCH_SIZE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields dicts mapping each of the requested features to a NumPy array
+        of up to ``batch_size`` values. Only records which have all the
+        requested features are included. Sources which can read feature
+        values without creating :py:class:`Record <dffml.record.Record>`
+        objects should override this method.
+        """
+        async for batch in record_feature_batches(
+            self.records(), features, batch_size
+        ):
+            yield batch
+
 
 @base_entry_point("dffml.source", "source")
 class BaseSource(BaseDataFlowFacilitatorObject):
@@ -139,8 +395,15 @@ class SourcesContext(AsyncContextManagerListContext):
         Updates a record for a source
         """
         LOGGER.debug("Updating %r: %r", record.key, record.dict())
+        await self.update_many([record])
+
+    async def update_many(self, records: List[Record]):
+        """
+        Updates many records for each source
+        """
+        LOGGER.debug("Updating %d records", len(records))
         for source in self:
-            await source.update(record)
+            await source.update_many(records)
 
     async def records(
         self, validation: Optional[Callable[[Record], bool]] = None
@@ -149,15 +412,58 @@ class SourcesContext(AsyncContextManagerListContext):
         Retrieves records from all sources
         """
         for source in self:
+            # NOTE In Python 3.7.3 self[1:] works, however in Python >
+            # 3.7.3 only self.data works
+            if not self.data[1:]:
+                async for record in source.records():
+                    if validation is None or validation(record):
+                        yield record
+                break
+            # Look up the keys of a batch of records in the other sources at
+            # once, rather than one record at a time
+            batch = []
             async for record in source.records():
-                # NOTE In Python 3.7.3 self[1:] works, however in Python >
-                # 3.7.3 only self.data works
-                for other_source in self.data[1:]:
-                    record.merge(await other_source.record(record.key))
-                if validation is None or validation(record):
+                batch.append(record)
+                if len(batch) < MERGE_BATCH_SIZE:
+                    continue
+                async for record in self._merge(batch, validation):
                     yield record
+                batch = []
+            async for record in self._merge(batch, validation):
+                yield record
             break
 
+    async def _merge(
+        self,
+        batch: List[Record],
+        validation: Optional[Callable[[Record], bool]] = None,
+    ) -> AsyncIterator[Record]:
+        """
+        Merge records from the first source with those for the same keys in
+        the other sources
+        """
+        if not batch:
+            return
+        keys = [record.key for record in batch]
+        for other_source in self.data[1:]:
+            others = await other_source.records_by_keys(keys)
+            for record in batch:
+                record.merge(others[record.key])
+        for record in batch:
+            if validation is None or validation(record):
+                yield record
+
+    async def records_by_keys(self, keys: List[str]) -> Dict[str, Record]:
+        """
+        Retrieve records with all sources for each key
+        """
+        records = {key: Record(key) for key in keys}
+        for source in self:
+            others = await source.records_by_keys(keys)
+            for key, record in records.items():
+                record.merge(others[key])
+        return records
+
     async def record(self, key: str):
         """
         Retrieve and or register record will all sources
@@ -173,6 +479,14 @@ class SourcesContext(AsyncContextManagerListContext):
         """
         Returns all records which have the requested features
         """
+        # Only the requested features need to be read from the source
+        if len(self.data) == 1:
+            found = False
+            async for record in self.query(features=features):
+                found = True
+                yield record
+            if found:
+                return
         # Check if we found any records
         found: bool = False
         # We have to declare count as a list so that we can use it within the
@@ -205,6 +519,80 @@ class SourcesContext(AsyncContextManagerListContext):
                 f"{available_features}. Searched {count[0]} records.",
             )
 
+    def _query(self, **kwargs) -> AsyncIterator[Record]:
+        if len(self.data) == 1:
+            return self.data[0].query(**kwargs)
+        # Records from each source must be merged
+        return self.records(record_query_check(**kwargs))
+
+    async def query(
+        self,
+        features: Optional[List[str]] = None,
+        keys: Optional[List[str]] = None,
+        key_start: Optional[str] = None,
+        key_end: Optional[str] = None,
+        conditions: Optional[List[FeatureCondition]] = None,
+    ) -> AsyncIterator[Record]:
+        """
+        Returns the records which satisfy all of the given arguments. See
+        :py:meth:`BaseSourceContext.query` for the meaning of each argument.
+        The query is passed to the source when there is only one, so that it
+        only reads what it needs to.
+        """
+        async for record in self._query(
+            features=features,
+            keys=keys,
+            key_start=key_start,
+            key_end=key_end,
+            conditions=conditions,
+        ):
+            yield record
+
+    def _feature_batches(
+        self, features: List[str], batch_size: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        if len(self.data) == 1:
+            return self.data[0].feature_batches(features, batch_size)
+        # Records from each source must be merged
+        return record_feature_batches(self.records(), features, batch_size)
+
+    async def feature_batches(
+        self, features: List[str], batch_size: int = FEATURE_BATCH_SIZE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields dicts mapping each of the requested features to a NumPy array
+        of up to ``batch_size`` values, for all records which have the
+        requested features. Use this instead of :py:meth:`with_features` to
+        train on arrays of feature values.
+
+        Examples
+        --------
+
+        >>> import asyncio
+        >>> from dffml import *
+        >>>
+        >>> async def main():
+        ...     async with Sources(MemorySource(records=[
+        ...         Record(str(i), data=dict(features=dict(x=i, y=i * 2)))
+        ...         for i in range(5)
+        ...     ])) as sources:
+        ...         async with sources() as sctx:
+        ...             async for batch in sctx.feature_batches(["x", "y"], 3):
+        ...                 print(batch["x"], batch["y"])
+        >>>
+        >>> asyncio.run(main())
+        [0 1 2] [0 2 4]
+        [3 4] [6 8]
+        """
+        found = False
+        async for batch in self._feature_batches(features, batch_size):
+            found = True
+            yield batch
+        if not found:
+            # Raises an error describing which features are available
+            async for _record in self.with_features(features):
+                pass
+
 
 class Sources(AsyncContextManagerList):
 
@@ -222,6 +610,16 @@ class ValidationSourcesContext(SourcesContext):
             ):
                 yield record
 
+    def _feature_batches(
+        self, features: List[str], batch_size: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        # Only records which pass validation
+        return record_feature_batches(self.records(), features, batch_size)
+
+    def _query(self, **kwargs) -> AsyncIterator[Record]:
+        # Only records which pass validation
+        return self.records(record_query_check(**kwargs))
+
 
 class ValidationSources(Sources):
     """
@@ -242,10 +640,23 @@ class SubsetSourcesContext(SourcesContext):
     async def records(
         self, validation: Optional[Callable[[Record], bool]] = None
     ) -> AsyncIterator[Record]:
-        for key in self.parent.keys:
-            record = await self.record(key)
-            if validation is None or validation(record):
-                yield record
+        for i in range(0, len(self.parent.keys), MERGE_BATCH_SIZE):
+            records = await self.records_by_keys(
+                self.parent.keys[i : i + MERGE_BATCH_SIZE]
+            )
+            for record in records.values():
+                if validation is None or validation(record):
+                    yield record
+
+    def _feature_batches(
+        self, features: List[str], batch_size: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        # Only records within the subset
+        return record_feature_batches(self.records(), features, batch_size)
+
+    def _query(self, **kwargs) -> AsyncIterator[Record]:
+        # Only records within the subset
+        return self.records(record_query_check(**kwargs))
 
 
 class SubsetSources(Sources):
@@ -4,10 +4,12 @@
 WARNING: concurrent can be much slower for quick tasks. It is best used for long
 running concurrent tasks.
 """
+import heapq
 import inspect
 import asyncio
+import itertools
 from collections import UserList
-from contextlib import AsyncExitStack
+from contextlib import AsyncExitStack, asynccontextmanager
 from typing import (
     Dict,
     Any,
@@ -133,6 +135,74 @@ async def concurrently(
                 task.exception()
 
 
+class PrioritySemaphore(object):
+    """
+    Semaphore which, when a slot frees up, hands it to the waiter with the
+    lowest priority value. Waiters of equal priority are served in the order
+    they started waiting. A value of None means there is no limit.
+
+    >>> import asyncio
+    >>> from dffml import *
+    >>>
+    >>> async def main():
+    ...     semaphore = PrioritySemaphore(1)
+    ...     async with semaphore(priority=0):
+    ...         print(semaphore.locked())
+    ...     print(semaphore.locked())
+    >>>
+    >>> asyncio.run(main())
+    True
+    False
+    """
+
+    def __init__(self, value: Optional[int] = None):
+        if value is not None and value < 1:
+            raise ValueError(f"value must be None or at least 1, got {value}")
+        self.value = value
+        # Heap of (priority, order started waiting, future)
+        self.waiters = []
+        self.counter = itertools.count()
+
+    def locked(self) -> bool:
+        return self.value is not None and self.value == 0
+
+    @asynccontextmanager
+    async def __call__(self, priority: int = 0):
+        if self.value is None:
+            yield
+            return
+        if self.value > 0 and not self.waiters:
+            self.value -= 1
+        else:
+            future = asyncio.get_event_loop().create_future()
+            heapq.heappush(
+                self.waiters, (priority, next(self.counter), future)
+            )
+            try:
+                await future
+            except asyncio.CancelledError:
+                # If the slot was handed to us before we were cancelled, hand
+                # it to the next waiter. Otherwise our future is cancelled and
+                # will be skipped on release.
+                if future.done() and not future.cancelled():
+                    self.release()
+                raise
+        try:
+            yield
+        finally:
+            self.release()
+
+    def release(self):
+        # Hand the slot directly to the next waiter so that it can't be taken
+        # by someone who hasn't been waiting
+        while self.waiters:
+            _priority, _order, future = heapq.heappop(self.waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.value += 1
+
+
 async def aenter_stack(
     obj: Any,
     context_managers: Dict[str, AsyncContextManager],
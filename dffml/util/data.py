@@ -5,10 +5,13 @@ Run doctests with
 
 python -m doctest -v dffml/util/data.py
 """
+import re
 import ast
+import json
 import uuid
 import types
 import pydoc
+import hashlib
 import inspect
 import dataclasses
 import collections
@@ -301,6 +304,54 @@ def export(obj):
     return export_dict(value=obj)["value"]
 
 
+# Default reprs of objects include their address in memory, which changes
+# between runs
+_MEMORY_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+def _stable_hash_repr(obj) -> str:
+    representation = repr(obj)
+    if _MEMORY_ADDRESS.search(representation):
+        raise TypeError(f"Can't hash {representation} stably")
+    return representation
+
+
+def _stable_hash_default(obj):
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=repr)
+    exported = export(obj)
+    if exported is obj:
+        return _stable_hash_repr(obj)
+    return exported
+
+
+def stable_hash(*values) -> str:
+    """
+    SHA384 hash of values which stays the same across runs of a program, so
+    long as the values are primitives, or can be exported (see
+    :py:func:`export`). Other values are hashed using their ``repr``. Raises
+    :py:class:`TypeError` if a ``repr`` includes a memory address.
+
+    Examples
+    --------
+
+    >>> from dffml import stable_hash
+    >>>
+    >>> stable_hash({"a": 1, "b": 2}) == stable_hash({"b": 2, "a": 1})
+    True
+    >>> stable_hash({"a": 1}) == stable_hash({"a": 2})
+    False
+    """
+    try:
+        serialized = json.dumps(
+            values, sort_keys=True, default=_stable_hash_default
+        )
+    except (TypeError, ValueError):
+        # Keys of differing types can't be sorted
+        serialized = _stable_hash_repr(values)
+    return hashlib.sha384(serialized.encode()).hexdigest()
+
+
 def explore_directories(path_dict: dict):
     """
     Recursively explores any path binded to a key in `path_dict`
@@ -189,12 +189,14 @@ class PyTorchModelContext(ModelContext):
 
     async def prediction_data_generator(self, data):
         dataset = NumpyToTensor(
-            [data],
+            data,
             size=self.parent.config.imageSize,
             norm_mean=self.parent.config.normalize_mean,
             norm_std=self.parent.config.normalize_std,
         )
-        dataloader = torch.utils.data.DataLoader(dataset)
+        dataloader = torch.utils.data.DataLoader(
+            dataset, batch_size=self.parent.config.batch_size
+        )
         return dataloader
 
     async def train(self, sources: Sources):
@@ -385,26 +387,33 @@ class PyTorchModelContext(ModelContext):
             raise ModelNotTrained("Train model before prediction.")
 
         self._model.eval()
-        async for record in sources.with_features(self.features):
-            feature_data = record.features(self.features)[self.features[0]]
-            predict = await self.prediction_data_generator(feature_data)
-            target = self.parent.config.predict.name
-
-            with torch.no_grad():
-                for val in predict:
-                    val = val.to(self.device)
-                    output = self._model(val)
+        async for record in self.predict_batches(
+            sources, self.features, self.parent.config.predict.name
+        ):
+            yield record
 
-                    if self.classifications:
-                        prob = torch.nn.functional.softmax(output, dim=1)
-                        confidence, prediction_value = prob.topk(1, dim=1)
-                        record.predicted(
-                            target,
-                            self.cids[prediction_value.item()],
-                            confidence,
+    async def predict_batch(
+        self, batch: Dict[str, Any]
+    ) -> Tuple[List[Any], List[float]]:
+        predict = await self.prediction_data_generator(batch[self.features[0]])
+        values = []
+        confidences = []
+        with torch.no_grad():
+            for val in predict:
+                val = val.to(self.device)
+                output = self._model(val)
+
+                if self.classifications:
+                    prob = torch.nn.functional.softmax(output, dim=1)
+                    confidence, prediction_value = prob.topk(1, dim=1)
+                    values.extend(
+                        self.cids[value.item()] for value in prediction_value
+                    )
+                    confidences.extend(value.item() for value in confidence)
+                else:
+                    for sample, sample_output in zip(val, output):
+                        values.append(sample_output)
+                        confidences.append(
+                            1.0 - self.criterion(sample, sample_output).item()
                         )
-                    else:
-                        confidence = 1.0 - self.criterion(val, output).item()
-                        record.predicted(target, output, confidence)
-
-            yield record
+        return values, confidences
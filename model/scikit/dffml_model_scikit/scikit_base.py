@@ -7,9 +7,10 @@ import json
 import hashlib
 import pathlib
 import logging
+import inspect
 import importlib
 
-from typing import AsyncIterator, Tuple, Any, NamedTuple
+from typing import AsyncIterator, Tuple, Any, NamedTuple, Dict, List
 
 from sklearn.metrics import silhouette_score, mutual_info_score
 
@@ -31,6 +32,14 @@ from dffml.source.source import Sources, SourcesContext
 from dffml.model.model import ModelConfig, ModelContext, Model, ModelNotTrained
 from dffml.feature.feature import Features, Feature
 
+# Config properties of models with a partial_fit method, which configure how
+# they are trained rather than being passed to the scikit model
+PARTIAL_FIT_PROPERTIES = [
+    "partial_fit",
+    "partial_fit_batch_size",
+    "partial_fit_epochs",
+]
+
 
 class ScikitConfig(ModelConfig, NamedTuple):
     directory: pathlib.Path
@@ -62,6 +71,7 @@ class ScikitContext(ModelContext):
                 "{}{}".format(k, v)
                 for k, v in self.parent.config._asdict().items()
                 if k not in ["features", "tcluster", "predict"]
+                and k not in PARTIAL_FIT_PROPERTIES
             ]
         )
         return hashlib.sha384(
@@ -80,13 +90,76 @@ class ScikitContext(ModelContext):
             del config["directory"]
             del config["predict"]
             del config["features"]
+            for name in PARTIAL_FIT_PROPERTIES:
+                config.pop(name, None)
             self.clf = self.parent.SCIKIT_MODEL(**config)
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
         pass
 
+    def batch_xdata(self, batch: Dict[str, Any]):
+        """
+        Join the arrays of each feature in a batch into one array, with a row
+        per record. Features with more than one dimension are flattened into
+        columns.
+        """
+        return self.np.hstack(
+            [
+                batch[feature].reshape(len(batch[feature]), -1)
+                for feature in self.features
+            ]
+        )
+
+    async def partial_fit(self, sources: Sources, target: List[str]):
+        """
+        Train by calling the scikit model's ``partial_fit`` method with batches
+        of ``partial_fit_batch_size`` records, once for each batch in each of
+        ``partial_fit_epochs`` passes over the records. Only one batch is held
+        in memory at a time. ``target`` is the name of the feature holding
+        the values to be predicted, if the model is supervised.
+        """
+        config = self.parent.config
+        kwargs = {}
+        # Classifiers must be told every class they'll see on their first
+        # call to partial_fit, so find them with a pass over only the target
+        # values
+        if (
+            target
+            and self.clf._estimator_type == "classifier"
+            and "classes" in inspect.signature(self.clf.partial_fit).parameters
+        ):
+            classes = set()
+            async for batch in sources.feature_batches(
+                target, config.partial_fit_batch_size
+            ):
+                classes.update(batch[target[0]].ravel().tolist())
+            kwargs["classes"] = self.np.array(sorted(classes))
+        for epoch in range(config.partial_fit_epochs):
+            records = 0
+            async for batch in sources.feature_batches(
+                self.features + target, config.partial_fit_batch_size
+            ):
+                xdata = self.batch_xdata(batch)
+                if target:
+                    self.clf.partial_fit(
+                        xdata, batch[target[0]].ravel(), **kwargs
+                    )
+                else:
+                    self.clf.partial_fit(xdata)
+                records += len(xdata)
+            self.logger.info(
+                "Epoch {}: Number of input records: {}".format(
+                    epoch + 1, records
+                )
+            )
+        self.joblib.dump(self.clf, str(self._filepath))
+
     async def train(self, sources: Sources):
+        if getattr(self.parent.config, "partial_fit", False):
+            return await self.partial_fit(
+                sources, [self.parent.config.predict.name]
+            )
         xdata = []
         ydata = []
         async for record in sources.with_features(
@@ -132,26 +205,16 @@ class ScikitContext(ModelContext):
     ) -> AsyncIterator[Tuple[Record, Any, float]]:
         if not self._filepath.is_file():
             raise ModelNotTrained("Train model before prediction.")
-        async for record in sources.with_features(self.features):
-            record_data = []
-            for feature in record.features(self.features).values():
-                record_data.extend(
-                    [feature] if self.np.isscalar(feature) else feature
-                )
-            predict = self.np.array([record_data])
-            self.logger.debug(
-                "Predicted Value of {} for {}: {}".format(
-                    self.parent.config.predict,
-                    predict,
-                    self.clf.predict(predict),
-                )
-            )
-            target = self.parent.config.predict.name
-            record.predicted(
-                target, self.clf.predict(predict)[0], self.confidence
-            )
+        async for record in self.predict_batches(
+            sources, self.features, self.parent.config.predict.name
+        ):
             yield record
 
+    async def predict_batch(
+        self, batch: Dict[str, Any]
+    ) -> Tuple[List[Any], float]:
+        return self.clf.predict(self.batch_xdata(batch)), self.confidence
+
 
 class ScikitContextUnsprvised(ScikitContext):
     async def __aenter__(self):
@@ -163,10 +226,14 @@ class ScikitContextUnsprvised(ScikitContext):
             del config["features"]
             del config["tcluster"]
             del config["predict"]
+            for name in PARTIAL_FIT_PROPERTIES:
+                config.pop(name, None)
             self.clf = self.parent.SCIKIT_MODEL(**config)
         return self
 
     async def train(self, sources: Sources):
+        if getattr(self.parent.config, "partial_fit", False):
+            return await self.partial_fit(sources, [])
         xdata = []
         async for record in sources.with_features(self.features):
             feature_data = record.features(self.features)
@@ -246,23 +313,27 @@ class ScikitContextUnsprvised(ScikitContext):
                         yield label
 
                 labels = yield_labels()
-                predictor = lambda predict: [next(labels)]
+                predictor = lambda predict: [next(labels) for _ in predict]
         else:
             raise NotImplementedError(
                 f"Model is not a clusterer: {self.clf._estimator_type}"
             )
 
-        async for record in sources.with_features(self.features):
-            feature_data = record.features(self.features)
-            predict = self.np.array([list(feature_data.values())])
-            prediction = predictor(predict)
-            self.logger.debug(
-                "Predicted cluster for {}: {}".format(predict, prediction)
-            )
-            target = self.parent.config.predict.name
-            record.predicted(target, prediction[0], self.confidence)
+        self.predictor = predictor
+        async for record in self.predict_batches(
+            sources, self.features, self.parent.config.predict.name
+        ):
             yield record
 
+    async def predict_batch(
+        self, batch: Dict[str, Any]
+    ) -> Tuple[List[Any], float]:
+        prediction = self.predictor(self.batch_xdata(batch))
+        self.logger.debug(
+            "Predicted clusters for {} records".format(len(prediction))
+        )
+        return prediction, self.confidence
+
 
 class Scikit(Model):
     def __init__(self, config) -> None:
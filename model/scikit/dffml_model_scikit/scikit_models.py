@@ -39,6 +39,10 @@ from sklearn.linear_model import (
     OrthogonalMatchingPursuit,
     Lars,
     Ridge,
+    SGDClassifier,
+    SGDRegressor,
+    PassiveAggressiveClassifier,
+    PassiveAggressiveRegressor,
 )
 from sklearn.cluster import (
     KMeans,
@@ -98,6 +102,10 @@ for entry_point_name, name, cls in [
     ("scikitgpr", "GaussianProcessRegressor", GaussianProcessRegressor),
     ("scikitomp", "OrthogonalMatchingPursuit", OrthogonalMatchingPursuit),
     ("scikitridge", "Ridge", Ridge),
+    ("scikitsgdc", "SGDClassifier", SGDClassifier),
+    ("scikitsgdr", "SGDRegressor", SGDRegressor),
+    ("scikitpac", "PassiveAggressiveClassifier", PassiveAggressiveClassifier),
+    ("scikitpar", "PassiveAggressiveRegressor", PassiveAggressiveRegressor),
     ("scikitlars", "Lars", Lars),
     ("scikitkmeans", "KMeans", KMeans),
     ("scikitbirch", "Birch", Birch),
@@ -147,6 +155,32 @@ for entry_point_name, name, cls in [
             ),
         )
 
+    if hasattr(cls, "partial_fit"):
+        dffml_config_properties["partial_fit"] = (
+            bool,
+            field(
+                "Train with the model's partial_fit method on batches of "
+                "records, so that only one batch is held in memory at a time",
+                default=False,
+            ),
+        )
+        dffml_config_properties["partial_fit_batch_size"] = (
+            int,
+            field(
+                "Number of records in each batch when training with "
+                "partial_fit",
+                default=1024,
+            ),
+        )
+        dffml_config_properties["partial_fit_epochs"] = (
+            int,
+            field(
+                "Number of passes over the records when training with "
+                "partial_fit",
+                default=1,
+            ),
+        )
+
     dffml_config = make_config_numpy(
         name + "ModelConfig", cls, properties=dffml_config_properties
     )
@@ -108,6 +108,10 @@ setup(
             f"scikitomp = {IMPORT_NAME}.scikit_models:OrthogonalMatchingPursuitModel",
             f"scikitlars = {IMPORT_NAME}.scikit_models:LarsModel",
             f"scikitridge = {IMPORT_NAME}.scikit_models:RidgeModel",
+            f"scikitsgdc = {IMPORT_NAME}.scikit_models:SGDClassifierModel",
+            f"scikitsgdr = {IMPORT_NAME}.scikit_models:SGDRegressorModel",
+            f"scikitpac = {IMPORT_NAME}.scikit_models:PassiveAggressiveClassifierModel",
+            f"scikitpar = {IMPORT_NAME}.scikit_models:PassiveAggressiveRegressorModel",
             f"scikitkmeans = {IMPORT_NAME}.scikit_models:KMeansModel",
             f"scikitbirch = {IMPORT_NAME}.scikit_models:BirchModel",
             f"scikitmbkmeans = {IMPORT_NAME}.scikit_models:MiniBatchKMeansModel",
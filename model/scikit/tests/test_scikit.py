@@ -1,4 +1,5 @@
 import sys
+import inspect
 import tempfile
 import numpy as np
 
@@ -13,6 +14,8 @@ from sklearn.datasets import make_blobs
 
 
 class TestScikitModel:
+    PARTIAL_FIT = False
+
     @classmethod
     def setUpClass(cls):
         cls.model_dir = tempfile.TemporaryDirectory()
@@ -105,6 +108,18 @@ class TestScikitModel:
         elif estimator_type in unsupervised_estimators:
             if cls.TRUE_CLSTR_PRESENT:
                 config_fields["tcluster"] = Feature("X", float, 1)
+        if cls.PARTIAL_FIT:
+            # Train on many small batches, several times over
+            config_fields["partial_fit"] = True
+            config_fields["partial_fit_batch_size"] = 8
+            config_fields["partial_fit_epochs"] = 50
+            # Models which shuffle records each epoch are seeded so that
+            # they're trained the same way on every run
+            if (
+                "random_state"
+                in inspect.signature(cls.MODEL.SCIKIT_MODEL).parameters
+            ):
+                config_fields["random_state"] = 0
         cls.model = cls.MODEL(
             cls.MODEL_CONFIG(**{**properties, **config_fields})
         )
@@ -243,6 +258,8 @@ CLASSIFIERS = [
     "BaggingClassifier",
     "LinearDiscriminantAnalysis",
     "MultinomialNB",
+    "SGDClassifier",
+    "PassiveAggressiveClassifier",
 ]
 
 REGRESSORS = [
@@ -257,6 +274,8 @@ REGRESSORS = [
     "OrthogonalMatchingPursuit",
     "Lars",
     "Ridge",
+    # SGDRegressor isn't tested as it needs features to be scaled
+    "PassiveAggressiveRegressor",
 ]
 
 CLUSTERERS = [
@@ -273,49 +292,66 @@ CLUSTERERS = [
 supervised_estimators = ["classifier", "regressor"]
 unsupervised_estimators = ["clusterer"]
 valid_estimators = supervised_estimators + unsupervised_estimators
-for clf in CLASSIFIERS:
-    test_cls = type(
-        f"Test{clf}Model",
-        (TestScikitModel, AsyncTestCase),
-        {
-            "MODEL_TYPE": "CLASSIFICATION",
-            "MODEL": getattr(dffml_model_scikit.scikit_models, clf + "Model"),
-            "MODEL_CONFIG": getattr(
-                dffml_model_scikit.scikit_models, clf + "ModelConfig"
-            ),
-        },
-    )
-    setattr(sys.modules[__name__], test_cls.__qualname__, test_cls)
 
-for reg in REGRESSORS:
-    test_cls = type(
-        f"Test{reg}Model",
-        (TestScikitModel, AsyncTestCase),
-        {
-            "MODEL_TYPE": "REGRESSION",
-            "MODEL": getattr(dffml_model_scikit.scikit_models, reg + "Model"),
-            "MODEL_CONFIG": getattr(
-                dffml_model_scikit.scikit_models, reg + "ModelConfig"
-            ),
-        },
-    )
-    setattr(sys.modules[__name__], test_cls.__qualname__, test_cls)
 
-for clstr in CLUSTERERS:
-    for true_clstr_present in [True, False]:
-        labelInfo = f"withLabel" if true_clstr_present else f"withoutLabel"
+def partial_fit_variants(model):
+    # Models which can be trained on batches of records are also tested
+    # training that way
+    if hasattr(model.SCIKIT_MODEL, "partial_fit"):
+        return ["", "PartialFit"]
+    return [""]
+
+
+for clf in CLASSIFIERS:
+    model = getattr(dffml_model_scikit.scikit_models, clf + "Model")
+    for partial_fit in partial_fit_variants(model):
         test_cls = type(
-            f"Test{clstr}Model" + labelInfo,
+            f"Test{clf}Model" + partial_fit,
             (TestScikitModel, AsyncTestCase),
             {
-                "MODEL_TYPE": "CLUSTERING",
-                "MODEL": getattr(
-                    dffml_model_scikit.scikit_models, clstr + "Model"
+                "MODEL_TYPE": "CLASSIFICATION",
+                "MODEL": model,
+                "MODEL_CONFIG": getattr(
+                    dffml_model_scikit.scikit_models, clf + "ModelConfig"
                 ),
+                "PARTIAL_FIT": bool(partial_fit),
+            },
+        )
+        setattr(sys.modules[__name__], test_cls.__qualname__, test_cls)
+
+for reg in REGRESSORS:
+    model = getattr(dffml_model_scikit.scikit_models, reg + "Model")
+    for partial_fit in partial_fit_variants(model):
+        test_cls = type(
+            f"Test{reg}Model" + partial_fit,
+            (TestScikitModel, AsyncTestCase),
+            {
+                "MODEL_TYPE": "REGRESSION",
+                "MODEL": model,
                 "MODEL_CONFIG": getattr(
-                    dffml_model_scikit.scikit_models, clstr + "ModelConfig"
+                    dffml_model_scikit.scikit_models, reg + "ModelConfig"
                 ),
-                "TRUE_CLSTR_PRESENT": true_clstr_present,
+                "PARTIAL_FIT": bool(partial_fit),
             },
         )
         setattr(sys.modules[__name__], test_cls.__qualname__, test_cls)
+
+for clstr in CLUSTERERS:
+    model = getattr(dffml_model_scikit.scikit_models, clstr + "Model")
+    for partial_fit in partial_fit_variants(model):
+        for true_clstr_present in [True, False]:
+            labelInfo = f"withLabel" if true_clstr_present else f"withoutLabel"
+            test_cls = type(
+                f"Test{clstr}Model" + partial_fit + labelInfo,
+                (TestScikitModel, AsyncTestCase),
+                {
+                    "MODEL_TYPE": "CLUSTERING",
+                    "MODEL": model,
+                    "MODEL_CONFIG": getattr(
+                        dffml_model_scikit.scikit_models, clstr + "ModelConfig"
+                    ),
+                    "TRUE_CLSTR_PRESENT": true_clstr_present,
+                    "PARTIAL_FIT": bool(partial_fit),
+                },
+            )
+            setattr(sys.modules[__name__], test_cls.__qualname__, test_cls)
@@ -137,38 +137,28 @@ class LogisticRegression(SimpleModel):
         # epochs' loop: 1500 epochs
         for _ in range(0, 1500):
             z = w * x + b
-            val = -self.np.multiply(y, z)
-            num = -self.np.multiply(y, self.np.exp(val))
-            den = 1 + self.np.exp(val)
-            f = num / den  # f is gradient dJ for each data point
-            gradJ = self.np.sum(x * f)  # total dJ
+            exp = self.np.exp(-y * z)
+            f = -y * exp / (1 + exp)  # f is gradient dJ for each data point
+            gradJ = x @ f  # total dJ
             w = w - learning_rate * gradJ / len(x)  # SAG subtraction
-        # Accuracy calculation
-        error = 0  # incorrect values
-        for x_id in range(len(x)):
-            yhat = x[x_id] * w + b > 0.5
-            if yhat:
-                yhat = 1
-            else:
-                yhat = 0
-            if yhat != y[x_id]:
-                error += 1
-        accuracy = 1 - (error / len(x))
-        return (w, b, accuracy)
+        # Accuracy is the fraction of records whose class is predicted
+        # correctly
+        yhat = x * w + b > 0.5
+        accuracy = float(self.np.mean(yhat == y))
+        return (float(w), b, accuracy)
 
     async def train(self, sources: Sources):
-        async for record in sources.with_features(
+        x_batches = []
+        y_batches = []
+        async for batch in sources.feature_batches(
             self.features + [self.config.predict.name]
         ):
-            feature_data = record.features(
-                self.features + [self.config.predict.name]
-            )
-            self.xData = self.np.append(
-                self.xData, feature_data[self.features[0]]
-            )
-            self.yData = self.np.append(
-                self.yData, feature_data[self.config.predict.name]
-            )
+            x_batches.append(batch[self.features[0]])
+            y_batches.append(batch[self.config.predict.name])
+        # Join batches once, rather than copying the arrays for every record.
+        # Flattened because single element lists are supported as values
+        self.xData = self.np.concatenate(x_batches).ravel()
+        self.yData = self.np.concatenate(y_batches).ravel()
         self.separating_line = self.best_separating_line()
 
     async def accuracy(self, sources: Sources) -> Accuracy:
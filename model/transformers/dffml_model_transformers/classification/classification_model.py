@@ -22,6 +22,7 @@ from dffml.util.entrypoint import entrypoint
 from dffml.feature.feature import Feature, Features
 from dffml.source.source import Sources, SourcesContext
 from dffml.model.model import ModelContext, Model, ModelNotTrained
+from dffml.model.resident import RESIDENT_MODELS, resident_file_key
 
 from .utils import InputExample, classification_compute_metrics
 
@@ -233,6 +234,43 @@ class HFClassificationModelContext(ModelContext):
             cache_dir=self.parent.config.cache_dir,
         )
 
+    async def __aenter__(self):
+        await super().__aenter__()
+        if os.path.isfile(self.weights_path):
+            self.load_resident()
+        return self
+
+    @property
+    def weights_path(self):
+        return os.path.join(self.parent.config.output_dir, "tf_model.h5")
+
+    def load_resident(self):
+        """
+        Use the trained tokenizer and model, loading them from the output
+        directory only if they aren't already resident in memory
+        """
+        output_dir = self.parent.config.output_dir
+        key = resident_file_key(self.weights_path)
+
+        def load_model():
+            with self.parent.config.strategy.scope():
+                return TFAutoModelForSequenceClassification.from_pretrained(
+                    output_dir
+                )
+
+        self.tokenizer = RESIDENT_MODELS.load(
+            ("hfclassifier", "tokenizer", key),
+            lambda: AutoTokenizer.from_pretrained(output_dir),
+        )
+        self.model = RESIDENT_MODELS.load(
+            ("hfclassifier", "model", key),
+            load_model,
+            size=lambda model: sum(
+                weight.shape.num_elements() * weight.dtype.size
+                for weight in model.weights
+            ),
+        )
+
     async def _preprocess_data(self, sources: Sources):
         x_cols: Dict[str, Any] = {feature: [] for feature in self.features}
         y_cols = []
@@ -331,15 +369,10 @@ class HFClassificationModelContext(ModelContext):
         self.tokenizer.save_pretrained(self.parent.config.output_dir)
 
     async def accuracy(self, sources: Sources):
-        if not os.path.isfile(
-            os.path.join(self.parent.config.output_dir, "tf_model.h5")
-        ):
+        if not os.path.isfile(self.weights_path):
             raise ModelNotTrained("Train model before assessing for accuracy.")
 
-        config = self.parent.config._asdict()
-        self.tokenizer = AutoTokenizer.from_pretrained(
-            self.parent.config.output_dir
-        )
+        self.load_resident()
         eval_features = await self._preprocess_data(sources)
         eval_dataset = await self.example_features_to_dataset(eval_features)
 
@@ -347,10 +380,6 @@ class HFClassificationModelContext(ModelContext):
             preds = self.np.argmax(p.predictions, axis=1)
             return classification_compute_metrics(preds, p.label_ids)
 
-        with self.parent.config.strategy.scope():
-            self.model = TFAutoModelForSequenceClassification.from_pretrained(
-                config["directory"]
-            )
         trainer = TFTrainer(
             model=self.model,
             args=self.parent.config,
@@ -363,18 +392,9 @@ class HFClassificationModelContext(ModelContext):
     async def predict(
         self, sources: SourcesContext
     ) -> AsyncIterator[Tuple[Record, Any, float]]:
-        if not os.path.isfile(
-            os.path.join(self.parent.config.output_dir, "tf_model.h5")
-        ):
+        if not os.path.isfile(self.weights_path):
             raise ModelNotTrained("Train model before prediction.")
-        self.tokenizer = AutoTokenizer.from_pretrained(
-            self.parent.config.output_dir
-        )
-
-        with self.parent.config.strategy.scope():
-            self.model = TFAutoModelForSequenceClassification.from_pretrained(
-                self.parent.config.output_dir
-            )
+        self.load_resident()
         trainer = TFTrainer(model=self.model, args=self.parent.config,)
         async for record in sources.with_features(self.features):
             to_predict = record.features(self.features)
@@ -29,6 +29,7 @@ from dffml.model.accuracy import Accuracy
 from dffml.util.entrypoint import entrypoint
 from dffml.source.source import Sources, SourcesContext
 from dffml.model.model import ModelContext, Model, ModelNotTrained
+from dffml.model.resident import RESIDENT_MODELS, resident_file_key
 
 from .utils import (
     read_examples_from_df,
@@ -268,12 +269,56 @@ class NERModelContext(ModelContext):
             cache_dir=self.parent.config.cache_dir,
         )
 
-        self.tokenizer = AutoTokenizer.from_pretrained(
+        tokenizer_name = (
             self.parent.config.tokenizer_name
             if self.parent.config.tokenizer_name
-            else self.parent.config.model_name_or_path,
-            cache_dir=self.parent.config.cache_dir,
-            use_fast=self.parent.config.use_fast,
+            else self.parent.config.model_name_or_path
+        )
+        self.tokenizer = RESIDENT_MODELS.load(
+            (
+                "ner_tagger",
+                "tokenizer",
+                tokenizer_name,
+                self.parent.config.use_fast,
+            ),
+            lambda: AutoTokenizer.from_pretrained(
+                tokenizer_name,
+                cache_dir=self.parent.config.cache_dir,
+                use_fast=self.parent.config.use_fast,
+            ),
+        )
+
+    async def __aenter__(self):
+        await super().__aenter__()
+        if os.path.isfile(self.weights_path):
+            self.load_resident()
+        return self
+
+    @property
+    def weights_path(self):
+        return os.path.join(self.parent.config.output_dir, "tf_model.h5")
+
+    def load_resident(self):
+        """
+        Use the trained model, loading it from the output directory only if it
+        isn't already resident in memory
+        """
+
+        def load_model():
+            with self.parent.config.strategy.scope():
+                return TFAutoModelForTokenClassification.from_pretrained(
+                    self.parent.config.output_dir,
+                    config=self.config,
+                    cache_dir=self.parent.config.cache_dir,
+                )
+
+        self.model = RESIDENT_MODELS.load(
+            ("ner_tagger", "model", resident_file_key(self.weights_path)),
+            load_model,
+            size=lambda model: sum(
+                weight.shape.num_elements() * weight.dtype.size
+                for weight in model.weights
+            ),
         )
 
     def align_predictions(
@@ -391,19 +436,12 @@ class NERModelContext(ModelContext):
         self.tokenizer.save_pretrained(self.parent.config.output_dir)
 
     async def accuracy(self, sources: Sources):
-        if not os.path.isfile(
-            os.path.join(self.parent.config.output_dir, "tf_model.h5")
-        ):
+        if not os.path.isfile(self.weights_path):
             raise ModelNotTrained("Train model before assessing for accuracy.")
 
         data_df = await self._preprocess_data(sources)
         eval_dataset = self.get_dataset(data_df, self.tokenizer, mode="eval",)
-        with self.parent.config.strategy.scope():
-            self.model = TFAutoModelForTokenClassification.from_pretrained(
-                self.parent.config.output_dir,
-                config=self.config,
-                cache_dir=self.parent.config.cache_dir,
-            )
+        self.load_resident()
 
         trainer = TFTrainer(
             model=self.model,
@@ -419,16 +457,9 @@ class NERModelContext(ModelContext):
     async def predict(
         self, sources: SourcesContext
     ) -> AsyncIterator[Tuple[Record, Any, float]]:
-        if not os.path.isfile(
-            os.path.join(self.parent.config.output_dir, "tf_model.h5")
-        ):
+        if not os.path.isfile(self.weights_path):
             raise ModelNotTrained("Train model before prediction.")
-        with self.parent.config.strategy.scope():
-            self.model = TFAutoModelForTokenClassification.from_pretrained(
-                self.parent.config.output_dir,
-                config=self.config,
-                cache_dir=self.parent.config.cache_dir,
-            )
+        self.load_resident()
 
         async for record in sources.with_features(
             [self.parent.config.words.name]
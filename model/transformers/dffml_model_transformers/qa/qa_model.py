@@ -18,6 +18,7 @@ from dffml.model.accuracy import Accuracy
 from dffml.util.entrypoint import entrypoint
 from dffml.source.source import Sources, SourcesContext
 from dffml.model.model import ModelContext, Model, ModelNotTrained
+from dffml.model.resident import RESIDENT_MODELS, resident_file_key
 
 from transformers.data.processors.squad import SquadExample, SquadResult
 from transformers.data.metrics.squad_metrics import (
@@ -203,6 +204,44 @@ class QAModelContext(ModelContext):
             else None,
         )
 
+    async def __aenter__(self):
+        await super().__aenter__()
+        if os.path.isfile(self.weights_path):
+            self.load_resident()
+        return self
+
+    @property
+    def weights_path(self):
+        return os.path.join(self.parent.config.output_dir, "pytorch_model.bin")
+
+    def load_resident(self):
+        """
+        Use the trained tokenizer and model, loading them from the output
+        directory only if they aren't already resident in memory
+        """
+        output_dir = self.parent.config.output_dir
+        key = resident_file_key(self.weights_path)
+
+        def load_model():
+            model = AutoModelForQuestionAnswering.from_pretrained(output_dir)
+            model.to(self.parent.config.device)
+            return model
+
+        self.tokenizer = RESIDENT_MODELS.load(
+            ("qa_model", "tokenizer", key, self.parent.config.do_lower_case),
+            lambda: AutoTokenizer.from_pretrained(
+                output_dir, do_lower_case=self.parent.config.do_lower_case,
+            ),
+        )
+        self.model = RESIDENT_MODELS.load(
+            ("qa_model", "model", key, str(self.parent.config.device)),
+            load_model,
+            size=lambda model: sum(
+                parameter.numel() * parameter.element_size()
+                for parameter in model.parameters()
+            ),
+        )
+
     def to_list(self, tensor):
         return tensor.detach().cpu().tolist()
 
@@ -849,14 +888,9 @@ class QAModelContext(ModelContext):
         return predictions
 
     async def accuracy(self, sources: Sources):
-        if not os.path.isfile(
-            os.path.join(self.parent.config.output_dir, "pytorch_model.bin")
-        ):
+        if not os.path.isfile(self.weights_path):
             raise ModelNotTrained("Train model before assessing for accuracy.")
-        self.tokenizer = AutoTokenizer.from_pretrained(
-            self.parent.config.output_dir,
-            do_lower_case=self.parent.config.do_lower_case,
-        )
+        self.load_resident()
         eval_examples = await self._preprocess_data(sources)
         features, dataset = squad_convert_examples_to_features(
             examples=eval_examples,
@@ -870,14 +904,6 @@ class QAModelContext(ModelContext):
 
         results = {}
         if self.parent.config.local_rank in [-1, 0]:
-            logger.info(
-                "Loading checkpoints saved during training for evaluation"
-            )
-            self.model = AutoModelForQuestionAnswering.from_pretrained(
-                self.parent.config.output_dir
-            )
-            self.model.to(self.parent.config.device)
-
             # Evaluate
             predictions = await self._custom_accuracy(
                 eval_examples, features, dataset
@@ -892,19 +918,9 @@ class QAModelContext(ModelContext):
     async def predict(
         self, sources: SourcesContext
     ) -> AsyncIterator[Tuple[Record, Any, float]]:
-        if not os.path.isfile(
-            os.path.join(self.parent.config.output_dir, "pytorch_model.bin")
-        ):
+        if not os.path.isfile(self.weights_path):
             raise ModelNotTrained("Train model before prediction.")
-
-        self.model = AutoModelForQuestionAnswering.from_pretrained(
-            self.parent.config.output_dir
-        )  # , force_download=True)
-        self.model.to(self.parent.config.device)
-        self.tokenizer = AutoTokenizer.from_pretrained(
-            self.parent.config.output_dir,
-            do_lower_case=self.parent.config.do_lower_case,
-        )
+        self.load_resident()
         async for record in sources.records():
 
             example = SquadExample(
@@ -0,0 +1,64 @@
+"""
+Benchmark the rate at which the memory orchestrator dispatches operations
+with redundancy checker keys kept in memory, versus hashed keys stored in a
+key value store (as is done with persistent key value stores).
+
+Usage: python scripts/bench_rchecker.py [inputs] [contexts]
+"""
+import sys
+import time
+import asyncio
+
+from dffml.df.types import DataFlow, Definition, Input
+from dffml.df.base import BaseKeyValueStore, op
+from dffml.df.memory import (
+    BaseMemoryDataFlowObject,
+    MemoryKeyValueStoreConfig,
+    MemoryKeyValueStoreContext,
+    MemoryOrchestrator,
+    MemoryRedundancyChecker,
+)
+
+NUMBER = Definition(name="number", primitive="int")
+
+
+class HashedKeyValueStore(BaseKeyValueStore, BaseMemoryDataFlowObject):
+    CONTEXT = MemoryKeyValueStoreContext
+    CONFIG = MemoryKeyValueStoreConfig
+
+
+@op(inputs={"a": NUMBER, "b": NUMBER})
+async def pair(a: int, b: int):
+    pass
+
+
+async def dispatch_rate(rchecker, inputs: int, contexts: int) -> float:
+    # Every permutation of two inputs within a context is dispatched once
+    dispatched = inputs * inputs * contexts
+    async with MemoryOrchestrator(rchecker=rchecker) as orchestrator:
+        async with orchestrator(DataFlow(pair)) as octx:
+            start = time.perf_counter()
+            async for _ctx, _results in octx.run(
+                {
+                    str(i): [
+                        Input(value=j, definition=NUMBER)
+                        for j in range(inputs)
+                    ]
+                    for i in range(contexts)
+                }
+            ):
+                pass
+            return dispatched / (time.perf_counter() - start)
+
+
+async def main(inputs: int = 100, contexts: int = 4):
+    for name, rchecker in [
+        ("hashed", MemoryRedundancyChecker(kvstore=HashedKeyValueStore())),
+        ("in memory", MemoryRedundancyChecker()),
+    ]:
+        rate = await dispatch_rate(rchecker, inputs, contexts)
+        print(f"{name:>10}: {rate:10.0f} operations/second")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:])))
@@ -0,0 +1,85 @@
+"""
+Benchmark fitting a line with SLRModel's streamed NumPy statistics, versus
+the list based implementation it replaced, which held every x and y value in
+memory.
+
+Usage: python scripts/bench_slr.py [values] [batch_size]
+"""
+import sys
+import time
+import statistics
+
+import numpy as np
+
+from dffml.model.slr import SLRStatistics
+from dffml.source.source import FEATURE_BATCH_SIZE
+
+
+def matrix_subtract(one, two):
+    return [
+        one_element - two_element for one_element, two_element in zip(one, two)
+    ]
+
+
+def matrix_multiply(one, two):
+    return [
+        one_element * two_element for one_element, two_element in zip(one, two)
+    ]
+
+
+def squared_error(y, line):
+    return sum(map(lambda element: element ** 2, matrix_subtract(y, line)))
+
+
+def coeff_of_deter(y, regression_line):
+    y_mean_line = [statistics.mean(y)] * len(y)
+    squared_error_mean = squared_error(y, y_mean_line)
+    squared_error_regression = squared_error(y, regression_line)
+    return 1 - (squared_error_regression / squared_error_mean)
+
+
+def list_best_fit_line(x, y):
+    mean_x = statistics.mean(x)
+    mean_y = statistics.mean(y)
+    m = (mean_x * mean_y - statistics.mean(matrix_multiply(x, y))) / (
+        (mean_x ** 2) - statistics.mean(matrix_multiply(x, x))
+    )
+    b = mean_y - (m * mean_x)
+    regression_line = [m * x_element + b for x_element in x]
+    accuracy = coeff_of_deter(y, regression_line)
+    return (m, b, accuracy)
+
+
+def lists(x, y, batch_size):
+    # Values were appended to lists one record at a time
+    x_list = []
+    y_list = []
+    for x_value, y_value in zip(x.tolist(), y.tolist()):
+        x_list.append(x_value)
+        y_list.append(y_value)
+    return list_best_fit_line(x_list, y_list)
+
+
+def streamed(x, y, batch_size):
+    fit = SLRStatistics()
+    for i in range(0, len(x), batch_size):
+        fit.update(x[i : i + batch_size], y[i : i + batch_size])
+    return fit.line()
+
+
+def main(values: int = 1000000, batch_size: int = FEATURE_BATCH_SIZE):
+    random = np.random.default_rng(0)
+    x = random.uniform(0.0, 100.0, values)
+    y = 3.0 * x + 2.0 + random.normal(0.0, 10.0, values)
+    for name, fit in [("lists", lists), ("streamed", streamed)]:
+        start = time.perf_counter()
+        m, b, accuracy = fit(x, y, batch_size)
+        rate = values / (time.perf_counter() - start)
+        print(
+            f"{name:>10}: {rate:12.0f} values/second "
+            f"(m={m:.6f}, b={b:.6f}, accuracy={accuracy:.6f})"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -250,6 +250,17 @@ class ServerConfig(TLSCMDConfig, MultiCommCMDConfig):
         action=ParseRedirectsAction,
         default_factory=lambda: [],
     )
+    predict_max_batch: int = field(
+        "Maximum number of records predicted with one call to a model. "
+        "Records from concurrent prediction requests are predicted together",
+        default=64,
+    )
+    predict_max_latency: float = field(
+        "Seconds to wait for more prediction requests before making "
+        "predictions. If zero only requests made at the same time are "
+        "predicted together",
+        default=0.0,
+    )
     portfile: pathlib.Path = field(
         "File to write bound port to when starting. Helpful when port 0 was requeseted to bind to any free port",
         default=None,
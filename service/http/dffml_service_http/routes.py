@@ -29,6 +29,7 @@ from dffml.df.memory import (
     StringInputSetContext,
 )
 from dffml.model import Model
+from dffml.model.batcher import ModelPredictBatcher
 from dffml.base import MissingConfig
 from dffml.util.data import traverse_get
 from dffml.source.source import BaseSource, SourcesContext
@@ -784,6 +785,26 @@ class Routes(BaseMultiCommContext):
         # Train the model on the sources
         return web.json_response({"accuracy": await mctx.accuracy(sources)})
 
+    async def model_predict_batcher(
+        self, request, label: str, mctx
+    ) -> ModelPredictBatcher:
+        """
+        Batcher which makes predictions requested concurrently with a model
+        context using one call to the model
+        """
+        batcher = request.app["model_predict_batchers"].get(label, None)
+        # Configuring a model context replaces the one with the same label
+        if batcher is None or batcher.mctx is not mctx:
+            batcher = await request.app["exit_stack"].enter_async_context(
+                ModelPredictBatcher(
+                    mctx,
+                    max_batch=self.predict_max_batch,
+                    max_latency=self.predict_max_latency,
+                )
+            )
+            request.app["model_predict_batchers"][label] = batcher
+        return batcher
+
     @mctx_route
     async def model_predict(self, request, mctx):
         # TODO Provide an iterkey method for model prediction
@@ -794,27 +815,24 @@ class Routes(BaseMultiCommContext):
                 status=HTTPStatus.BAD_REQUEST,
             )
         # Get the records
-        records: Dict[str, Record] = {}
-        # Create a source with will provide the records
-        async with Sources(
-            MemorySource(
-                records=[
-                    Record(key, data=record_data)
-                    for key, record_data in (await request.json()).items()
-                ]
-            )
-        ) as source:
-            async with source() as sctx:
-                # Feed them through prediction
-                return web.json_response(
-                    {
-                        "iterkey": None,
-                        "records": {
-                            record.key: record.export()
-                            async for record in mctx.predict(sctx)
-                        },
-                    }
-                )
+        records: List[Record] = [
+            Record(key, data=record_data)
+            for key, record_data in (await request.json()).items()
+        ]
+        # Feed them through prediction along with those of concurrent
+        # requests
+        batcher = await self.model_predict_batcher(
+            request, request.match_info["label"], mctx
+        )
+        return web.json_response(
+            {
+                "iterkey": None,
+                "records": {
+                    record.key: record.export()
+                    for record in await batcher.predict(records)
+                },
+            }
+        )
 
     async def api_js(self, request):
         return web.Response(
@@ -854,6 +872,7 @@ class Routes(BaseMultiCommContext):
         self.app["multicomm_contexts"] = {"self": self}
         self.app["multicomm_routes"] = {}
         self.app["source_records_iterkeys"] = {}
+        self.app["model_predict_batchers"] = {}
 
         # Instantiate sources if they aren't instantiated yet
         for i, source in enumerate(self.sources):
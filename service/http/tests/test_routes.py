@@ -516,6 +516,32 @@ class TestModel(TestRoutesRunning, AsyncTestCase):
                 i += 1
             self.assertEqual(i, self.num_records)
 
+    async def test_predict_concurrent(self):
+        records: Dict[str, Record] = {
+            record.key: record.export() async for record in self.sctx.records()
+        }
+        keys = list(records)
+        # Wait long enough for every request to be made before predicting,
+        # unless two requests worth of records are waiting
+        self.cli.predict_max_latency = 0.5
+        self.cli.predict_max_batch = 50
+
+        async def predict(keys):
+            async with self.post(
+                f"/model/{self.mlabel}/predict/0",
+                json={key: records[key] for key in keys},
+            ) as r:
+                return list((await r.json())["records"])
+
+        chunks = [keys[i : i + 25] for i in range(0, len(keys), 25)]
+        self.assertEqual(
+            await asyncio.gather(*map(predict, chunks)), chunks,
+        )
+        # Records from the requests were predicted two requests at a time
+        self.assertEqual(
+            self.cli.app["model_predict_batchers"][self.mlabel].batches, 2
+        )
+
     async def test_predict_chunk_size_unsupported(self):
         records: Dict[str, Record] = {
             record.key: record.export() async for record in self.sctx.records()
@@ -72,6 +72,7 @@ setup(
             "twine",
             # Test requirements
             "httptest>=0.0.15",
+            "numpy",
             "Pillow>=7.1.2",
         ],
         **plugins.PACKAGE_NAMES_BY_PLUGIN_INSTALLABLE,
@@ -81,6 +82,7 @@ setup(
         "dffml.source": [
             "csv = dffml.source.csv:CSVSource",
             "json = dffml.source.json:JSONSource",
+            "jsonl = dffml.source.jsonl:JSONLinesSource",
             "memory = dffml.source.memory:MemorySource",
             "idx1 = dffml.source.idx1:IDX1Source",
             "idx3 = dffml.source.idx3:IDX3Source",
@@ -125,8 +127,14 @@ setup(
             "db_query_insert_or_update = dffml.operation.db:db_query_insert_or_update",
             "db_query_lookup = dffml.operation.db:db_query_lookup",
         ],
-        "dffml.kvstore": ["memory = dffml.df.memory:MemoryKeyValueStore"],
-        "dffml.input.network": ["memory = dffml.df.memory:MemoryInputNetwork"],
+        "dffml.kvstore": [
+            "memory = dffml.df.memory:MemoryKeyValueStore",
+            "sqlite = dffml.df.sqlite:SqliteKeyValueStore",
+        ],
+        "dffml.input.network": [
+            "memory = dffml.df.memory:MemoryInputNetwork",
+            "memory_indexed = dffml.df.memory:MemoryIndexedInputNetwork",
+        ],
         "dffml.operation.network": [
             "memory = dffml.df.memory:MemoryOperationNetwork"
         ],
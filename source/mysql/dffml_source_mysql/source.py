@@ -1,17 +1,30 @@
 import ssl
 import itertools
 import collections
-from typing import AsyncIterator, NamedTuple, Dict, List, Tuple
+from typing import AsyncIterator, NamedTuple, Dict, List, Tuple, Optional
 
 import aiomysql
 
 from dffml import config, field
 from dffml.base import BaseConfig
 from dffml.record import Record
-from dffml.source.source import BaseSourceContext, BaseSource
+from dffml.source.db import record_query_conditions
+from dffml.source.source import (
+    BaseSourceContext,
+    BaseSource,
+    FeatureCondition,
+    query_conditions,
+)
 from dffml.util.cli.arg import Arg
 from dffml.util.entrypoint import entrypoint
 
+from .db import MySQLDatabaseContext
+
+# Number of rows read from the server at a time when iterating over records
+FETCH_SIZE = 1024
+# Number of updated records buffered before they are written and committed
+UPDATE_BATCH_SIZE = 1024
+
 
 class InsecureMySQLConnection(Exception):
     """
@@ -37,7 +50,7 @@ class MySQLSourceConfig:
     update: str = field("Query to update a single record")
     record: str = field("Query to get a single record")
     records: str = field("Query to get a single record")
-    init: str = field("Query to run on initial connection", default=None)
+    init: str = field("Query to run on each new connection", default=None)
     host: str = field("Host/address to connect to", default="127.0.0.1")
     port: int = field("Port to connect to", default=3306)
     ca: str = field(
@@ -46,18 +59,46 @@ class MySQLSourceConfig:
     insecure: bool = field(
         "Must be true to accept risks of non-TLS connection", default=False
     )
+    minsize: int = field(
+        "Minimum number of connections kept open in the pool", default=1
+    )
+    maxsize: int = field(
+        "Maximum number of connections in the pool. Each context uses a "
+        "connection, and another while iterating over records if one is free",
+        default=10,
+    )
 
 
 class MySQLSourceContext(BaseSourceContext):
-    async def update(self, record: Record):
+    def columns(self, record: Record) -> Tuple[str, Dict, Dict]:
+        """
+        Key, features, and predictions of a record which have columns.
+        Records returned by query() may only have some features.
+        """
+        return (
+            record.key,
+            {
+                feature_name: record.data.features[feature_name]
+                for feature_name in self.parent.config.features
+                if feature_name in record.data.features
+            },
+            {
+                feature_name: record.data.prediction[feature_name]
+                for feature_name in self.parent.config.predictions
+                if record.data.prediction.get(feature_name, None) is not None
+            },
+        )
+
+    def bindings(self, key: str, features: Dict, predictions: Dict) -> List:
+        """
+        Values to bind to the update query for a record
+        """
         # Column name of value mapping
-        bindings = {self.parent.config.key: record.key}
+        bindings = {self.parent.config.key: key}
         # Features
-        features = record.features(self.parent.config.features.keys())
         for feature_name, column_name in self.parent.config.features.items():
             bindings[column_name] = features.get(feature_name, None)
         # Predictions
-        predictions = record.predictions(self.parent.config.predictions.keys())
         for (
             feature_name,
             (value_column_name, confidence_column_name),
@@ -79,21 +120,66 @@ class MySQLSourceContext(BaseSourceContext):
         values = list(bindings.values())
         if not "REPLACE" in self.parent.config.update.upper():
             values += list(bindings.values())[1:]
-        # Execute the update query
-        await self.conn.execute(self.parent.config.update, values)
-        self.logger.debug("Updated: %s: %r", record.key, bindings)
+        return values
+
+    async def update(self, record: Record):
+        self.pending.append(self.columns(record))
+        self.logger.debug("Updated: %s", record.key)
+        if len(self.pending) >= UPDATE_BATCH_SIZE:
+            await self.flush()
+
+    async def update_many(self, records: List[Record]):
+        self.pending.extend(map(self.columns, records))
+        self.logger.debug("Updated: %d records", len(records))
+        await self.flush()
+
+    async def flush(self):
+        """
+        Write buffered updates with one executemany and commit them
+        """
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        # Read the features of records which were updated with only some of
+        # them in one query, so that the columns of the others aren't
+        # overwritten
+        features = {}
+        partial = list(
+            dict.fromkeys(
+                key
+                for key, record_features, _predictions in pending
+                if len(record_features) != len(self.parent.config.features)
+            )
+        )
+        if partial:
+            async for record in self.query(
+                features=list(self.parent.config.features), keys=partial
+            ):
+                features[record.key] = record.features()
+        values = []
+        for key, record_features, predictions in pending:
+            # Later updates to a record within the batch keep the features
+            # set by earlier ones
+            features[key] = {**features.get(key, {}), **record_features}
+            values.append(self.bindings(key, features[key], predictions))
+        await self.conn.executemany(self.parent.config.update, values)
+        await self.db.commit()
+        self.logger.debug("Committed: %d records", len(values))
 
     def row_to_record(self, row):
         features = {}
         predictions = {}
-        # Features
+        # Features, rows returned by query() may only have some of them
         for feature_name, column_name in self.parent.config.features.items():
-            features[feature_name] = row[column_name]
+            if column_name in row:
+                features[feature_name] = row[column_name]
         # Predictions
         for (
             feature_name,
             (value_column_name, confidence_column_name),
         ) in self.parent.config.predictions.items():
+            if value_column_name not in row:
+                continue
             predictions[feature_name] = {
                 "value": row[value_column_name],
                 # Set confidence to Not A Number if not given
@@ -106,12 +192,101 @@ class MySQLSourceContext(BaseSourceContext):
 
     async def records(self) -> AsyncIterator[Record]:
         # Execute the query to get all records
-        await self.conn.execute(self.parent.config.records)
+        async for record in self.stream_records(self.parent.config.records):
+            yield record
+
+    async def stream_records(
+        self, query: str, query_values: Optional[List] = None
+    ) -> AsyncIterator[Record]:
+        """
+        Execute a query and yield records for its rows as the server sends
+        them, rather than buffering every row. Rows are read using another
+        connection from the pool, so that the context's connection can be used
+        while iterating. If the pool has no connections to spare all the rows
+        are read before any are yielded.
+        """
+        # Write updates first so that they are included in the results
+        await self.flush()
+        pool = self.parent.pool
+        if not pool.freesize and pool.size >= pool.maxsize:
+            self.logger.debug("No connections to spare, buffering: %s", query)
+            await self.conn.execute(query, query_values)
+            for row in await self.conn.fetchall():
+                yield self.row_to_record(row)
+            return
+        async with pool.acquire() as db:
+            try:
+                async with db.cursor(aiomysql.SSDictCursor) as cursor:
+                    await cursor.execute(query, query_values)
+                    async for record in self.fetch_records(cursor):
+                        yield record
+            finally:
+                # End the transaction the query started so that the
+                # connection is returned to the pool rather than closed
+                await db.rollback()
+
+    async def query(
+        self,
+        features: Optional[List[str]] = None,
+        keys: Optional[List[str]] = None,
+        key_start: Optional[str] = None,
+        key_end: Optional[str] = None,
+        conditions: Optional[List[FeatureCondition]] = None,
+    ) -> AsyncIterator[Record]:
+        conditions = query_conditions(conditions)
+        # No records have features which aren't mapped to columns
+        if keys == [] or not all(
+            feature in self.parent.config.features
+            for feature in (features or [])
+            + [condition.feature for condition in conditions]
+        ):
+            return
+        # Only select the columns for the requested features
+        cols = None
+        if features is not None:
+            cols = [self.parent.config.key] + [
+                self.parent.config.features[feature] for feature in features
+            ]
+        query, query_values = self.sql.lookup_query(
+            "dffml_records",
+            cols=cols,
+            conditions=record_query_conditions(
+                self.parent.config.key,
+                self.parent.config.features,
+                keys=keys,
+                key_start=key_start,
+                key_end=key_end,
+                conditions=conditions,
+            ),
+        )
+        # Select from the results of the query to get all records, so that the
+        # server only sends the columns and rows requested
+        records_query = self.parent.config.records.strip().rstrip(";")
+        # The query to get all records was run without bindings, so any % in
+        # it must be escaped now that there are some
+        records_query = records_query.replace("%", "%%")
+        query = f"WITH dffml_records AS ({records_query}) {query}"
+        self.logger.debug("Query: %s: %r", query, query_values)
+        async for record in self.stream_records(query, query_values):
+            yield record
+
+    async def records_by_keys(self, keys: List[str]) -> Dict[str, Record]:
+        records = {key: Record(key) for key in keys}
+        # Look up all the records in one query
+        async for record in self.query(keys=list(records)):
+            records[record.key].merge(record)
+        return records
+
+    async def fetch_records(self, cursor) -> AsyncIterator[Record]:
+        """
+        Convert the rows returned by the last query the cursor executed to
+        records
+        """
         # Grab records batch by batch until none are left
         result = [True]
         while result:
             # Grab another batch
-            result = await self.conn.fetchmany()
+            result = await cursor.fetchmany(FETCH_SIZE)
             if not result:
                 continue
             # Convert row objects to Record objects
@@ -119,6 +294,8 @@ class MySQLSourceContext(BaseSourceContext):
                 yield self.row_to_record(row)
 
     async def record(self, key: str):
+        # Write updates first so that they are included in the results
+        await self.flush()
         # Create a blank record in case it doesn't exist within the source
         record = Record(key)
         # Execute the query to get a single record from a key
@@ -133,13 +310,26 @@ class MySQLSourceContext(BaseSourceContext):
         return record
 
     async def __aenter__(self) -> "MySQLSourceContext":
-        self.__conn = self.parent.db.cursor(aiomysql.DictCursor)
+        # Used to create queries
+        self.sql = MySQLDatabaseContext(self.parent)
+        # Each context has a connection of its own from the pool, so that
+        # contexts don't wait on each other
+        self.__db = self.parent.pool.acquire()
+        self.db = await self.__db.__aenter__()
+        self.__conn = self.db.cursor(aiomysql.DictCursor)
         self.conn = await self.__conn.__aenter__()
+        # Keys, features, and predictions of updates which have not yet been
+        # written
+        self.pending: List[Tuple[str, Dict, Dict]] = []
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
-        await self.__conn.__aexit__(exc_type, exc_value, traceback)
-        await self.parent.db.commit()
+        try:
+            await self.flush()
+            await self.__conn.__aexit__(exc_type, exc_value, traceback)
+            await self.db.commit()
+        finally:
+            await self.__db.__aexit__(exc_type, exc_value, traceback)
 
 
 @entrypoint("mysql")
@@ -157,6 +347,13 @@ class MySQLSource(BaseSource):
         - ``prediction`` config property MUST have keys in same order as they
           appear within ``update`` query.
 
+    Each context uses its own connection from a pool of up to ``maxsize``
+    connections, so that contexts can read and write concurrently. Updates are
+    written and committed in batches, before the context reads records, and
+    when it exits. Rows are streamed from the server as records are iterated
+    over, using another connection from the pool while one is free. The
+    ``init`` query is run on each connection the pool opens.
+
     Examples
     --------
 
@@ -191,16 +388,13 @@ class MySQLSource(BaseSource):
             password=self.config.password,
             db=self.config.db,
             ssl=ssl_ctx,
+            minsize=self.config.minsize,
+            maxsize=self.config.maxsize,
+            # Run initial connection SQL, if given, on every connection
+            init_command=self.config.init,
         )
-        self.__db = self.pool.acquire()
-        self.db = await self.__db.__aenter__()
-        # Run initial connection SQL if given
-        if self.config.init is not None:
-            async with self.db.cursor(aiomysql.DictCursor) as conn:
-                await conn.execute(self.config.init)
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
-        await self.__db.__aexit__(exc_type, exc_value, traceback)
         self.pool.close()
         await self.pool.wait_closed()
@@ -1,9 +1,11 @@
 import socket
+import asyncio
 import inspect
 import unittest
 import contextlib
 from unittest.mock import patch
 
+from dffml.record import Record
 from dffml.util.testing.source import SourceTest
 from dffml.util.asynctestcase import AsyncTestCase
 
@@ -100,3 +102,162 @@ CREATE TABLE IF NOT EXISTS `record_data` (
 
     async def setUpSource(self):
         return MySQLSource(self.source_config)
+
+    async def test_query(self):
+        source = await self.setUpSource()
+        async with source, source() as sctx:
+            for i in range(4):
+                await sctx.update(
+                    Record(
+                        f"query{i}",
+                        data={
+                            "features": {
+                                "PetalLength": float(i),
+                                "PetalWidth": 1.0,
+                                "SepalLength": 2.0,
+                                "SepalWidth": 3.0,
+                            }
+                        },
+                    )
+                )
+            records = [
+                record
+                async for record in sctx.query(
+                    features=["PetalLength"],
+                    key_start="query1",
+                    key_end="query3",
+                    conditions=[("PetalWidth", "=", 1.0)],
+                )
+            ]
+            self.assertEqual(
+                [(record.key, record.features()) for record in records],
+                [
+                    ("query1", {"PetalLength": 1.0}),
+                    ("query2", {"PetalLength": 2.0}),
+                ],
+            )
+            # Updating a record with only some features keeps the others
+            records[0].evaluated({"PetalLength": 5.0})
+            await sctx.update(records[0])
+            self.assertEqual(
+                (await sctx.record("query1")).features(),
+                {
+                    "PetalLength": 5.0,
+                    "PetalWidth": 1.0,
+                    "SepalLength": 2.0,
+                    "SepalWidth": 3.0,
+                },
+            )
+
+    async def test_update_many_partial(self):
+        source = await self.setUpSource()
+        async with source, source() as sctx:
+            await sctx.update_many(
+                [
+                    Record(
+                        f"partial{i}",
+                        data={
+                            "features": {
+                                "PetalLength": float(i),
+                                "PetalWidth": 1.0,
+                                "SepalLength": 2.0,
+                                "SepalWidth": 3.0,
+                            }
+                        },
+                    )
+                    for i in range(4)
+                ]
+            )
+            # The other features of records updated with only some of them
+            # are read in one query
+            with patch.object(sctx, "query", wraps=sctx.query) as query:
+                await sctx.update_many(
+                    [
+                        Record(
+                            f"partial{i}",
+                            data={"features": {"PetalWidth": float(i)}},
+                        )
+                        for i in range(4)
+                    ]
+                )
+            query.assert_called_once()
+            for i in range(4):
+                self.assertEqual(
+                    (await sctx.record(f"partial{i}")).features(),
+                    {
+                        "PetalLength": float(i),
+                        "PetalWidth": float(i),
+                        "SepalLength": 2.0,
+                        "SepalWidth": 3.0,
+                    },
+                )
+
+    async def test_concurrent_contexts(self):
+        source = await self.setUpSource()
+        async with source, source() as first, source() as second:
+            # Contexts have their own connections, updates are committed
+            # when they are written, so the other context sees them
+            await first.update(
+                Record("concurrent", data={"features": {"PetalLength": 1.0}})
+            )
+            await first.flush()
+            self.assertEqual(
+                (await second.record("concurrent")).feature("PetalLength"),
+                1.0,
+            )
+            # Updates made while iterating are written
+            async for record in first.records():
+                record.evaluated({"PetalWidth": 2.0})
+                await first.update(record)
+            await first.flush()
+            async for record in second.records():
+                self.assertEqual(record.feature("PetalWidth"), 2.0)
+
+    async def test_use_while_iterating(self):
+        source = await self.setUpSource()
+        async with source, source() as sctx:
+            await sctx.update_many(
+                [
+                    Record(
+                        f"paging{i}",
+                        data={"features": {"PetalLength": float(i)}},
+                    )
+                    for i in range(4)
+                ]
+            )
+            # Iteration paused between records, as when the HTTP service
+            # returns records a page at a time, doesn't stop the context's
+            # connection from being used
+            paging = sctx.records().__aiter__()
+            await paging.__anext__()
+            await sctx.update(
+                Record("paging0", data={"features": {"PetalWidth": 1.0}})
+            )
+            self.assertEqual(
+                (await sctx.record("paging0")).feature("PetalWidth"), 1.0
+            )
+            keys = [record.key async for record in sctx.records()]
+            self.assertIn("paging3", keys)
+            # Stop paging without reading the rest of the records
+            await paging.aclose()
+            self.assertEqual(
+                (await sctx.record("paging3")).feature("PetalLength"), 3.0
+            )
+
+    async def test_contexts_within_pool_size(self):
+        source = await self.setUpSource()
+        async with source:
+            # Each context holds one connection, iterating over records when
+            # the pool has none to spare doesn't wait for another
+            async with contextlib.AsyncExitStack() as stack:
+                sctxs = [
+                    await stack.enter_async_context(source())
+                    for _ in range(self.source_config.maxsize)
+                ]
+
+                async def iterate(sctx):
+                    async for _record in sctx.records():
+                        pass
+
+                for sctx in sctxs:
+                    await asyncio.wait_for(iterate(sctx), timeout=10)
@@ -100,3 +100,81 @@ class TestSqlDatabase(AsyncTestCase):
             await db_ctx.insert_or_update(self.table_name, data)
             results = [row async for row in db_ctx.lookup(self.table_name)]
             self.assertEqual(results, expected)
+
+    async def test_5_insert_or_update_many(self):
+        rows = [
+            {"key": 12, "firstName": "Bill"},
+            {"key": 13, "firstName": "Jane", "lastName": "Doe", "age": 30},
+            {"key": 14, "firstName": "Jill", "lastName": "Hill", "age": 32},
+        ]
+        expected = [
+            {"key": 12, "firstName": "Bill", "lastName": "Miles", "age": 40.0},
+            {"key": 13, "firstName": "Jane", "lastName": "Doe", "age": 30.0},
+            {"key": 14, "firstName": "Jill", "lastName": "Hill", "age": 32.0},
+        ]
+        sdb = SqliteDatabase(
+            SqliteDatabaseConfig(filename=self.database_name, batch_size=2)
+        )
+        async with sdb:
+            statements = []
+            sdb.db.set_trace_callback(lambda query: statements.append(query))
+            async with sdb() as db_ctx:
+                await db_ctx.insert_or_update_many(self.table_name, rows)
+                results = [row async for row in db_ctx.lookup(self.table_name)]
+            self.assertEqual(results, expected)
+            # One commit per batch of rows
+            self.assertEqual(statements.count("COMMIT"), 2)
+
+    async def test_6_insert_or_update_many_unique(self):
+        async with self.sdb() as db_ctx:
+            # No primary key, conflicts are on the unique column
+            await db_ctx.create_table(
+                "uniqueTable", {"name": "text UNIQUE", "age": "real"}
+            )
+            # Primary key and a unique column, rows are written one at a time
+            await db_ctx.create_table(
+                "bothTable",
+                {
+                    "key": "INTEGER NOT NULL PRIMARY KEY",
+                    "name": "text UNIQUE",
+                    "age": "real",
+                },
+            )
+            for table_name, rows, expected in [
+                (
+                    "uniqueTable",
+                    [{"name": "John", "age": 16}, {"name": "Jane", "age": 30}],
+                    [{"name": "John", "age": 17}, {"name": "Jane", "age": 30}],
+                ),
+                (
+                    "bothTable",
+                    [
+                        {"key": 1, "name": "John", "age": 16},
+                        {"key": 2, "name": "Jane", "age": 30},
+                    ],
+                    [
+                        {"key": 1, "name": "John", "age": 17},
+                        {"key": 2, "name": "Jane", "age": 30},
+                    ],
+                ),
+            ]:
+                with self.subTest(table_name=table_name):
+                    await db_ctx.insert_or_update_many(table_name, rows)
+                    # Update John
+                    await db_ctx.insert_or_update_many(
+                        table_name, [dict(rows[0], age=17)]
+                    )
+                    results = [row async for row in db_ctx.lookup(table_name)]
+                    self.assertEqual(results, expected)
+            # Updated on the unique column, rather than the primary key
+            await db_ctx.insert_or_update_many(
+                "bothTable", [{"name": "Jane", "age": 31}]
+            )
+            results = [row async for row in db_ctx.lookup("bothTable")]
+            self.assertEqual(
+                results,
+                [
+                    {"key": 1, "name": "John", "age": 17},
+                    {"key": 2, "name": "Jane", "age": 31},
+                ],
+            )
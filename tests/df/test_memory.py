@@ -1,3 +1,7 @@
+import os
+import asyncio
+import threading
+import contextlib
 from unittest.mock import patch
 from typing import NamedTuple
 
@@ -5,15 +9,25 @@ from dffml.base import config
 from dffml.util.cli.arg import Arg, parse_unknown
 from dffml.util.entrypoint import entrypoint
 from dffml.df.types import Definition, DataFlow, Input
-from dffml.df.base import op, BaseKeyValueStore
+from dffml.df.base import op, BaseKeyValueStore, StringInputSetContext
 from dffml.df.memory import (
+    BaseMemoryDataFlowObject,
     MemoryKeyValueStore,
+    MemoryKeyValueStoreConfig,
+    MemoryKeyValueStoreContext,
     MemoryRedundancyChecker,
     MemoryRedundancyCheckerConfig,
     MemoryOrchestrator,
+    MemoryInputNetwork,
+    MemoryIndexedInputNetwork,
+    MemoryOperationImplementationNetwork,
 )
 from dffml.util.asynctestcase import AsyncTestCase
 
+from dffml.operation.output import GetSingle, GetMulti
+
+from ..test_df import TestOrchestrator, DATAFLOW
+
 
 @config
 class KeyValueStoreWithArgumentsConfig:
@@ -30,6 +44,15 @@ class KeyValueStoreWithArguments(BaseKeyValueStore):
         raise NotImplementedError
 
 
+class HashedKeyValueStore(BaseKeyValueStore, BaseMemoryDataFlowObject):
+    """
+    Not a MemoryKeyValueStore, so the redundancy checker hashes keys
+    """
+
+    CONTEXT = MemoryKeyValueStoreContext
+    CONFIG = MemoryKeyValueStoreConfig
+
+
 def load_kvstore_with_args(loading=None):
     if loading == "withargs":
         return KeyValueStoreWithArguments
@@ -84,6 +107,31 @@ class TestMemoryRedundancyChecker(AsyncTestCase):
 CONDITION = Definition(name="condition", primitive="boolean")
 
 
+@op(executor="process")
+def pid_of_process() -> int:
+    return os.getpid()
+
+
+@op(executor="thread")
+def thread_of_thread() -> int:
+    return threading.get_ident()
+
+
+@op
+def thread_of_default() -> int:
+    return threading.get_ident()
+
+
+@config
+class MultiplyConfig:
+    factor: int
+
+
+@op(cache=True, config_cls=MultiplyConfig)
+async def multiply(self, value: int) -> int:
+    return value * self.parent.config.factor
+
+
 class TestMemoryOrchestrator(AsyncTestCase):
     async def test_condition_does_run(self):
         ran = []
@@ -141,3 +189,487 @@ class TestMemoryOrchestrator(AsyncTestCase):
                     pass
 
         self.assertFalse(ran)
+
+    async def test_max_ctxs_and_operations(self):
+        running = {"ctxs": set(), "ops": 0, "max_ctxs": 0, "max_ops": 0}
+
+        @op
+        async def slow(value: int):
+            running["ctxs"].add(value // 10)
+            running["ops"] += 1
+            running["max_ctxs"] = max(
+                running["max_ctxs"], len(running["ctxs"])
+            )
+            running["max_ops"] = max(running["max_ops"], running["ops"])
+            await asyncio.sleep(0.01)
+            running["ops"] -= 1
+
+        async def done(ctx):
+            running["ctxs"].discard(int((await ctx.handle()).as_string()))
+
+        async with MemoryOrchestrator(
+            max_ctxs=2,
+            opimp_network=MemoryOperationImplementationNetwork(
+                max_operations=3
+            ),
+        ) as orchestrator:
+            async with orchestrator(DataFlow(slow)) as octx:
+                async for ctx, _results in octx.run(
+                    {
+                        str(i): [
+                            Input(
+                                value=(i * 10) + j,
+                                definition=slow.op.inputs["value"],
+                            )
+                            for j in range(5)
+                        ]
+                        for i in range(5)
+                    }
+                ):
+                    await done(ctx)
+
+        self.assertEqual(running["max_ctxs"], 2)
+        self.assertEqual(running["max_ops"], 3)
+
+    async def test_max_operations_by_instance(self):
+        running = {"ops": 0, "max_ops": 0}
+
+        @op
+        async def slow(value: int):
+            running["ops"] += 1
+            running["max_ops"] = max(running["max_ops"], running["ops"])
+            await asyncio.sleep(0.01)
+            running["ops"] -= 1
+
+        async with MemoryOrchestrator(
+            opimp_network=MemoryOperationImplementationNetwork(
+                max_operations_by_instance={slow.op.name: 1}
+            ),
+        ) as orchestrator:
+            async with orchestrator(DataFlow(slow)) as octx:
+                async for _ctx, _results in octx.run(
+                    [
+                        Input(value=i, definition=slow.op.inputs["value"])
+                        for i in range(5)
+                    ]
+                ):
+                    pass
+
+        self.assertEqual(running["max_ops"], 1)
+
+    async def run_auto_start(self, operation, **kwargs):
+        async with MemoryOrchestrator(**kwargs) as orchestrator:
+            async with orchestrator(
+                DataFlow.auto(operation, GetSingle)
+            ) as octx:
+                async for _ctx, results in octx.run(
+                    [
+                        Input(
+                            value=[operation.op.outputs["result"].name],
+                            definition=GetSingle.op.inputs["spec"],
+                        )
+                    ]
+                ):
+                    return results[operation.op.outputs["result"].name]
+
+    async def test_executor_process(self):
+        self.assertNotEqual(
+            await self.run_auto_start(pid_of_process), os.getpid()
+        )
+
+    async def test_executor_thread(self):
+        self.assertNotEqual(
+            await self.run_auto_start(thread_of_thread), threading.get_ident()
+        )
+
+    async def test_executor_default(self):
+        self.assertEqual(
+            await self.run_auto_start(thread_of_default),
+            threading.get_ident(),
+        )
+        self.assertNotEqual(
+            await self.run_auto_start(
+                thread_of_default,
+                opimp_network=MemoryOperationImplementationNetwork(
+                    executor="thread"
+                ),
+            ),
+            threading.get_ident(),
+        )
+
+    async def test_executor_process_asyncgen(self):
+        collected = []
+
+        @op(executor="process")
+        async def count(value: int) -> int:
+            for i in range(value):
+                yield i
+
+        @op(inputs={"value": count.op.outputs["result"]})
+        async def collect(value: int):
+            collected.append(value)
+
+        # Async generators run on the event loop rather than being pickled
+        # and sent to a process, whatever the network's default executor
+        for executor in ["inline", "process"]:
+            collected.clear()
+            async with MemoryOrchestrator(
+                opimp_network=MemoryOperationImplementationNetwork(
+                    executor=executor
+                )
+            ) as orchestrator:
+                async with orchestrator(DataFlow(count, collect)) as octx:
+                    async for _ctx, _results in octx.run(
+                        [Input(value=3, definition=count.op.inputs["value"])]
+                    ):
+                        pass
+            self.assertEqual(sorted(collected), [0, 1, 2])
+
+    def test_executor_invalid(self):
+        with self.assertRaisesRegex(ValueError, "executor"):
+            op(executor="gpu")
+
+    async def test_asyncgenerator_halt(self):
+        halt = asyncio.Event()
+        requested = []
+
+        @op
+        async def double(value: int) -> int:
+            return value * 2
+
+        async def input_sets():
+            i = 0
+            while True:
+                requested.append(i)
+                yield {
+                    str(i): [
+                        Input(value=i, definition=double.op.inputs["value"]),
+                        Input(
+                            value=[double.op.outputs["result"].name],
+                            definition=GetSingle.op.inputs["spec"],
+                        ),
+                    ]
+                }
+                i += 1
+
+        results = {}
+        async with MemoryOrchestrator(max_ctxs=2) as orchestrator:
+            async with orchestrator(DataFlow.auto(double, GetSingle)) as octx:
+                async for ctx, result in octx.run(input_sets(), halt=halt):
+                    results[(await ctx.handle()).as_string()] = result[
+                        double.op.outputs["result"].name
+                    ]
+                    if len(results) == 5:
+                        halt.set()
+
+        # Contexts which were started before halt was set run to completion
+        self.assertGreaterEqual(len(results), 5)
+        for ctx_string, result in results.items():
+            self.assertEqual(result, int(ctx_string) * 2)
+        # Input sets are only requested when there is room to run them
+        self.assertLessEqual(len(requested), len(results) + 2)
+
+    async def run_evict(self, retain_ctxs, **kwargs):
+        LockedValue = Definition(
+            name="locked_value", primitive="int", lock=True
+        )
+
+        @op(inputs={"value": LockedValue})
+        async def locked(value: int):
+            pass
+
+        completed = []
+        async with MemoryOrchestrator(
+            retain_ctxs=retain_ctxs, **kwargs
+        ) as orchestrator:
+            async with orchestrator(DataFlow(locked)) as octx:
+                async for ctx, _results in octx.run(
+                    {
+                        str(i): [Input(value=i, definition=LockedValue)]
+                        for i in range(5)
+                    }
+                ):
+                    completed.append((await ctx.handle()).as_string())
+                return completed, octx
+
+    async def test_evict_completed_ctxs(self):
+        _completed, octx = await self.run_evict(0)
+        self.assertFalse(octx.ictx.ctxhd)
+        self.assertFalse(octx.ictx.input_notification_set)
+        self.assertFalse(octx.ictx.ctx_notification_set.notification_items)
+        self.assertTrue(octx.rctx.in_memory)
+        self.assertFalse(octx.rctx.ctx_taken)
+        self.assertFalse(octx.lctx.locks)
+        self.assertFalse(octx.nctx.priorities)
+        self.assertFalse(octx.running_ctxs)
+
+    async def test_evict_when_caller_stops(self):
+        @op
+        async def double(value: int) -> int:
+            return value * 2
+
+        async with MemoryOrchestrator(retain_ctxs=0) as orchestrator:
+            async with orchestrator(DataFlow(double)) as octx:
+                results = octx.run(
+                    [Input(value=1, definition=double.op.inputs["value"])]
+                )
+                async for _ctx, _results in results:
+                    break
+                await results.aclose()
+                self.assertFalse(octx.ictx.ctxhd)
+                self.assertFalse(octx.running_ctxs)
+
+    async def test_priorities_after_evict(self):
+        async with MemoryOperationImplementationNetwork() as network:
+            async with network() as nctx:
+                for ctx_string in ["a", "b", "c"]:
+                    async with nctx.slot(
+                        thread_of_default.op, StringInputSetContext(ctx_string)
+                    ):
+                        pass
+                await nctx.evict(StringInputSetContext("a"))
+                async with nctx.slot(
+                    thread_of_default.op, StringInputSetContext("d")
+                ):
+                    pass
+                # Newer contexts come after older ones still running
+                self.assertEqual(
+                    nctx.priorities, {"b": 1, "c": 2, "d": 3},
+                )
+
+    async def test_evict_hashed_keys(self):
+        completed, octx = await self.run_evict(
+            0, rchecker=MemoryRedundancyChecker(kvstore=HashedKeyValueStore())
+        )
+        self.assertEqual(len(completed), 5)
+        self.assertFalse(octx.rctx.in_memory)
+        self.assertFalse(octx.rctx.kvctx.memory)
+        self.assertFalse(octx.rctx.ctx_keys)
+
+    async def test_retain_ctxs(self):
+        completed, octx = await self.run_evict(2)
+        self.assertEqual(set(octx.ictx.ctxhd), set(completed[-2:]))
+        self.assertEqual(list(octx.retained), completed[-2:])
+        self.assertEqual(len(octx.lctx.locks), 2)
+
+    async def test_cache(self):
+        ran = []
+
+        @op(cache=True, version="1")
+        async def double(value: int) -> int:
+            ran.append(value)
+            return value * 2
+
+        async with MemoryOrchestrator() as orchestrator:
+            async with orchestrator(DataFlow.auto(double, GetSingle)) as octx:
+                results = {
+                    (await ctx.handle()).as_string(): result[
+                        double.op.outputs["result"].name
+                    ]
+                    async for ctx, result in octx.run(
+                        {
+                            str(i): [
+                                Input(
+                                    value=i % 2,
+                                    definition=double.op.inputs["value"],
+                                ),
+                                Input(
+                                    value=[double.op.outputs["result"].name],
+                                    definition=GetSingle.op.inputs["spec"],
+                                ),
+                            ]
+                            for i in range(4)
+                        }
+                    )
+                }
+
+        self.assertEqual(results, {"0": 0, "1": 2, "2": 0, "3": 2})
+        # Only run once for each unique input value
+        self.assertEqual(sorted(ran), [0, 1])
+
+    async def test_cache_config(self):
+        dataflow = DataFlow(
+            operations={
+                "double": multiply.op,
+                "triple": multiply.op,
+                "get_multi": GetMulti.op,
+            },
+            configs={
+                "double": MultiplyConfig(factor=2),
+                "triple": MultiplyConfig(factor=3),
+            },
+        )
+        async with MemoryOrchestrator() as orchestrator:
+            async with orchestrator(dataflow) as octx:
+                async for _ctx, results in octx.run(
+                    [
+                        Input(value=1, definition=multiply.op.inputs["value"]),
+                        Input(
+                            value=[multiply.op.outputs["result"].name],
+                            definition=GetMulti.op.inputs["spec"],
+                        ),
+                    ]
+                ):
+                    # Instances with different configs don't share outputs
+                    self.assertEqual(
+                        sorted(results[multiply.op.outputs["result"].name]),
+                        [2, 3],
+                    )
+
+
+class TestMemoryIndexedInputNetwork(TestOrchestrator):
+    @contextlib.asynccontextmanager
+    async def create_octx(self):
+        async with MemoryOrchestrator(
+            input_network=MemoryIndexedInputNetwork()
+        ) as orchestrator:
+            async with orchestrator(DATAFLOW) as octx:
+                yield octx
+
+    async def test_gather_only_when_new(self):
+        first = Definition(name="first", primitive="string")
+        second = Definition(name="second", primitive="string")
+
+        @op(inputs={"a": first, "b": second})
+        async def pair(a: str, b: str):
+            pass
+
+        async with MemoryOrchestrator(
+            input_network=MemoryIndexedInputNetwork()
+        ) as orchestrator:
+            dataflow = DataFlow(pair)
+            operation = dataflow.operations[pair.op.name]
+            async with orchestrator(dataflow) as octx:
+                ctx = await octx.ictx.sadd(
+                    "ctx",
+                    Input(value="a0", definition=first),
+                    Input(value="b0", definition=second),
+                )
+                gather = lambda: octx.ictx.gather_inputs(
+                    octx.rctx, operation, dataflow, ctx=ctx
+                )
+                self.assertEqual(len([i async for i in gather()]), 1)
+                # Nothing new arrived so nothing gets sent to the redundancy
+                # checker
+                with patch.object(
+                    octx.rctx, "take_if_non_existant"
+                ) as take_if_non_existant:
+                    self.assertEqual(len([i async for i in gather()]), 0)
+                take_if_non_existant.assert_not_called()
+                await octx.ictx.sadd(
+                    "ctx", Input(value="a1", definition=first)
+                )
+                self.assertEqual(len([i async for i in gather()]), 1)
+
+    async def test_only_new_permutations(self):
+        first = Definition(name="first", primitive="string")
+        second = Definition(name="second", primitive="string")
+        third = Definition(name="third", primitive="string")
+
+        @op(inputs={"a": first, "b": second, "c": third})
+        async def triple(a: str, b: str, c: str):
+            pass
+
+        async with MemoryOrchestrator(
+            input_network=MemoryIndexedInputNetwork()
+        ) as orchestrator:
+            dataflow = DataFlow(triple)
+            operation = dataflow.operations[triple.op.name]
+            async with orchestrator(dataflow) as octx:
+                checked = []
+                take_if_non_existant = octx.rctx.take_if_non_existant
+
+                async def check(operation, *parameter_sets):
+                    for parameter_set in parameter_sets:
+                        checked.append(await parameter_set._asdict())
+                    async for parameter_set, taken in take_if_non_existant(
+                        operation, *parameter_sets
+                    ):
+                        yield parameter_set, taken
+
+                async def gather(*inputs):
+                    checked.clear()
+                    await octx.ictx.sadd("ctx", *inputs)
+                    return [
+                        await parameter_set._asdict()
+                        async for parameter_set in octx.ictx.gather_inputs(
+                            octx.rctx,
+                            operation,
+                            dataflow,
+                            ctx=StringInputSetContext("ctx"),
+                        )
+                    ]
+
+                with patch.object(octx.rctx, "take_if_non_existant", check):
+                    self.assertEqual(
+                        len(
+                            await gather(
+                                *[
+                                    Input(
+                                        value=f"{name}{i}",
+                                        definition=definition,
+                                    )
+                                    for i in range(2)
+                                    for name, definition in [
+                                        ("a", first),
+                                        ("b", second),
+                                        ("c", third),
+                                    ]
+                                ]
+                            )
+                        ),
+                        8,
+                    )
+                    self.assertEqual(len(checked), 8)
+                    # Only the permutations including the new input are
+                    # generated and checked
+                    ran = await gather(
+                        Input(value="b2", definition=second),
+                        Input(value="c2", definition=third),
+                    )
+                    self.assertEqual(len(ran), 10)
+                    self.assertEqual(len(checked), 10)
+                    for parameters in ran:
+                        self.assertTrue(
+                            parameters["b"] == "b2" or parameters["c"] == "c2"
+                        )
+                    self.assertEqual(
+                        len(set(map(lambda p: tuple(p.values()), ran))), 10
+                    )
+
+    async def test_default_value(self):
+        greeting = Definition(
+            name="greeting", primitive="string", default="Hi"
+        )
+        name = Definition(name="name", primitive="string")
+        message = Definition(name="message", primitive="string")
+
+        @op(
+            inputs={"greeting": greeting, "name": name},
+            outputs={"message": message},
+        )
+        async def greet(greeting: str, name: str):
+            return {"message": f"{greeting} {name}"}
+
+        dataflow = DataFlow(greet, GetMulti)
+        dataflow.seed.append(
+            Input(value=[message.name], definition=GetMulti.op.inputs["spec"])
+        )
+        for input_network in [MemoryInputNetwork, MemoryIndexedInputNetwork]:
+            with self.subTest(input_network=input_network):
+                async with MemoryOrchestrator(
+                    input_network=input_network()
+                ) as orchestrator:
+                    async with orchestrator(dataflow) as octx:
+                        async for ctx, results in octx.run(
+                            {
+                                "ctx": [
+                                    Input(value="Alice", definition=name),
+                                    Input(value="Bob", definition=name),
+                                ]
+                            }
+                        ):
+                            self.assertEqual(
+                                sorted(results[message.name]),
+                                ["Hi Alice", "Hi Bob"],
+                            )
@@ -0,0 +1,197 @@
+import pathlib
+import tempfile
+
+from dffml.df.types import DataFlow, Definition, Input
+from dffml.df.base import op, OperationException
+from dffml.df.memory import (
+    MemoryOrchestrator,
+    MemoryRedundancyChecker,
+    MemoryOperationImplementationNetwork,
+)
+from dffml.df.sqlite import SqliteKeyValueStore
+from dffml.operation.output import GetSingle
+from dffml.util.asynctestcase import AsyncTestCase
+
+
+class TestSqliteKeyValueStore(AsyncTestCase):
+    async def setUp(self):
+        super().setUp()
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.filename = str(pathlib.Path(self.tempdir.name, "kvstore.db"))
+
+    async def tearDown(self):
+        super().tearDown()
+        self.tempdir.cleanup()
+
+    async def test_batched_writes(self):
+        kvstore = SqliteKeyValueStore(filename=self.filename, batch_size=2)
+        async with kvstore:
+            async with kvstore() as kvctx:
+                await kvctx.set("a", b"1")
+                self.assertIn("a", kvstore.pending)
+                self.assertEqual(await kvctx.get("a"), b"1")
+                await kvctx.set("b", b"2")
+                self.assertFalse(kvstore.pending)
+                self.assertTrue(
+                    await kvctx.conditional_set(
+                        "c", b"3", checker=lambda value: value is None
+                    )
+                )
+                self.assertFalse(
+                    await kvctx.conditional_set(
+                        "c", b"4", checker=lambda value: value is None
+                    )
+                )
+        # Buffered writes are committed on exit
+        async with SqliteKeyValueStore(filename=self.filename) as kvstore:
+            async with kvstore() as kvctx:
+                for key, value in {"a": b"1", "b": b"2", "c": b"3"}.items():
+                    self.assertEqual(await kvctx.get(key), value)
+                self.assertIsNone(await kvctx.get("d"))
+
+    async def test_restart_skips_already_run(self):
+        ran = []
+
+        @op
+        async def record(value: int):
+            ran.append(value)
+
+        async def run_dataflow(values):
+            async with MemoryOrchestrator(
+                rchecker=MemoryRedundancyChecker(
+                    kvstore=SqliteKeyValueStore(filename=self.filename)
+                )
+            ) as orchestrator:
+                async with orchestrator(DataFlow(record)) as octx:
+                    async for _ctx, _results in octx.run(
+                        {
+                            str(value): [
+                                Input(
+                                    value=value,
+                                    definition=record.op.inputs["value"],
+                                )
+                            ]
+                            for value in values
+                        }
+                    ):
+                        pass
+
+        await run_dataflow([0, 1])
+        self.assertEqual(sorted(ran), [0, 1])
+        ran.clear()
+        # Parameter sets run before the restart are not run again
+        await run_dataflow([0, 1, 2])
+        self.assertEqual(ran, [2])
+
+    async def test_restart_resumes(self):
+        ran = []
+        crash = True
+        number = Definition(name="number", primitive="int")
+        incremented = Definition(name="incremented", primitive="int")
+        doubled = Definition(name="doubled", primitive="int")
+
+        @op(inputs={"value": number}, outputs={"result": incremented})
+        async def step_a(value: int):
+            ran.append(("step_a", value))
+            return {"result": value + 1}
+
+        @op(inputs={"value": incremented}, outputs={"result": doubled})
+        async def step_b(value: int):
+            ran.append(("step_b", value))
+            if crash:
+                raise RuntimeError("Crashed")
+            return {"result": value * 2}
+
+        async def run_dataflow():
+            async with MemoryOrchestrator(
+                rchecker=MemoryRedundancyChecker(
+                    kvstore=SqliteKeyValueStore(filename=self.filename)
+                )
+            ) as orchestrator:
+                async with orchestrator(
+                    DataFlow(step_a, step_b, GetSingle)
+                ) as octx:
+                    return {
+                        (await ctx.handle()).as_string(): results
+                        async for ctx, results in octx.run(
+                            {
+                                "ctx": [
+                                    Input(value=1, definition=number),
+                                    Input(
+                                        value=[doubled.name],
+                                        definition=GetSingle.op.inputs["spec"],
+                                    ),
+                                ]
+                            }
+                        )
+                    }
+
+        with self.assertRaises(OperationException):
+            await run_dataflow()
+        self.assertEqual(ran, [("step_a", 1), ("step_b", 2)])
+        ran.clear()
+        crash = False
+        # step_a completed so its outputs are used without running it again,
+        # step_b didn't so it's run again
+        self.assertEqual(
+            await run_dataflow(), {"ctx": {doubled.name: 4}},
+        )
+        self.assertEqual(ran, [("step_b", 2)])
+        ran.clear()
+        # Everything completed
+        self.assertEqual(
+            await run_dataflow(), {"ctx": {doubled.name: 4}},
+        )
+        self.assertEqual(ran, [])
+
+    async def test_equal_values(self):
+        ran = []
+
+        @op
+        async def record(value: int):
+            ran.append(value)
+
+        async with MemoryOrchestrator(
+            rchecker=MemoryRedundancyChecker(
+                kvstore=SqliteKeyValueStore(filename=self.filename)
+            )
+        ) as orchestrator:
+            async with orchestrator(DataFlow(record)) as octx:
+                async for _ctx, _results in octx.run(
+                    {
+                        "ctx": [
+                            Input(
+                                value=0, definition=record.op.inputs["value"]
+                            )
+                            for _ in range(2)
+                        ]
+                    }
+                ):
+                    pass
+        # Distinct inputs with the same value are not mistaken for each other
+        self.assertEqual(ran, [0, 0])
+
+    async def test_cache_outputs(self):
+        ran = []
+
+        @op(cache=True)
+        async def double(value: int) -> int:
+            ran.append(value)
+            return value * 2
+
+        async def run_dataflow():
+            async with MemoryOrchestrator(
+                opimp_network=MemoryOperationImplementationNetwork(
+                    cache=SqliteKeyValueStore(filename=self.filename)
+                )
+            ) as orchestrator:
+                async with orchestrator(DataFlow(double)) as octx:
+                    async for _ctx, _results in octx.run(
+                        [Input(value=21, definition=double.op.inputs["value"])]
+                    ):
+                        pass
+
+        # Outputs cached by an earlier run are used
+        await run_dataflow()
+        await run_dataflow()
+        self.assertEqual(ran, [21])
@@ -0,0 +1,52 @@
+from dffml.record import Record
+from dffml.source.source import Sources
+from dffml.source.memory import MemorySource, MemorySourceConfig
+from dffml.model.model import ModelContext
+from dffml.util.asynctestcase import AsyncTestCase
+
+
+class DoubleModelContext(ModelContext):
+    def __init__(self):
+        super().__init__(None)
+        self.batch_sizes = []
+
+    async def train(self, sources):
+        pass
+
+    async def accuracy(self, sources):
+        return 1.0
+
+    async def predict(self, sources):
+        async for record in self.predict_batches(sources, ["x"], "y", 2):
+            yield record
+
+    async def predict_batch(self, batch):
+        self.batch_sizes.append(len(batch["x"]))
+        return (batch["x"] * 2).tolist(), 0.5
+
+
+class TestModelContext(AsyncTestCase):
+    async def test_predict_batches(self):
+        mctx = DoubleModelContext()
+        async with Sources(
+            MemorySource(
+                MemorySourceConfig(
+                    records=[
+                        Record(str(i), data={"features": {"x": i}})
+                        for i in range(5)
+                    ]
+                    # Records without the feature aren't predicted
+                    + [Record("missing", data={"features": {"z": 1}})]
+                )
+            )
+        ) as sources:
+            async with sources() as sctx:
+                predictions = {
+                    record.key: record.prediction("y")
+                    async for record in mctx.predict(sctx)
+                }
+        self.assertEqual(
+            predictions,
+            {str(i): {"value": i * 2, "confidence": 0.5} for i in range(5)},
+        )
+        self.assertEqual(mctx.batch_sizes, [2, 2, 1])
@@ -0,0 +1,74 @@
+import os
+import pathlib
+import tempfile
+
+from dffml.model.resident import (
+    ResidentModels,
+    DEFAULT_MAX_BYTES,
+    resident_file_key,
+)
+from dffml.util.asynctestcase import AsyncTestCase
+
+
+class TestResidentModels(AsyncTestCase):
+    def test_max_bytes(self):
+        resident = ResidentModels(max_bytes=10)
+        resident.load("a", lambda: "a" * 4, size=len)
+        resident.load("b", lambda: "b" * 4, size=len)
+        self.assertEqual(list(resident), ["a", "b"])
+        # Least recently used entries are evicted until within budget
+        resident.load("a", lambda: "a" * 4, size=len)
+        resident.load("c", lambda: "c" * 4, size=len)
+        self.assertEqual(list(resident), ["a", "c"])
+        self.assertEqual(resident.total_bytes, 8)
+        # The most recently loaded entry is kept even when over budget
+        resident.load("d", lambda: "d" * 20, size=len)
+        self.assertEqual(list(resident), ["d"])
+        resident.discard("d")
+        self.assertEqual(resident.total_bytes, 0)
+
+    def test_file_key(self):
+        loads = []
+        resident = ResidentModels()
+        with tempfile.TemporaryDirectory() as tempdir:
+            weights = pathlib.Path(tempdir, "weights")
+
+            def load():
+                loads.append(weights.read_text())
+                return loads[-1]
+
+            weights.write_text("trained")
+            for _ in range(2):
+                self.assertEqual(
+                    resident.load(resident_file_key(weights), load), "trained"
+                )
+            # Loaded again once the file has been written to
+            weights.write_text("trained again")
+            os.utime(weights, ns=(0, 0))
+            self.assertEqual(
+                resident.load(resident_file_key(weights), load),
+                "trained again",
+            )
+        self.assertEqual(loads, ["trained", "trained again"])
+
+    def test_discard_stale(self):
+        resident = ResidentModels()
+        with tempfile.TemporaryDirectory() as tempdir:
+            weights = pathlib.Path(tempdir, "weights")
+            weights.write_text("trained")
+            old_key = ("model", resident_file_key(weights), "cpu")
+            resident.load(old_key, weights.read_text, size=len)
+            resident.load("other", lambda: "other", size=len)
+            # Loading after training again discards the entry loaded before
+            weights.write_text("trained again")
+            os.utime(weights, ns=(0, 0))
+            new_key = ("model", resident_file_key(weights), "cpu")
+            self.assertEqual(
+                resident.load(new_key, weights.read_text, size=len),
+                "trained again",
+            )
+            self.assertEqual(list(resident), ["other", new_key])
+            self.assertEqual(resident.total_bytes, len("othertrained again"))
+
+    def test_default_max_bytes(self):
+        self.assertEqual(ResidentModels().max_bytes, DEFAULT_MAX_BYTES)
@@ -1,8 +1,27 @@
 import unittest
 
 from dffml import SLRModel, run_consoletest, AsyncTestCase
+from dffml.model.slr import SLRStatistics
 
 
 class TestSLRModel(AsyncTestCase):
     async def test_docstring(self):
         await run_consoletest(SLRModel)
+
+
+class TestSLRStatistics(unittest.TestCase):
+    def test_batches(self):
+        # Values far from zero, where sums of squares would lose precision
+        x = [1e9 + i for i in range(100)]
+        y = [3 * value + (i % 7) for i, value in enumerate(x)]
+        whole = SLRStatistics()
+        whole.update(x, y)
+        batched = SLRStatistics()
+        for i in range(0, len(x), 7):
+            batched.update(x[i : i + 7], y[i : i + 7])
+        # Empty batches change nothing
+        batched.update([], [])
+        self.assertEqual(batched.n, 100)
+        for whole_value, batched_value in zip(whole.line(), batched.line()):
+            self.assertAlmostEqual(whole_value, batched_value, places=4)
+        self.assertAlmostEqual(whole.line()[0], 3.0, places=2)
@@ -0,0 +1,82 @@
+from dffml.base import config
+from dffml.df.types import DataFlow, Input
+from dffml.df.memory import MemoryOrchestrator
+from dffml.model.model import Model, ModelContext
+from dffml.operation.model import model_predict, ModelPredictConfig
+from dffml.operation.output import GetSingle
+from dffml.util.asynctestcase import AsyncTestCase
+
+
+@config
+class DoubleModelConfig:
+    pass
+
+
+class DoubleModelContext(ModelContext):
+    async def train(self, sources):
+        pass
+
+    async def accuracy(self, sources):
+        return 1.0
+
+    async def predict(self, sources):
+        self.parent.calls += 1
+        async for record in sources.with_features(["x"]):
+            record.predicted("y", record.feature("x") * 2, 1.0)
+            yield record
+
+
+class DoubleModel(Model):
+    CONFIG = DoubleModelConfig
+    CONTEXT = DoubleModelContext
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.calls = 0
+
+
+class TestModelPredict(AsyncTestCase):
+    async def test_batched(self):
+        model = DoubleModel(DoubleModelConfig())
+        dataflow = DataFlow(
+            operations={"predict": model_predict, "get_single": GetSingle},
+            configs={
+                "predict": ModelPredictConfig(model=model, max_latency=0.1)
+            },
+            seed=[
+                Input(
+                    value=[model_predict.op.outputs["prediction"].name],
+                    definition=GetSingle.op.inputs["spec"],
+                )
+            ],
+        )
+        results = {
+            ctx_string: results
+            async for ctx, results in MemoryOrchestrator.run(
+                dataflow,
+                {
+                    str(i): [
+                        Input(
+                            value={"x": i},
+                            definition=model_predict.op.inputs["features"],
+                        )
+                    ]
+                    for i in range(5)
+                },
+                strict=True,
+            )
+            for ctx_string in [(await ctx.handle()).as_string()]
+        }
+        self.assertEqual(
+            results,
+            {
+                str(i): {
+                    "model_predictions": {
+                        "y": {"value": i * 2, "confidence": 1.0}
+                    }
+                }
+                for i in range(5)
+            },
+        )
+        # Predictions for every context were made with one call to the model
+        self.assertEqual(model.calls, 1)
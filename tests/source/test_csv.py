@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2019 Intel Corporation
+import gzip
 import tempfile
 import os
 import csv
@@ -11,6 +12,7 @@ from dffml.source.csv import CSVSource, CSVSourceConfig
 from dffml.util.testing.source import FileSourceTest
 from dffml.util.asynctestcase import AsyncTestCase
 from dffml.record import Record
+from dffml.feature import Feature, Features
 from dffml.util.cli.arg import parse_unknown
 
 
@@ -110,3 +112,180 @@ class TestCSVSource(FileSourceTest, AsyncTestCase):
                     record_b = await sctx.record("b")
                     self.assertEqual(record_a.feature("ValueColumn"), 42)
                     self.assertEqual(record_b.feature("ValueColumn"), 420)
+
+    async def test_stream(self):
+        with tempfile.TemporaryDirectory() as testdir:
+            testfile = pathlib.Path(testdir, "stream.csv")
+            testfile.write_text(
+                inspect.cleandoc(
+                    """
+                    key,tag,flag,text,value
+                    a,untagged,True,"multi
+                    line",1
+                    b,other,False,skipped,2
+                    c,untagged,False,"c, d",3
+                    """
+                )
+                + "\n"
+            )
+            async with CSVSource(
+                filename=str(testfile),
+                features=Features(Feature("flag", bool, 1)),
+                stream=True,
+                index=True,
+            ) as source:
+                async with source() as sctx:
+                    records = {
+                        record.key: record.features()
+                        async for record in sctx.records()
+                    }
+                    self.assertEqual(
+                        records,
+                        {
+                            "a": {
+                                "flag": True,
+                                "text": "multi\nline",
+                                "value": 1,
+                            },
+                            "c": {"flag": False, "text": "c, d", "value": 3},
+                        },
+                    )
+                    # Indexed lookups seek past rows spanning multiple lines
+                    record = await sctx.record("c")
+                    self.assertEqual(record.feature("text"), "c, d")
+                    self.assertFalse((await sctx.record("b")).features())
+                    with self.assertRaisesRegex(ValueError, "read only"):
+                        await sctx.update(Record("d"))
+            self.assertTrue(
+                list(pathlib.Path(testdir).glob("stream.csv.index*"))
+            )
+            # The index is rebuilt when the file changes
+            with open(testfile, "a") as fd:
+                fd.write("d,untagged,True,new,4\n")
+            async with CSVSource(
+                filename=str(testfile), stream=True, index=True
+            ) as source:
+                async with source() as sctx:
+                    record = await sctx.record("d")
+                    self.assertEqual(record.feature("value"), 4)
+            # Lookups without an index scan the file
+            async with CSVSource(
+                filename=str(testfile), stream=True
+            ) as source:
+                async with source() as sctx:
+                    record = await sctx.record("a")
+                    self.assertEqual(record.feature("value"), 1)
+
+    async def test_stream_readwrite(self):
+        with tempfile.TemporaryDirectory() as testdir:
+            with self.assertRaisesRegex(ValueError, "read only"):
+                async with CSVSource(
+                    filename=os.path.join(testdir, "stream.csv"),
+                    allowempty=True,
+                    readwrite=True,
+                    stream=True,
+                ):
+                    pass
+
+    async def test_journal(self):
+        with tempfile.TemporaryDirectory() as testdir:
+            testfile = pathlib.Path(testdir, "records.csv")
+            source = CSVSource(
+                filename=str(testfile),
+                allowempty=True,
+                readwrite=True,
+                journal=True,
+                compact=2,
+            )
+
+            async def update(records):
+                async with source, source() as sctx:
+                    for key, features in records.items():
+                        await sctx.update(
+                            Record(key, data={"features": features})
+                        )
+
+            async def read():
+                async with source, source() as sctx:
+                    return {
+                        record.key: record.features()
+                        async for record in sctx.records()
+                    }
+
+            await update({str(i): {"x": i} for i in range(3)})
+            lines = testfile.read_text().splitlines()
+            self.assertEqual(len(lines), 4)
+            # Updated records are appended rather than rewriting the file
+            await update({"1": {"x": 10}, "3": {"x": 3}})
+            appended = testfile.read_text().splitlines()
+            self.assertEqual(appended[:4], lines)
+            self.assertEqual(len(appended), 6)
+            self.assertEqual(
+                await read(),
+                {"0": {"x": 0}, "1": {"x": 10}, "2": {"x": 2}, "3": {"x": 3}},
+            )
+            # Records with new columns cause the file to be rewritten
+            await update({"2": {"x": 20, "y": 1}})
+            self.assertEqual(len(testfile.read_text().splitlines()), 5)
+            # As do superseded rows once there are compact of them
+            await update({"0": {"x": 30, "y": 0}})
+            await update({"1": {"x": 40, "y": 0}})
+            self.assertEqual(len(testfile.read_text().splitlines()), 7)
+            await update({"3": {"x": 50, "y": 0}})
+            self.assertEqual(len(testfile.read_text().splitlines()), 5)
+            self.assertEqual(
+                await read(),
+                {
+                    "0": {"x": 30, "y": 0},
+                    "1": {"x": 40, "y": 0},
+                    "2": {"x": 20, "y": 1},
+                    "3": {"x": 50, "y": 0},
+                },
+            )
+            self.assertEqual(list(pathlib.Path(testdir).iterdir()), [testfile])
+
+    async def test_workers(self):
+        with tempfile.TemporaryDirectory() as testdir:
+            contents = (
+                inspect.cleandoc(
+                    '''
+                key,tag,"a ""b""",text,prediction_y,confidence_y
+                0,untagged,1,"multi
+                line ""quoted""",cat,0.5
+                1,other,2,"c, d",,
+                2,untagged,3.5,"[1, 2]",dog,0.9
+                '''
+                )
+                + "".join(
+                    f"\n{i},untagged,{i},text {i},," for i in range(3, 50)
+                )
+            )
+            for filename, opener in [
+                ("records.csv", open),
+                ("records.csv.gz", gzip.open),
+            ]:
+                testfile = pathlib.Path(testdir, filename)
+                with opener(testfile, "wt") as fd:
+                    fd.write(contents)
+                loaded = []
+                for workers in [0, 2]:
+                    async with CSVSource(
+                        filename=str(testfile), workers=workers, chunk_size=16
+                    ) as source:
+                        async with source() as sctx:
+                            loaded.append(
+                                {
+                                    record.key: record.export()
+                                    async for record in sctx.records()
+                                }
+                            )
+                self.assertEqual(loaded[0], loaded[1])
+                self.assertEqual(len(loaded[1]), 49)
+                self.assertEqual(
+                    loaded[1]["0"]["features"],
+                    {'a "b"': 1, "text": 'multi\nline "quoted"'},
+                )
+                self.assertEqual(
+                    loaded[1]["2"]["prediction"],
+                    {"y": {"value": "dog", "confidence": 0.9}},
+                )
@@ -4,9 +4,12 @@ import tempfile
 from typing import Dict
 
 from dffml.db.sqlite import SqliteDatabaseConfig, SqliteDatabase
+from dffml.record import Record
 from dffml.util.asynctestcase import AsyncTestCase
 from dffml.util.testing.source import SourceTest
 from dffml.source.db import DbSource, DbSourceConfig
+from dffml.source.source import Sources
+from dffml.source.memory import MemorySource
 
 
 class TestDbSource(AsyncTestCase, SourceTest):
@@ -75,6 +78,208 @@ class TestDbSource(AsyncTestCase, SourceTest):
     async def setUpSource(self):
         return DbSource(self.source_config)
 
+    async def test_feature_batches(self):
+        features = ["PetalLength", "PetalWidth", "SepalLength", "SepalWidth"]
+        source = await self.setUpSource()
+        async with source as testSource:
+            async with testSource() as sourceContext:
+                for i in range(5):
+                    await sourceContext.update(
+                        Record(
+                            f"batch{i}",
+                            data={
+                                "features": {
+                                    feature: float(i * j)
+                                    for j, feature in enumerate(features)
+                                }
+                            },
+                        )
+                    )
+                batches = [
+                    batch
+                    async for batch in sourceContext.feature_batches(
+                        ["SepalLength", "PetalWidth"], 2
+                    )
+                ]
+                # Features which aren't columns of the table
+                self.assertFalse(
+                    [
+                        batch
+                        async for batch in sourceContext.feature_batches(
+                            ["feed"], 2
+                        )
+                    ]
+                )
+        self.assertTrue(
+            all(len(batch["SepalLength"]) <= 2 for batch in batches)
+        )
+        values = {
+            float(sepal_length): float(petal_width)
+            for batch in batches
+            for sepal_length, petal_width in zip(
+                batch["SepalLength"], batch["PetalWidth"]
+            )
+        }
+        for i in range(5):
+            self.assertEqual(values[float(i * 2)], float(i))
+
+    async def test_update_many(self):
+        records = [
+            Record(
+                f"many{i}",
+                data={
+                    "features": {
+                        "PetalLength": float(i),
+                        "PetalWidth": 0.5,
+                        "SepalLength": 1.5,
+                        "SepalWidth": 2.5,
+                    },
+                    "prediction": {
+                        "target_name": {"value": "setosa", "confidence": 0.9}
+                    },
+                },
+            )
+            for i in range(3)
+        ]
+        source = await self.setUpSource()
+        async with source as testSource:
+            async with testSource() as sourceContext:
+                await sourceContext.update_many(records)
+                # Records already in the table are updated
+                records[0].evaluated({"PetalWidth": 4.0})
+                await sourceContext.update_many(records[:1])
+        source = await self.setUpSource()
+        async with source as testSource:
+            async with testSource() as sourceContext:
+                for record in records:
+                    loaded = await sourceContext.record(record.key)
+                    self.assertEqual(loaded.features(), record.features())
+                    self.assertEqual(
+                        loaded.predictions(), record.predictions()
+                    )
+
+    async def test_query(self):
+        source = await self.setUpSource()
+        async with source as testSource:
+            async with testSource() as sourceContext:
+                await sourceContext.update_many(
+                    [
+                        Record(
+                            f"query{i}",
+                            data={
+                                "features": {
+                                    "PetalLength": float(i),
+                                    "PetalWidth": 1.0,
+                                    "SepalLength": 2.0,
+                                    "SepalWidth": 3.0,
+                                }
+                            },
+                        )
+                        for i in range(4)
+                    ]
+                )
+                statements = []
+                source.db.db.set_trace_callback(
+                    lambda query: statements.append(query)
+                )
+                records = [
+                    record
+                    async for record in sourceContext.query(
+                        features=["PetalLength"],
+                        key_start="query1",
+                        key_end="query3",
+                        conditions=[("PetalWidth", "=", 1.0)],
+                    )
+                ]
+                source.db.db.set_trace_callback(None)
+                # Only the requested columns and rows are selected
+                self.assertIn(
+                    "SELECT `key`, `feature_PetalLength` FROM TestTable",
+                    statements[0],
+                )
+                self.assertEqual(
+                    [(record.key, record.features()) for record in records],
+                    [
+                        ("query1", {"PetalLength": 1.0}),
+                        ("query2", {"PetalLength": 2.0}),
+                    ],
+                )
+                self.assertEqual(
+                    [
+                        record.key
+                        async for record in sourceContext.query(
+                            keys=["query0", "query3"]
+                        )
+                    ],
+                    ["query0", "query3"],
+                )
+                # Features which aren't columns of the table
+                self.assertFalse(
+                    [
+                        record
+                        async for record in sourceContext.query(
+                            features=["feed"]
+                        )
+                    ]
+                )
+                # Updating a record with only some features keeps the others
+                records[0].evaluated({"PetalLength": 5.0})
+                await sourceContext.update(records[0])
+                self.assertEqual(
+                    (await sourceContext.record("query1")).features(),
+                    {
+                        "PetalLength": 5.0,
+                        "PetalWidth": 1.0,
+                        "SepalLength": 2.0,
+                        "SepalWidth": 3.0,
+                    },
+                )
+
+    async def test_records_by_keys(self):
+        source = await self.setUpSource()
+        async with source as testSource:
+            async with testSource() as sourceContext:
+                await sourceContext.update(
+                    Record("bykey", data={"features": {"PetalLength": 1.5}})
+                )
+                records = await sourceContext.records_by_keys(
+                    ["bykey", "nokey"]
+                )
+        self.assertEqual(list(records), ["bykey", "nokey"])
+        self.assertEqual(records["bykey"].feature("PetalLength"), 1.5)
+        self.assertFalse(records["nokey"].features())
+
+    async def test_merge_many(self):
+        keys = [f"merge{i}" for i in range(1100)]
+        source = await self.setUpSource()
+        async with source as testSource:
+            async with testSource() as sourceContext:
+                await sourceContext.update_many(
+                    [
+                        Record(key, data={"features": {"PetalWidth": i}})
+                        for i, key in enumerate(keys)
+                    ]
+                )
+        # Merging looks up batches of keys with more keys than the depth of
+        # an expression SQLite allows, and values it allows to be bound
+        async with Sources(
+            MemorySource(
+                records=[
+                    Record(key, data={"features": {"SepalWidth": i}})
+                    for i, key in enumerate(keys)
+                ]
+            ),
+            source,
+        ) as sources:
+            async with sources() as sctx:
+                records = [record async for record in sctx.records()]
+        self.assertEqual(len(records), len(keys))
+        for i, record in enumerate(records):
+            self.assertEqual(
+                record.features(["PetalWidth", "SepalWidth"]),
+                {"PetalWidth": i, "SepalWidth": i},
+            )
+
 
 # TODO: Potential shortcoming: Is there a way to call this source from the CLI and pass the db object (e.g. SqliteDatabase)?
 # dffml list records -sources primary=dbsource -source-db_implementation sqlite -source-table_name testTable -source-db ??? -source-model_columns "key feature_PetalLength feature_PetalWidth feature_SepalLength feature_SepalWidth target_name_confidence target_name_value"
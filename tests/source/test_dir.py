@@ -1,4 +1,5 @@
 import os
+import json
 import pathlib
 import tempfile
 import contextlib
@@ -6,7 +7,8 @@ import contextlib
 from PIL import Image
 
 from dffml.source.dir import DirectorySource, DirectorySourceConfig
-from dffml.util.asynctestcase import IntegrationCLITestCase
+from dffml.record import Record
+from dffml.util.asynctestcase import AsyncTestCase, IntegrationCLITestCase
 from dffml.util.os import chdir
 
 
@@ -104,3 +106,49 @@ class TestDirectorySource(IntegrationCLITestCase):
                         )
 
         self.assertEqual(len(records), 5)
+
+
+class TestLazyDirectorySource(AsyncTestCase):
+    async def test_lazy(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            for label in ["a", "b"]:
+                pathlib.Path(tempdir, label).mkdir()
+                for i in range(5):
+                    pathlib.Path(tempdir, label, f"{i}.json").write_text(
+                        json.dumps({"value": i})
+                    )
+            source = DirectorySource(
+                foldername=tempdir,
+                feature="data",
+                labels=["a", "b"],
+                lazy=True,
+                workers=2,
+                cache_size=3,
+            )
+            async with source, source() as sctx:
+                # Nothing is decoded until records are accessed
+                self.assertEqual(len(source.paths), 10)
+                self.assertFalse(source.decoded)
+                record = await sctx.record("b/3.json")
+                self.assertEqual(
+                    record.features(), {"data": {"value": 3}, "label": "b"}
+                )
+                self.assertEqual(list(source.decoded), ["b/3.json"])
+                records = {
+                    record.key: record.features()
+                    async for record in sctx.records()
+                }
+                self.assertEqual(len(records), 10)
+                self.assertEqual(
+                    records["a/1.json"], {"data": {"value": 1}, "label": "a"}
+                )
+                # Only the most recently decoded files are kept
+                self.assertEqual(len(source.decoded), 3)
+                self.assertFalse((await sctx.record("c/0.json")).features())
+                # Updated records take precedence
+                await sctx.update(
+                    Record("a/1.json", data={"features": {"data": 42}})
+                )
+                self.assertEqual(
+                    (await sctx.record("a/1.json")).feature("data"), 42
+                )
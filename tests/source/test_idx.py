@@ -1,7 +1,13 @@
+import gzip
 import json
+import struct
 import pathlib
 import hashlib
+import tempfile
 
+import numpy as np
+
+from dffml.record import Record
 from dffml.util.net import cached_download
 from dffml.util.asynctestcase import AsyncTestCase
 
@@ -53,7 +59,61 @@ class TestIDXSources(AsyncTestCase):
                     with self.subTest(index=i):
                         is_hash = hashlib.sha384(
                             json.dumps(
-                                records[i].feature(feature_name)
+                                records[i].feature(feature_name).tolist()
                             ).encode()
                         ).hexdigest()
                         self.assertEqual(is_hash, IDX3_FIRST_LAST[i])
+
+    async def test_memmap(self):
+        images = np.arange(5 * 2 * 3, dtype="u1").reshape((5, 6))
+        labels = np.array([1, -2, 3, 4, 5], dtype="i1")
+        with tempfile.TemporaryDirectory() as testdir:
+            for suffix, opener in [("", open), (".gz", gzip.open)]:
+                images_file = pathlib.Path(testdir, "images" + suffix)
+                labels_file = pathlib.Path(testdir, "labels" + suffix)
+                with opener(images_file, "wb") as fd:
+                    fd.write(struct.pack(">IIII", 2051, 5, 2, 3))
+                    fd.write(images.tobytes())
+                with opener(labels_file, "wb") as fd:
+                    fd.write(struct.pack(">II", 2049, 5))
+                    fd.write(labels.tobytes())
+                async with IDX3Source(
+                    filename=str(images_file), feature="image"
+                ) as images_source, IDX1Source(
+                    filename=str(labels_file), feature="label"
+                ) as labels_source:
+                    async with images_source() as ictx, labels_source() as lctx:
+                        with self.subTest(suffix=suffix):
+                            records = [r async for r in ictx.records()]
+                            self.assertEqual(len(records), 5)
+                            image = records[-1].feature("image")
+                            self.assertEqual(
+                                image.tolist(), images[-1].tolist()
+                            )
+                            # Uncompressed files are memory mapped
+                            self.assertEqual(
+                                isinstance(images_source.mem.array, np.memmap),
+                                not suffix,
+                            )
+                            # Records are views of the file's data
+                            self.assertIsNotNone(image.base)
+                            record = await lctx.record("1")
+                            self.assertEqual(record.feature("label"), -2)
+                            batches = [
+                                batch["image"]
+                                async for batch in ictx.feature_batches(
+                                    ["image"], batch_size=2
+                                )
+                            ]
+                            self.assertEqual(
+                                [len(batch) for batch in batches], [2, 2, 1]
+                            )
+                            self.assertTrue(
+                                np.array_equal(np.concatenate(batches), images)
+                            )
+                            # Updated records take precedence
+                            await lctx.update(
+                                Record("1", data={"features": {"label": 9}})
+                            )
+                            record = await lctx.record("1")
+                            self.assertEqual(record.feature("label"), 9)
@@ -1,5 +1,10 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2019 Intel Corporation
+import json
+import pathlib
+import tempfile
+
+from dffml.record import Record
 from dffml.source.json import JSONSource, JSONSourceConfig
 from dffml.util.testing.source import FileSourceTest
 from dffml.util.asynctestcase import AsyncTestCase
@@ -12,3 +17,83 @@ class TestJSONSource(FileSourceTest, AsyncTestCase):
                 filename=self.testfile, allowempty=True, readwrite=True
             )
         )
+
+    async def test_journal(self):
+        with tempfile.TemporaryDirectory() as testdir:
+            testfile = pathlib.Path(testdir, "records.json")
+            journal = pathlib.Path(testdir, "records.json.journal")
+            source = JSONSource(
+                filename=testfile,
+                allowempty=True,
+                readwrite=True,
+                journal=True,
+                compact=2,
+            )
+            # The file is written in full when it doesn't exist
+            async with source, source() as sctx:
+                for i in range(3):
+                    await sctx.update(
+                        Record(str(i), data={"features": {"x": i}})
+                    )
+            self.assertFalse(journal.exists())
+            written = testfile.read_text()
+            # Updates are appended to the journal, leaving the file as it was
+            for i in range(2):
+                async with source, source() as sctx:
+                    self.assertFalse(source.dirty)
+                    await sctx.update(
+                        Record(str(i), data={"features": {"x": i + 10}})
+                    )
+                    self.assertEqual(source.dirty, {str(i)})
+                self.assertEqual(testfile.read_text(), written)
+                self.assertEqual(len(journal.read_text().split("\n")), i + 2)
+            async with source, source() as sctx:
+                self.assertEqual(
+                    {
+                        record.key: record.feature("x")
+                        async for record in sctx.records()
+                    },
+                    {"0": 10, "1": 11, "2": 2},
+                )
+            # Once the journal is long enough the file is rewritten
+            self.assertFalse(journal.exists())
+            self.assertEqual(
+                json.loads(testfile.read_text())["untagged"]["1"],
+                {"key": "1", "features": {"x": 11}, "extra": {}},
+            )
+
+    async def test_journal_partial_entry(self):
+        with tempfile.TemporaryDirectory() as testdir:
+            testfile = pathlib.Path(testdir, "records.json")
+            journal = pathlib.Path(testdir, "records.json.journal")
+            testfile.write_text(json.dumps({"untagged": {}}))
+            source = JSONSource(
+                filename=testfile,
+                allowempty=True,
+                readwrite=True,
+                journal=True,
+            )
+            # The process died while appending an entry
+            journal.write_text('{"tag": "untagged", "key": "a", "da')
+            async with source, source() as sctx:
+                await sctx.update(Record("b", data={"features": {"x": 1}}))
+            # Only the partial entry is skipped when the journal is replayed
+            async with source, source() as sctx:
+                self.assertEqual(
+                    {
+                        record.key: record.feature("x")
+                        async for record in sctx.records()
+                    },
+                    {"b": 1},
+                )
+
+    async def test_thread(self):
+        with tempfile.TemporaryDirectory() as testdir:
+            testfile = pathlib.Path(testdir, "records.json")
+            testfile.write_text(
+                json.dumps({"untagged": {"a": {"features": {"x": 1}}}})
+            )
+            async with JSONSource(filename=testfile, thread=True) as source:
+                async with source() as sctx:
+                    record = await sctx.record("a")
+                    self.assertEqual(record.feature("x"), 1)
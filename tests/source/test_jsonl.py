@@ -0,0 +1,148 @@
+import json
+import gzip
+import pathlib
+import tempfile
+
+from dffml.record import Record
+from dffml.source.jsonl import JSONLinesSource, JSONLinesSourceConfig
+from dffml.util.testing.source import FileSourceTest
+from dffml.util.asynctestcase import AsyncTestCase
+
+
+class TestJSONLinesSource(FileSourceTest, AsyncTestCase):
+    async def setUpSource(self):
+        return JSONLinesSource(
+            JSONLinesSourceConfig(
+                filename=self.testfile, allowempty=True, readwrite=True
+            )
+        )
+
+    async def test_append(self):
+        with tempfile.TemporaryDirectory() as testdir:
+            for filename, opener in [
+                ("records.jsonl", open),
+                ("records.jsonl.gz", gzip.open),
+            ]:
+                testfile = pathlib.Path(testdir, filename)
+                source = JSONLinesSource(
+                    filename=testfile,
+                    allowempty=True,
+                    readwrite=True,
+                    compact=2,
+                )
+
+                async def update(records):
+                    async with source, source() as sctx:
+                        for key, x in records.items():
+                            await sctx.update(
+                                Record(key, data={"features": {"x": x}})
+                            )
+
+                def lines():
+                    with opener(testfile, "rt") as fd:
+                        return [
+                            json.loads(line) for line in fd if line.strip()
+                        ]
+
+                await update({"a": 1, "b": 2})
+                self.assertEqual(len(lines()), 2)
+                # Updates are appended
+                await update({"a": 3})
+                await update({"b": 4, "c": 5})
+                self.assertEqual(
+                    [(line["key"], line["features"]["x"]) for line in lines()],
+                    [("a", 1), ("b", 2), ("a", 3), ("b", 4), ("c", 5)],
+                )
+                async with source, source() as sctx:
+                    self.assertEqual(
+                        {
+                            record.key: record.feature("x")
+                            async for record in sctx.records()
+                        },
+                        {"a": 3, "b": 4, "c": 5},
+                    )
+                # Once enough lines are superseded the file is rewritten
+                self.assertEqual(
+                    [(line["key"], line["features"]["x"]) for line in lines()],
+                    [("a", 3), ("b", 4), ("c", 5)],
+                )
+                await update({"c": 6})
+                self.assertEqual(len(lines()), 4)
+
+    async def test_stream(self):
+        with tempfile.TemporaryDirectory() as testdir:
+            testfile = pathlib.Path(testdir, "records.jsonl")
+            testfile.write_text(
+                "".join(
+                    json.dumps(line) + "\n"
+                    for line in [
+                        {"key": "a", "features": {"x": 1}},
+                        {"key": "a", "features": {"x": 2}, "tag": "other"},
+                        {"key": "b", "features": {"x": 3}},
+                    ]
+                )
+            )
+            for index in [False, True]:
+                async with JSONLinesSource(
+                    filename=testfile, readwrite=True, stream=True, index=index
+                ) as source:
+                    async with source() as sctx:
+                        await sctx.update(
+                            Record(f"c{index}", data={"features": {"x": 4}})
+                        )
+                        await sctx.update(
+                            Record("a", data={"features": {"x": 5}})
+                        )
+                        self.assertEqual(
+                            (await sctx.record("a")).feature("x"), 5
+                        )
+                        self.assertEqual(
+                            (await sctx.record(f"c{index}")).feature("x"), 4
+                        )
+                        self.assertFalse((await sctx.record("d")).features())
+            # The index is brought up to date when the file changes
+            with open(testfile, "a") as fd:
+                fd.write(json.dumps({"key": "b", "features": {"x": 6}}) + "\n")
+            async with JSONLinesSource(
+                filename=testfile, stream=True, index=True
+            ) as source:
+                async with source() as sctx:
+                    self.assertEqual((await sctx.record("b")).feature("x"), 6)
+                    with self.assertRaisesRegex(ValueError, "read only"):
+                        await sctx.update(Record("b"))
+                    self.assertEqual(
+                        [record.key async for record in sctx.records()],
+                        ["a", "b", "cFalse", "a", "cTrue", "a", "b"],
+                    )
+
+    async def test_partial_line(self):
+        with tempfile.TemporaryDirectory() as testdir:
+            testfile = pathlib.Path(testdir, "records.jsonl")
+            for stream in [False, True]:
+                # The process died while appending a line
+                testfile.write_text(
+                    json.dumps({"key": "a", "features": {"x": 1}})
+                    + "\n"
+                    + '{"key": "b", "feat'
+                )
+                for i in range(2):
+                    async with JSONLinesSource(
+                        filename=testfile, readwrite=True, stream=stream
+                    ) as source:
+                        async with source() as sctx:
+                            await sctx.update(
+                                Record(f"c{i}", data={"features": {"x": i}})
+                            )
+                # Appended lines start on a line of their own and the partial
+                # line is skipped
+                async with JSONLinesSource(
+                    filename=testfile, stream=stream
+                ) as source:
+                    async with source() as sctx:
+                        self.assertEqual(
+                            {
+                                record.key: record.feature("x")
+                                async for record in sctx.records()
+                            },
+                            {"a": 1, "c0": 0, "c1": 1},
+                        )
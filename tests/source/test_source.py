@@ -0,0 +1,146 @@
+from unittest.mock import patch
+
+from dffml.record import Record
+from dffml.source.source import (
+    Sources,
+    SubsetSources,
+    ValidationSources,
+    NoRecordsWithMatchingFeatures,
+)
+from dffml.source.memory import (
+    MemorySource,
+    MemorySourceConfig,
+    MemorySourceContext,
+)
+from dffml.util.asynctestcase import AsyncTestCase
+
+
+class KeyLookupsMemorySourceContext(MemorySourceContext):
+    async def record(self, key: str) -> Record:
+        raise AssertionError(f"Record {key} looked up on its own")
+
+    async def records_by_keys(self, keys):
+        self.parent.lookups.append(keys)
+        return {key: self.parent.mem.get(key, Record(key)) for key in keys}
+
+
+class KeyLookupsMemorySource(MemorySource):
+    CONTEXT = KeyLookupsMemorySourceContext
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.lookups = []
+
+
+class TestSourcesContext(AsyncTestCase):
+    def setUp(self):
+        super().setUp()
+        self.features = MemorySource(
+            MemorySourceConfig(
+                records=[
+                    Record(str(i), data={"features": {"x": i}})
+                    for i in range(5)
+                ]
+                # Not all records have every feature
+                + [Record("missing", data={"features": {"y": 42}})]
+            )
+        )
+        self.targets = MemorySource(
+            MemorySourceConfig(
+                records=[
+                    Record(str(i), data={"features": {"y": i * 2}})
+                    for i in range(5)
+                ]
+            )
+        )
+
+    async def feature_batches(self, sources, features, batch_size):
+        async with sources as sources:
+            async with sources() as sctx:
+                return [
+                    {
+                        feature: array.tolist()
+                        for feature, array in batch.items()
+                    }
+                    async for batch in sctx.feature_batches(
+                        features, batch_size
+                    )
+                ]
+
+    async def test_feature_batches(self):
+        self.assertEqual(
+            await self.feature_batches(Sources(self.features), ["x"], 2),
+            [{"x": [0, 1]}, {"x": [2, 3]}, {"x": [4]}],
+        )
+
+    async def test_feature_batches_merged(self):
+        self.assertEqual(
+            await self.feature_batches(
+                Sources(self.features, self.targets), ["x", "y"], 3
+            ),
+            [{"x": [0, 1, 2], "y": [0, 2, 4]}, {"x": [3, 4], "y": [6, 8]}],
+        )
+
+    async def test_feature_batches_validation(self):
+        self.assertEqual(
+            await self.feature_batches(
+                ValidationSources(
+                    lambda record: record.key in ("0", "2", "4"), self.features
+                ),
+                ["x"],
+                2,
+            ),
+            [{"x": [0, 2]}, {"x": [4]}],
+        )
+
+    async def test_feature_batches_subset(self):
+        self.assertEqual(
+            await self.feature_batches(
+                SubsetSources(self.features, keys=["1", "3"]), ["x"], 2
+            ),
+            [{"x": [1, 3]}],
+        )
+
+    async def test_feature_batches_none_found(self):
+        with self.assertRaisesRegex(NoRecordsWithMatchingFeatures, "z"):
+            await self.feature_batches(Sources(self.features), ["z"], 2)
+
+    async def test_records_merged_by_keys(self):
+        targets = KeyLookupsMemorySource(
+            MemorySourceConfig(records=self.targets.config.records)
+        )
+        with patch("dffml.source.source.MERGE_BATCH_SIZE", 4):
+            async with Sources(self.features, targets) as sources:
+                async with sources() as sctx:
+                    records = {
+                        record.key: record.features()
+                        async for record in sctx.records()
+                    }
+        self.assertEqual(
+            records,
+            {
+                **{str(i): {"x": i, "y": i * 2} for i in range(5)},
+                "missing": {"y": 42},
+            },
+        )
+        # Keys are looked up in batches
+        self.assertEqual(
+            targets.lookups, [["0", "1", "2", "3"], ["4", "missing"]]
+        )
+
+    async def test_subset_records_by_keys(self):
+        targets = KeyLookupsMemorySource(
+            MemorySourceConfig(records=self.targets.config.records)
+        )
+        async with SubsetSources(
+            self.features, targets, keys=["1", "3"]
+        ) as sources:
+            async with sources() as sctx:
+                records = {
+                    record.key: record.features()
+                    async for record in sctx.records()
+                }
+        self.assertEqual(
+            records, {"1": {"x": 1, "y": 2}, "3": {"x": 3, "y": 6}}
+        )
+        self.assertEqual(targets.lookups, [["1", "3"]])
@@ -93,6 +93,18 @@ class TestMemoryKeyValueStore(AsyncTestCase):
             async with kvstore() as ctx:
                 self.assertEqual(await ctx.get("feed"), None)
 
+    async def test_max_size(self):
+        async with MemoryKeyValueStore(max_size=2) as kvstore:
+            async with kvstore() as kvctx:
+                await kvctx.set("a", b"1")
+                await kvctx.set("b", b"2")
+                # Using a makes b the least recently used
+                self.assertEqual(await kvctx.get("a"), b"1")
+                await kvctx.set("c", b"3")
+                self.assertIsNone(await kvctx.get("b"))
+                self.assertEqual(await kvctx.get("a"), b"1")
+                self.assertEqual(await kvctx.get("c"), b"3")
+
 
 class TestMemoryOperationImplementationNetwork(AsyncTestCase):
     async def setUp(self):
@@ -166,13 +178,29 @@ class TestOrchestrator(AsyncTestCase):
 
     async def test_run(self):
         calc_strings_check = {"add 40 and 2": 42, "multiply 42 and 10": 420}
-        # TODO(p0) Implement and test asyncgenerator
+
+        async def asyncgenerator():
+            for to_calc in calc_strings_check.keys():
+                yield {
+                    to_calc: [
+                        Input(
+                            value=to_calc,
+                            definition=parse_line.op.inputs["line"],
+                        ),
+                        Input(
+                            value=[add.op.outputs["sum"].name],
+                            definition=GetSingle.op.inputs["spec"],
+                        ),
+                    ]
+                }
+
         callstyles_no_expand = [
             "asyncgenerator",
             "dict",
             "dict_custom_input_set_context",
         ]
         callstyles = {
+            "asyncgenerator": asyncgenerator(),
             "dict": {
                 to_calc: [
                     Input(
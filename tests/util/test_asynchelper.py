@@ -1,7 +1,11 @@
 import asyncio
 from contextlib import asynccontextmanager
 
-from dffml.util.asynchelper import AsyncContextManagerList, concurrently
+from dffml.util.asynchelper import (
+    AsyncContextManagerList,
+    concurrently,
+    PrioritySemaphore,
+)
 from dffml.util.asynctestcase import AsyncTestCase
 
 
@@ -133,3 +137,47 @@ class TestConcurrently(AsyncTestCase):
 
         with self.assertRaises(asyncio.CancelledError):
             await list(work.keys())[0]
+
+
+class TestPrioritySemaphore(AsyncTestCase):
+    async def test_priority_order(self):
+        semaphore = PrioritySemaphore(1)
+        order = []
+
+        async def waiter(name, priority):
+            async with semaphore(priority=priority):
+                order.append(name)
+
+        async with semaphore():
+            tasks = [
+                asyncio.create_task(waiter(name, priority))
+                for name, priority in [("a", 2), ("b", 1), ("c", 2), ("d", 0)]
+            ]
+            await asyncio.sleep(0)
+            self.assertTrue(semaphore.locked())
+        await asyncio.gather(*tasks)
+        self.assertEqual(order, ["d", "b", "a", "c"])
+        self.assertFalse(semaphore.locked())
+
+    async def test_cancelled_waiter(self):
+        semaphore = PrioritySemaphore(1)
+        acquired = []
+
+        async def waiter(name):
+            async with semaphore():
+                acquired.append(name)
+
+        async with semaphore():
+            cancelled = asyncio.create_task(waiter("cancelled"))
+            task = asyncio.create_task(waiter("task"))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+        await task
+        self.assertEqual(acquired, ["task"])
+        self.assertFalse(semaphore.locked())
+
+    async def test_unlimited(self):
+        semaphore = PrioritySemaphore()
+        async with semaphore():
+            async with semaphore():
+                self.assertFalse(semaphore.locked())